@@ -1,31 +1,138 @@
-from fastapi import Depends, HTTPException, status, UploadFile
+from fastapi import Depends, HTTPException, Request, status, UploadFile
 from pathlib import Path
+from starlette.datastructures import UploadFile as StarletteUploadFile
+from typing import AsyncIterator, Callable, List, Optional, Tuple
+import shutil
+import time
+import uuid
 from app.config import Settings, get_settings
+from app.services.admission import AdmissionRejected, admission
+from app.services.archives import ARCHIVE_EXTENSIONS, archive_load, is_archive
+from app.services.executors import run_io
+from app.services.resume_pipeline import remove_upload
 
 
-def validate_file(file: UploadFile, settings: Settings = Depends(get_settings)) -> None:
-    """Validate file type and size."""
+async def admit_uploads(request: Request, settings: Settings = Depends(get_settings)) -> AsyncIterator[None]:
+    """
+    Hold an admission slot for the uploads of a parsing request until its
+    response, streamed or not, has been sent; 429 with Retry-After when the
+    server is too busy.
+    
+    A ZIP archive counts as the resumes in it, with their uncompressed
+    size, as read from its central directory. A request without files
+    counts as one file.
+    """
+    form = await request.form()
+    uploads = [value for _, value in form.multi_items() if isinstance(value, StarletteUploadFile)]
+    files, size = 0, 0
+    for upload in uploads:
+        load = None
+        if is_archive(upload.filename or ""):
+            load = await run_io(settings, archive_load, upload.file, settings)
+        upload_files, upload_size = load or (1, upload.size or 0)
+        files += upload_files
+        size += upload_size
+    try:
+        taken = await admission.acquire(max(files, 1), size, settings)
+    except AdmissionRejected as e:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail=e.detail,
+            headers={"Retry-After": str(e.retry_after)}
+        )
+    try:
+        yield
+    finally:
+        admission.release(*taken, settings)
+
+
+async def read_capped(request: Request, max_size: int) -> AsyncIterator[bytes]:
+    """
+    Stream a request body, failing with 400 as soon as it exceeds `max_size`
+    bytes, before it is read at all when Content-Length already says so.
+    """
+    content_length = request.headers.get("content-length")
+    too_large = HTTPException(
+        status_code=status.HTTP_400_BAD_REQUEST,
+        detail=f"Request too large. Maximum size: {max_size/1024/1024}MB"
+    )
+    if content_length and content_length.isdigit() and int(content_length) > max_size:
+        raise too_large
+    
+    received = 0
+    async for chunk in request.stream():
+        received += len(chunk)
+        if received > max_size:
+            raise too_large
+        yield chunk
+
+
+def validate_file(file: UploadFile, settings: Settings = Depends(get_settings), archives: bool = False) -> None:
+    """Validate file type and size; with `archives`, ZIP archives of resumes are accepted too."""
     # Check file extension
     file_ext = Path(file.filename).suffix.lower()
-    if file_ext not in settings.ALLOWED_EXTENSIONS:
+    allowed_extensions = settings.ALLOWED_EXTENSIONS + ARCHIVE_EXTENSIONS if archives else settings.ALLOWED_EXTENSIONS
+    if file_ext not in allowed_extensions:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
-            detail=f"Unsupported file type. Allowed types: {', '.join(settings.ALLOWED_EXTENSIONS)}"
+            detail=f"Unsupported file type. Allowed types: {', '.join(allowed_extensions)}"
         )
+    max_size = settings.ZIP_MAX_ARCHIVE_SIZE if file_ext in ARCHIVE_EXTENSIONS else settings.MAX_FILE_SIZE
     
     # Check file size
     file.file.seek(0, 2)  # Seek to end
     size = file.file.tell()
     file.file.seek(0)  # Seek back to start
     
-    if size > settings.MAX_FILE_SIZE:
+    if size > max_size:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
-            detail=f"File too large. Maximum size: {settings.MAX_FILE_SIZE/1024/1024}MB"
+            detail=f"File too large. Maximum size: {max_size/1024/1024}MB"
         )
     
     if size == 0:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Uploaded file is empty"
-        )
\ No newline at end of file
+        )
+
+
+def save_upload(file: UploadFile, file_path: Path) -> None:
+    """Copy an uploaded file to `file_path`; blocking, so run it in the I/O pool."""
+    file_path.parent.mkdir(parents=True, exist_ok=True)
+    with open(file_path, "wb") as buffer:
+        shutil.copyfileobj(file.file, buffer)
+
+
+async def stage_uploads(
+    files: List[UploadFile],
+    settings: Settings,
+    on_saved: Optional[Callable[[int, float], None]] = None,
+    archives: bool = False
+) -> List[Tuple[str, Path]]:
+    """
+    Validate every upload and save them all to UPLOAD_DIR before processing starts.
+    
+    Streamed responses outlive the request body, so the uploads must be on
+    disk first. Returns `(file_name, file_path)` pairs in upload order;
+    `on_saved` is called with the position of each file and the seconds
+    its copy took, once it is saved. With `archives`, ZIP archives are
+    accepted and saved as they are, for `expand_archives` to open.
+    """
+    for file in files:
+        validate_file(file, settings, archives)
+    
+    staged = []
+    try:
+        for file in files:
+            file_path = Path(settings.UPLOAD_DIR) / f"{uuid.uuid4().hex}_{Path(file.filename).name}"
+            staged.append((file.filename, file_path))
+            started = time.monotonic()
+            await run_io(settings, save_upload, file, file_path)
+            if on_saved:
+                on_saved(len(staged) - 1, time.monotonic() - started)
+    except Exception:
+        for _, file_path in staged:
+            remove_upload(file_path, settings)
+        raise
+    return staged
@@ -15,6 +15,7 @@ class Education(BaseModel):
 
 class ParsedResume(BaseModel):
     """Model for parsed resume data."""
+    id: Optional[str] = None
     file_name: str
     name: Optional[str] = None
     email: Optional[str] = None
@@ -22,4 +23,58 @@ class ParsedResume(BaseModel):
     education: List[str] = []
     skills: List[str] = []
     experience: List[Dict[str, str]] = []
-    parsed_date: str = Field(default_factory=lambda: datetime.now().isoformat())
\ No newline at end of file
+    parsed_date: str = Field(default_factory=lambda: datetime.now().isoformat())
+    duplicate_of: Optional[str] = None  # ID of the resume this file repeats; it was not parsed again
+
+
+class FileError(BaseModel):
+    """Model for why one file of a batch could not be processed."""
+    stage: Optional[str] = None  # Stage that failed: "uploaded", "extracted", "parsed", "scored" or "assessed"
+    reason: str
+
+
+class FileResult(BaseModel):
+    """Model for the outcome of one file of a batch."""
+    file_name: str
+    status: str  # "ok" or "error"
+    error: Optional[FileError] = None
+
+
+class ParsedResumeResult(FileResult):
+    """Model for the outcome of parsing one uploaded file."""
+    data: Optional[ParsedResume] = None
+
+
+class CandidateSummary(BaseModel):
+    """Model for a stored resume returned by candidate search."""
+    id: str
+    name: Optional[str] = None
+    file_name: Optional[str] = None
+    skills: List[str] = []
+
+
+class CandidateSearchResult(BaseModel):
+    """Model for candidate search results."""
+    query: str
+    total: int
+    candidates: List[CandidateSummary] = []
+
+
+class ParseJobFile(BaseModel):
+    """Model for the state of one file in a background parse job."""
+    file_name: str
+    status: str  # "queued", "processing", "completed" or "failed"
+    result: Optional[ParsedResume] = None
+    error: Optional[str] = None
+
+
+class ParseJob(BaseModel):
+    """Model for the progress and results of a background parse job."""
+    id: str
+    status: str  # "queued", "running" or "completed"
+    created_date: str
+    updated_date: Optional[str] = None
+    total: int
+    completed: int
+    failed: int
+    files: List[ParseJobFile] = []
@@ -14,4 +14,19 @@ class JobDescription(BaseModel):
     preferred_skills: List[str] = []
     education_requirements: List[str] = []
     experience_requirements: List[str] = []
-    created_date: str = Field(default_factory=lambda: datetime.now().isoformat())
\ No newline at end of file
+    created_date: str = Field(default_factory=lambda: datetime.now().isoformat())
+
+
+class BulkJobResult(BaseModel):
+    """Outcome of one item of a bulk job description upload."""
+    index: int
+    title: Optional[str] = None
+    id: Optional[str] = None
+    error: Optional[str] = None
+
+
+class BulkJobResponse(BaseModel):
+    """Model for the result of a bulk job description upload."""
+    created: int
+    failed: int
+    results: List[BulkJobResult]
\ No newline at end of file
@@ -1,5 +1,7 @@
 from pydantic import BaseModel
-from typing import List, Dict
+from typing import List, Dict, Optional
+
+from app.api.models.cv import FileResult
 
 
 class MatchScore(BaseModel):
@@ -19,6 +21,11 @@ class MatchScore(BaseModel):
     missing_skills: List[str] = []
 
 
+class MatchResult(FileResult):
+    """Model for the outcome of matching one uploaded file."""
+    data: Optional[MatchScore] = None
+
+
 class BatchMatchRequest(BaseModel):
     """Model for batch matching request."""
     job_ids: List[str]
@@ -26,4 +33,5 @@ class BatchMatchRequest(BaseModel):
 
 class BatchMatchResult(BaseModel):
     """Model for batch matching result."""
-    matches: Dict[str, List[MatchScore]]
\ No newline at end of file
+    matches: Dict[str, List[MatchScore]]
+    files: List[FileResult] = []
@@ -1,44 +1,218 @@
 import logging
-from fastapi import APIRouter, Depends, Form, UploadFile, File, HTTPException, status, BackgroundTasks
-from fastapi.responses import FileResponse
-from typing import List, Optional
+from fastapi import APIRouter, Depends, Form, UploadFile, File, HTTPException, Query, Response, status
+from starlette.concurrency import run_in_threadpool
+from typing import AsyncIterator, Dict, List, Optional, Tuple
 from pathlib import Path
-import pandas as pd
 from datetime import datetime
 import shutil
+import uuid
 
 from app.config import get_settings
-from app.api.dependencies import validate_file
-from app.api.models.cv import ParsedResume
-from app.services.text_extraction import extract_text_from_file
-from app.services.cv_parser import extract_information
+from app.api.dependencies import admit_uploads, stage_uploads, validate_file
+from app.api.models.cv import ParsedResume, ParsedResumeResult, CandidateSearchResult, ParseJob
+from app.api.streaming import error_detail, file_error, ndjson_response, wants_ndjson
+from app.services.executors import run_io
+from app.services.exports import Sheet, export_format, export_response
+from app.services.archives import UploadSource
+from app.services.duplicates import BatchDuplicates
+from app.services.resume_pipeline import expand_archives, parse_resume_file, process_as_completed, release_uploads
+from app.services.candidate_search import QuerySyntaxError, search_candidates
+from app.services.parse_queue import get_parse_queue
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter(tags=["CV Processing"])
 
 
-def cleanup_file(file_path: Path):
-    """Helper function to clean up temporary files"""
+async def parse_uploads(items: List[Tuple[str, UploadSource]], settings) -> List[Dict]:
+    """
+    Parse uploads concurrently and return one result envelope per file, in upload order.
+    
+    A file that fails gets a `{"status": "error"}` envelope with the stage
+    and reason; the other files are still parsed.
+    """
+    duplicates = BatchDuplicates()
+    
+    async def parse(position: int) -> Dict:
+        file_name, source = items[position]
+        _, parsed = await parse_resume_file(source, file_name, settings, duplicates=duplicates)
+        return parsed
+    
+    results = [None] * len(items)
     try:
-        if file_path.exists():
-            file_path.unlink()
-    except Exception as e:
-        logger.warning(f"Failed to cleanup file {file_path}: {str(e)}")
+        async for position, parsed, error in process_as_completed(range(len(items)), parse, settings.UPLOAD_CONCURRENCY):
+            file_name = items[position][0]
+            if error:
+                logger.error(f"Error processing file {file_name}: {error_detail(error)}")
+                results[position] = file_error(file_name, error)
+            else:
+                logger.info(f"Successfully processed file: {file_name}")
+                results[position] = {"file_name": file_name, "status": "ok", "data": parsed}
+    finally:
+        release_uploads(items, settings)
+    return results
+
+
+async def stream_parsed_resumes(items: List[Tuple[str, UploadSource]], settings) -> AsyncIterator[Dict]:
+    """NDJSON lines for `/upload`: each parsed resume as soon as it is ready, then a summary."""
+    duplicates = BatchDuplicates()
+    
+    async def parse(item: Tuple[str, UploadSource]) -> Dict:
+        file_name, source = item
+        _, parsed = await parse_resume_file(source, file_name, settings, duplicates=duplicates)
+        return ParsedResume(**parsed).dict()
+    
+    failed = 0
+    try:
+        async for (file_name, _), parsed, error in process_as_completed(items, parse, settings.UPLOAD_CONCURRENCY):
+            if error:
+                failed += 1
+                logger.error(f"Error processing file {file_name}: {error_detail(error)}")
+                yield {"type": "error", "file_name": file_name, "stage": getattr(error, "stage", None), "detail": error_detail(error)}
+            else:
+                logger.info(f"Successfully processed file: {file_name}")
+                yield {"type": "result", "file_name": file_name, "data": parsed}
+        
+        yield {"type": "summary", "total": len(items), "succeeded": len(items) - failed, "failed": failed}
+    finally:
+        # Files not reached before the client disconnected, and archives
+        release_uploads(items, settings)
+
+
+def resume_row(resume: Dict) -> Dict:
+    """Flatten a parsed resume into one export row."""
+    flat_resume = {}
+    
+    # Flatten basic fields
+    for key, value in resume.items():
+        if not isinstance(value, (list, dict)):
+            flat_resume[key] = value
+    
+    # Handle skills list - convert to comma-separated string
+    if "skills" in resume and isinstance(resume["skills"], list):
+        # Limit skills to top 15 most relevant to avoid excessive column width
+        top_skills = resume["skills"][:15] if len(resume["skills"]) > 15 else resume["skills"]
+        flat_resume["skills"] = ", ".join(top_skills)
+        if len(resume["skills"]) > 15:
+            flat_resume["skills"] += f" (+ {len(resume['skills']) - 15} more)"
+        
+    # Handle education entries
+    if "education" in resume and isinstance(resume["education"], list):
+        # For the sample data, education is a list of strings rather than objects
+        if resume["education"] and isinstance(resume["education"][0], str):
+            # Join all education strings with a separator
+            flat_resume["education"] = " | ".join(resume["education"])
+        else:
+            # Handle structured education data if format changes
+            for i, edu in enumerate(resume["education"]):
+                if isinstance(edu, dict):
+                    prefix = f"education_{i+1}_"
+                    for edu_key, edu_val in edu.items():
+                        flat_resume[f"{prefix}{edu_key}"] = edu_val
+                elif isinstance(edu, str):
+                    flat_resume[f"education_{i+1}"] = edu
+    
+    # Handle experience list
+    if "experience" in resume and isinstance(resume["experience"], list):
+        for i, exp in enumerate(resume["experience"]):
+            if isinstance(exp, dict) and "description" in exp:
+                # Just store the description directly with a numbered prefix
+                flat_resume[f"experience_{i+1}"] = exp["description"]
+            elif isinstance(exp, dict):
+                prefix = f"experience_{i+1}_"
+                for exp_key, exp_val in exp.items():
+                    flat_resume[f"{prefix}{exp_key}"] = exp_val
+            elif isinstance(exp, str):
+                flat_resume[f"experience_{i+1}"] = exp
+    
+    return flat_resume
 
 
-@router.post("/upload", response_model=List[ParsedResume])
+@router.post("/upload", response_model=List[ParsedResumeResult], dependencies=[Depends(admit_uploads)])
 async def upload_cvs(
     files: List[UploadFile] = File(...),
     format: Optional[str] = Form("json"),
-    background_tasks: BackgroundTasks = BackgroundTasks(),
+    stream: bool = Depends(wants_ndjson),
     settings = Depends(get_settings)
 ):
     """
     Upload and parse CV/Resume files.
     
-    - **files**: List of CV/Resume files (PDF or DOCX)
-    - **format**: Response format ("json" or "excel", default: "json")
+    - **files**: List of CV/Resume files (PDF or DOCX), or ZIP archives of them
+    - **format**: Response format ("json", "xlsx" (or "excel"), "csv" or "parquet", default: "json")
+    
+    Files are parsed UPLOAD_CONCURRENCY at a time. The resumes in a ZIP
+    archive are read straight from it and named `archive.zip/path/in/archive`.
+    Repeated files are parsed once; each copy, like an upload matching a
+    stored resume, names the resume it repeats in `duplicate_of`.
+    
+    Returns one envelope per file, in upload order: `{"status": "ok", "data"}`
+    with the parsed resume, or `{"status": "error", "error": {"stage", "reason"}}`
+    for a file that could not be parsed, so one bad file does not fail the
+    others. Exports contain the parsed resumes only and are streamed as
+    they are written, without a temporary file.
+    
+    With `Accept: application/x-ndjson` and the JSON format, each parsed
+    resume is streamed as soon as it is ready: one
+    `{"type": "result", "file_name", "data"}` or
+    `{"type": "error", "file_name", "stage", "detail"}` line per file, then a
+    `{"type": "summary"}` line.
+    """
+    if not files:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="No files provided"
+        )
+    
+    # Excel, CSV or Parquet; None for JSON
+    export = None if format.lower() == "json" else export_format(format)
+    
+    staged = await stage_uploads(files, settings, archives=True)
+    items = await run_io(settings, expand_archives, staged, settings)
+    
+    if stream and not export:
+        return ndjson_response(stream_parsed_resumes(items, settings))
+    
+    # Extract, parse and store the resumes
+    results = await parse_uploads(items, settings)
+    
+    if export:
+        parsed_data = [result["data"] for result in results if result["status"] == "ok"]
+        sheet = Sheet("Parsed Resumes", lambda: (resume_row(resume) for resume in parsed_data))
+        logger.info(f"Exporting {len(parsed_data)} parsed resumes as {export}")
+        return export_response(
+            [sheet], export, f"parsed_resumes_{datetime.now().strftime('%Y%m%d_%H%M%S')}", settings
+        )
+    
+    return results
+
+
+def store_uploads(files: List[UploadFile], directory: Path) -> List[Tuple[str, str]]:
+    """Copy uploads to `directory` and return `(file_name, path)` for each."""
+    directory.mkdir(parents=True, exist_ok=True)
+    stored = []
+    for position, file in enumerate(files):
+        file_path = directory / f"{position}_{Path(file.filename).name}"
+        with open(file_path, "wb") as buffer:
+            shutil.copyfileobj(file.file, buffer)
+        stored.append((file.filename, str(file_path)))
+    return stored
+
+
+@router.post("/parse-jobs", response_model=ParseJob, status_code=status.HTTP_202_ACCEPTED, dependencies=[Depends(admit_uploads)])
+async def create_parse_job(
+    response: Response,
+    files: List[UploadFile] = File(...),
+    settings = Depends(get_settings)
+):
+    """
+    Queue CV/Resume files for parsing in the background.
+    
+    - **files**: List of CV/Resume files (PDF or DOCX), at most PARSE_JOB_MAX_FILES
+      of them and PARSE_JOB_MAX_SIZE in total
+    
+    Returns at once with the parse job; poll `GET /parse-jobs/{parse_job_id}`
+    (also given in the `Location` header) for progress and results.
     """
     if not files:
         raise HTTPException(
@@ -46,118 +220,85 @@ async def upload_cvs(
             detail="No files provided"
         )
     
-    parsed_data = []
+    if len(files) > settings.PARSE_JOB_MAX_FILES:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Too many files. Maximum: {settings.PARSE_JOB_MAX_FILES}"
+        )
     
     for file in files:
         validate_file(file, settings)
-        
-        # Save file temporarily
-        file_id = f"{datetime.now().strftime('%Y%m%d%H%M%S')}_{id(file)}"
-        file_path = Path(settings.UPLOAD_DIR) / f"{file_id}_{file.filename}"
-        
-        # Ensure upload directory exists
-        Path(settings.UPLOAD_DIR).mkdir(parents=True, exist_ok=True)
-        
-        try:
-            with open(file_path, "wb") as buffer:
-                shutil.copyfileobj(file.file, buffer)
-            
-            # Extract text based on file type
-            text = extract_text_from_file(str(file_path))
-            
-            # Parse the text
-            parsed = extract_information(text, settings)
-            parsed["file_name"] = file.filename
-            parsed_data.append(parsed)
-            
-            logger.info(f"Successfully processed file: {file.filename}")
-            
-        except Exception as e:
-            logger.error(f"Error processing file {file.filename}: {str(e)}")
-            raise HTTPException(
-                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                detail=f"Error processing file {file.filename}: {str(e)}"
-            )
-        finally:
-            if settings.CLEANUP_FILES and file_path.exists():
-                file_path.unlink()
-    
-    if format.lower() == "excel":
-        # Export to Excel
-        try:
-            # Ensure parsed directory exists
-            Path(settings.PARSED_DIR).mkdir(parents=True, exist_ok=True)
-            
-            # Flatten nested structures for better Excel representation
-            flattened_data = []
-            for resume in parsed_data:
-                flat_resume = {}
-                
-                # Flatten basic fields
-                for key, value in resume.items():
-                    if not isinstance(value, (list, dict)):
-                        flat_resume[key] = value
-                
-                # Handle skills list - convert to comma-separated string
-                if "skills" in resume and isinstance(resume["skills"], list):
-                    # Limit skills to top 15 most relevant to avoid excessive column width
-                    top_skills = resume["skills"][:15] if len(resume["skills"]) > 15 else resume["skills"]
-                    flat_resume["skills"] = ", ".join(top_skills)
-                    if len(resume["skills"]) > 15:
-                        flat_resume["skills"] += f" (+ {len(resume['skills']) - 15} more)"
-                    
-                # Handle education entries
-                if "education" in resume and isinstance(resume["education"], list):
-                    # For the sample data, education is a list of strings rather than objects
-                    if resume["education"] and isinstance(resume["education"][0], str):
-                        # Join all education strings with a separator
-                        flat_resume["education"] = " | ".join(resume["education"])
-                    else:
-                        # Handle structured education data if format changes
-                        for i, edu in enumerate(resume["education"]):
-                            if isinstance(edu, dict):
-                                prefix = f"education_{i+1}_"
-                                for edu_key, edu_val in edu.items():
-                                    flat_resume[f"{prefix}{edu_key}"] = edu_val
-                            elif isinstance(edu, str):
-                                flat_resume[f"education_{i+1}"] = edu
-                
-                # Handle experience list
-                if "experience" in resume and isinstance(resume["experience"], list):
-                    for i, exp in enumerate(resume["experience"]):
-                        if isinstance(exp, dict) and "description" in exp:
-                            # Just store the description directly with a numbered prefix
-                            flat_resume[f"experience_{i+1}"] = exp["description"]
-                        elif isinstance(exp, dict):
-                            prefix = f"experience_{i+1}_"
-                            for exp_key, exp_val in exp.items():
-                                flat_resume[f"{prefix}{exp_key}"] = exp_val
-                        elif isinstance(exp, str):
-                            flat_resume[f"experience_{i+1}"] = exp
-                
-                flattened_data.append(flat_resume)
-            
-            # Create dataframe from flattened data
-            df = pd.DataFrame(flattened_data)
-            
-            # Generate Excel file
-            excel_path = Path(settings.PARSED_DIR) / f"parsed_resumes_{datetime.now().strftime('%Y%m%d_%H%M%S')}.xlsx"
-            df.to_excel(excel_path, index=False)
-            
-            # Schedule cleanup of the Excel file after response is sent
-            background_tasks.add_task(cleanup_file, excel_path)
-            
-            # Return Excel file
-            return FileResponse(
-                path=str(excel_path),
-                media_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-                filename=excel_path.name
-            )
-        except Exception as e:
-            logger.error(f"Error generating Excel file: {str(e)}")
-            raise HTTPException(
-                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                detail=f"Error generating Excel file: {str(e)}"
-            )
-    
-    return parsed_data
\ No newline at end of file
+    
+    if sum(file.size or 0 for file in files) > settings.PARSE_JOB_MAX_SIZE:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Files too large. Maximum total size: {settings.PARSE_JOB_MAX_SIZE/1024/1024}MB"
+        )
+    
+    upload_dir = Path(settings.PARSE_QUEUE_DIR) / uuid.uuid4().hex
+    try:
+        stored = await run_in_threadpool(store_uploads, files, upload_dir)
+        parse_queue = get_parse_queue(settings)
+        parse_job_id = await run_in_threadpool(parse_queue.submit, stored)
+    except Exception as e:
+        logger.error(f"Error queueing parse job: {str(e)}")
+        shutil.rmtree(upload_dir, ignore_errors=True)
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Error queueing files: {str(e)}"
+        )
+    
+    logger.info(f"Queued parse job {parse_job_id} with {len(stored)} files")
+    response.headers["Location"] = f"/parse-jobs/{parse_job_id}"
+    return await run_in_threadpool(parse_queue.get_job, parse_job_id)
+
+
+@router.get("/parse-jobs/{parse_job_id}", response_model=ParseJob)
+async def get_parse_job(parse_job_id: str, settings = Depends(get_settings)):
+    """
+    Get the progress of a background parse job and the results of its finished files.
+    
+    - **parse_job_id**: ID returned by `POST /parse-jobs`
+    """
+    parse_job = await run_in_threadpool(get_parse_queue(settings).get_job, parse_job_id)
+    if not parse_job:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Parse job with ID {parse_job_id} not found"
+        )
+    return parse_job
+
+
+@router.get("/candidates/search", response_model=CandidateSearchResult)
+async def search_stored_candidates(
+    q: str = Query(..., min_length=1),
+    limit: int = Query(50, ge=1, le=1000),
+    settings = Depends(get_settings)
+):
+    """
+    Search stored resumes by skills with a boolean query.
+    
+    - **q**: Query such as `python AND (django OR fastapi) NOT php`; quote multi-word skills or write them plainly
+    - **limit**: Maximum number of candidates to return (default: 50)
+    """
+    try:
+        candidates = await run_in_threadpool(search_candidates, q, settings)
+    except QuerySyntaxError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Invalid search query: {str(e)}"
+        )
+    
+    return {
+        "query": q,
+        "total": len(candidates),
+        "candidates": [
+            {
+                "id": candidate["id"],
+                "name": candidate["name"],
+                "file_name": candidate["file_name"],
+                "skills": sorted(candidate["skills"])
+            }
+            for candidate in candidates[:limit]
+        ]
+    }
\ No newline at end of file
@@ -1,22 +1,73 @@
+import asyncio
+import json
 import logging
-from fastapi import APIRouter, Depends, UploadFile, File, Form, HTTPException, status
-from typing import List, Optional
+from fastapi import APIRouter, Depends, UploadFile, File, Form, HTTPException, Query, Request, Response, status
+from starlette.formparsers import MultiPartException, MultiPartParser
+from typing import Dict, List, Optional, Union
 from pathlib import Path
-import shutil
 
 from app.config import get_settings
-from app.api.dependencies import validate_file
-from app.api.models.job import JobDescription
+from app.api.dependencies import admit_uploads, read_capped, stage_uploads
+from app.api.models.job import BulkJobResponse, BulkJobResult, JobDescription
 from app.services.text_extraction import extract_text_from_file
-from app.services.job_parser import extract_job_information
-from app.services.storage import save_job_description, get_job_description, get_job_descriptions
+from app.services.job_parser import extract_job_information_offloaded
+from app.services.executors import run_cpu
+from app.services.resume_pipeline import remove_upload
+from app.services.async_storage import (
+    save_job_description,
+    save_job_descriptions,
+    get_job_description,
+    get_job_description_page,
+    search_job_descriptions
+)
+from app.services.storage import InvalidJobQueryError
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter(tags=["Job Descriptions"])
 
+# Job fields that can be given as comma-separated lists
+LIST_FIELDS = ("required_skills", "preferred_skills", "education_requirements", "experience_requirements")
 
-@router.post("/job", response_model=JobDescription)
+
+def split_list_field(value: Union[str, List]) -> List[str]:
+    """Split a comma-separated field, or clean up one that is already a list."""
+    items = value.split(",") if isinstance(value, str) else value
+    return [str(item).strip() for item in items if str(item).strip()]
+
+
+async def parse_bulk_job(item: Dict, settings) -> Dict:
+    """Parse one JSONL job description; manually provided list fields override parsed ones."""
+    if not isinstance(item, dict):
+        raise ValueError("Each line must be a JSON object")
+    
+    title = item.get("title")
+    description = item.get("description")
+    if not isinstance(title, str) or not title.strip():
+        raise ValueError("title is required")
+    if not isinstance(description, str) or not description.strip():
+        raise ValueError("description is required")
+    
+    job_data = await extract_job_information_offloaded(description, title, item.get("company"), settings)
+    
+    for field in LIST_FIELDS:
+        if item.get(field):
+            job_data[field] = split_list_field(item[field])
+    
+    return job_data
+
+
+async def parse_bulk_job_file(file: UploadFile, company: Optional[str], settings) -> Dict:
+    """Parse one uploaded job description file, titled after the file name."""
+    [(_, file_path)] = await stage_uploads([file], settings)
+    try:
+        text = await run_cpu(settings, extract_text_from_file, str(file_path))
+        return await extract_job_information_offloaded(text, Path(file.filename).stem, company, settings)
+    finally:
+        remove_upload(file_path, settings)
+
+
+@router.post("/job", response_model=JobDescription, dependencies=[Depends(admit_uploads)])
 async def create_job_description(
     title: str = Form(...),
     company: Optional[str] = Form(None),
@@ -51,21 +102,14 @@ async def create_job_description(
     
     # Process file if provided
     if file:
-        validate_file(file, settings)
-        
-        # Save file temporarily
-        file_id = f"{id(file)}"
-        file_path = Path(settings.UPLOAD_DIR) / f"{file_id}_{file.filename}"
+        [(_, file_path)] = await stage_uploads([file], settings)
         
         try:
-            with open(file_path, "wb") as buffer:
-                shutil.copyfileobj(file.file, buffer)
-            
             # Extract text from file
-            text = extract_text_from_file(str(file_path))
+            text = await run_cpu(settings, extract_text_from_file, str(file_path))
             
             # Parse job description
-            job_data = extract_job_information(text, title, company)
+            job_data = await extract_job_information_offloaded(text, title, company, settings)
             
             logger.info(f"Successfully processed job description file: {file.filename}")
             
@@ -76,11 +120,10 @@ async def create_job_description(
                 detail=f"Error processing file {file.filename}: {str(e)}"
             )
         finally:
-            if settings.CLEANUP_FILES and file_path.exists():
-                file_path.unlink()
+            remove_upload(file_path, settings)
     else:
         # Use provided text description
-        job_data = extract_job_information(description, title, company)
+        job_data = await extract_job_information_offloaded(description, title, company, settings)
     
     # Override with manually provided fields if they exist
     if required_skills:
@@ -96,7 +139,7 @@ async def create_job_description(
         job_data["experience_requirements"] = [exp.strip() for exp in experience_requirements.split(",") if exp.strip()]
     
     # Save job description
-    job_id = save_job_description(job_data, settings)
+    job_id = await save_job_description(job_data, settings)
     job_data["id"] = job_id
     
     logger.info(f"Created job description with ID: {job_id}")
@@ -104,16 +147,95 @@ async def create_job_description(
     return job_data
 
 
-@router.get("/jobs", response_model=List[JobDescription])
-async def list_job_descriptions(settings = Depends(get_settings)):
-    """List all job descriptions."""
-    return get_job_descriptions(settings)
+@router.get("/jobs", response_model=List[Dict])
+async def list_job_descriptions(
+    response: Response,
+    limit: int = Query(50, ge=1, le=500),
+    cursor: Optional[str] = Query(None),
+    fields: Optional[str] = Query(None),
+    title: Optional[str] = Query(None),
+    company: Optional[str] = Query(None),
+    skills: Optional[str] = Query(None),
+    settings = Depends(get_settings)
+):
+    """
+    List job descriptions, newest first, one page at a time.
+    
+    - **limit**: Number of jobs per page (default: 50)
+    - **cursor**: Cursor from the `X-Next-Cursor` header of the previous page (optional)
+    - **fields**: Comma-separated list of fields to return, e.g. `title,company,required_skills` (optional, default: all)
+    - **title**: Only jobs whose title contains this text (optional)
+    - **company**: Only jobs from this company (optional)
+    - **skills**: Comma-separated list of skills every job must require or prefer (optional)
+    
+    The `X-Next-Cursor` response header is set when another page follows.
+    """
+    try:
+        jobs, next_cursor = await get_job_description_page(
+            settings,
+            limit=limit,
+            cursor=cursor,
+            fields=[field.strip() for field in fields.split(",") if field.strip()] if fields else None,
+            title=title,
+            company=company,
+            skills=skills.split(",") if skills else None
+        )
+    except InvalidJobQueryError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    
+    return jobs
+
+
+@router.get("/jobs/search", response_model=List[Dict])
+async def search_jobs(
+    response: Response,
+    q: str = Query(..., min_length=1),
+    limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = Query(None),
+    fields: Optional[str] = Query(None),
+    settings = Depends(get_settings)
+):
+    """
+    Search job descriptions by keyword, best match first.
+    
+    - **q**: Search terms; supports "quoted phrases", `or` and `-excluded` words
+    - **limit**: Number of results per page (default: 20)
+    - **cursor**: Cursor from the `X-Next-Cursor` header of the previous page (optional)
+    - **fields**: Comma-separated list of fields to return (optional, default: all)
+    
+    Every result carries its search `rank`. The `X-Next-Cursor` response
+    header is set when another page follows.
+    """
+    try:
+        jobs, next_cursor = await search_job_descriptions(
+            settings,
+            q,
+            limit=limit,
+            cursor=cursor,
+            fields=[field.strip() for field in fields.split(",") if field.strip()] if fields else None
+        )
+    except InvalidJobQueryError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    
+    return jobs
 
 
 @router.get("/job/{job_id}", response_model=JobDescription)
 async def get_job(job_id: str, settings = Depends(get_settings)):
     """Get a specific job description by ID."""
-    job = get_job_description(job_id, settings)
+    job = await get_job_description(job_id, settings)
     
     if not job:
         raise HTTPException(
@@ -121,4 +243,113 @@ async def get_job(job_id: str, settings = Depends(get_settings)):
             detail=f"Job description with ID {job_id} not found"
         )
     
-    return job
\ No newline at end of file
+    return job
+
+
+@router.post("/jobs/bulk", response_model=BulkJobResponse)
+async def create_job_descriptions_bulk(request: Request, settings = Depends(get_settings)):
+    """
+    Create many job descriptions in one request.
+    
+    Send either:
+    - a JSONL body (`application/x-ndjson`), one job per line with **title**,
+      **description** and optionally **company**, **required_skills**,
+      **preferred_skills**, **education_requirements**, **experience_requirements**
+    - a multipart form with several **files** (PDF, DOCX, TXT), titled after
+      their file names, and an optional **company** for all of them
+    
+    Jobs are parsed concurrently and saved in one transaction. The result
+    lists the ID or the error of every item, in input order.
+    """
+    content_type = request.headers.get("content-type", "")
+    
+    # (title, parse) for every item; errors found while reading the input are kept as-is
+    items = []
+    form = None
+    if content_type.startswith("multipart/form-data"):
+        # Parsed from a capped stream, so an oversized upload is refused before it is spooled to disk
+        parser = MultiPartParser(
+            request.headers,
+            read_capped(request, settings.BULK_JOB_MAX_UPLOAD_SIZE),
+            max_files=settings.BULK_JOB_MAX_ITEMS
+        )
+        try:
+            form = await parser.parse()
+        except MultiPartException as e:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=e.message)
+        company = form.get("company") or None
+        for file in form.getlist("files"):
+            if isinstance(file, str):
+                continue
+            items.append((Path(file.filename).stem, parse_bulk_job_file(file, company, settings)))
+    else:
+        body = b"".join([chunk async for chunk in read_capped(request, settings.MAX_FILE_SIZE)])
+        for line in body.decode("utf-8", errors="replace").splitlines():
+            if not line.strip():
+                continue
+            try:
+                item = json.loads(line)
+            except ValueError as e:
+                items.append((None, ValueError(f"Invalid JSON: {str(e)}")))
+                continue
+            title = item.get("title") if isinstance(item, dict) else None
+            items.append((title if isinstance(title, str) else None, parse_bulk_job(item, settings)))
+    
+    try:
+        if not items:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="No job descriptions provided"
+            )
+    
+        if len(items) > settings.BULK_JOB_MAX_ITEMS:
+            for _, parse in items:
+                if asyncio.iscoroutine(parse):
+                    parse.close()
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Too many job descriptions. Maximum: {settings.BULK_JOB_MAX_ITEMS}"
+            )
+    
+        # Parse with bounded parallelism; each parse waits on the LLM or the disk
+        semaphore = asyncio.Semaphore(settings.BULK_JOB_CONCURRENCY)
+    
+        async def run(parse):
+            if isinstance(parse, Exception):
+                return parse
+            async with semaphore:
+                try:
+                    return await parse
+                except HTTPException as e:
+                    return ValueError(e.detail)
+                except Exception as e:
+                    return e
+    
+        parsed = await asyncio.gather(*(run(parse) for _, parse in items))
+    finally:
+        # Every file was staged to disk by its parse, if it got that far
+        if form is not None:
+            await form.close()
+    
+    jobs = [job_data for job_data in parsed if not isinstance(job_data, Exception)]
+    if jobs:
+        try:
+            await save_job_descriptions(jobs, settings)
+        except Exception as e:
+            logger.error(f"Error saving {len(jobs)} job descriptions: {str(e)}")
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail=f"Error saving job descriptions: {str(e)}"
+            )
+    
+    results = []
+    for index, ((title, _), outcome) in enumerate(zip(items, parsed)):
+        if isinstance(outcome, Exception):
+            logger.error(f"Error processing bulk job description {index}: {str(outcome)}")
+            results.append(BulkJobResult(index=index, title=title, error=str(outcome)))
+        else:
+            results.append(BulkJobResult(index=index, title=outcome.get("title", title), id=outcome["id"]))
+    
+    logger.info(f"Created {len(jobs)} of {len(items)} job descriptions in bulk")
+    
+    return BulkJobResponse(created=len(jobs), failed=len(items) - len(jobs), results=results)
@@ -1,20 +1,38 @@
 import logging
-from fastapi import APIRouter, Depends, UploadFile, File, Form, HTTPException, status, BackgroundTasks
-from fastapi.responses import FileResponse
-from typing import List, Dict
-from pathlib import Path
-import pandas as pd
+from fastapi import APIRouter, Depends, UploadFile, File, Form, Header, HTTPException, Query, Request, Response, status
+from fastapi.responses import StreamingResponse
+from typing import AsyncIterator, List, Dict, Optional, Tuple
 from datetime import datetime
-import shutil
 import json
 
 from app.config import get_settings
-from app.api.dependencies import validate_file
-from app.api.models.match import MatchScore
-from app.services.text_extraction import extract_text_from_file
-from app.services.cv_parser import extract_information
-from app.services.matcher import calculate_match_score
-from app.services.storage import get_job_description, get_job_descriptions
+from app.api.dependencies import admit_uploads, stage_uploads
+from app.api.models.match import BatchMatchResult, MatchResult, MatchScore
+from app.api.streaming import error_detail, file_error, ndjson_response, sse_event, wants_ndjson
+from app.services.executors import run_cpu, run_io
+from app.services.exports import Sheet, export_format, export_response
+from app.services.match_runs import MatchRun, RunIdInUseError, TooManyPendingRunsError, match_runs
+from app.services.match_store import (
+    MatchRunExistsError, get_match_run, iter_match_results, save_match_results, save_match_run, save_matches_by_job
+)
+from app.services.archives import ArchiveEntry, UploadSource
+from app.services.duplicates import BatchDuplicates
+from app.services.resume_pipeline import (
+    FileProcessingError,
+    expand_archives,
+    parse_resume_file,
+    process_as_completed,
+    release_uploads,
+    remove_upload
+)
+from app.services.matcher import calculate_match_score, rank_jobs, rank_resumes_by_job
+from app.services.candidate_ranking import rank_candidate_pool
+from app.services.async_storage import (
+    get_job_description,
+    get_job_profiles,
+    get_job_with_profile,
+    get_jobs_with_profiles_by_ids
+)
 # from huggingface_hub import InferenceClient
 from openai import OpenAI
 
@@ -23,27 +41,380 @@ logger = logging.getLogger(__name__)
 router = APIRouter(tags=["Resume-Job Matching"])
 
 
-@router.post("/match", response_model=List[MatchScore])
+def validate_match_limits(min_score: Optional[float], top_k: Optional[int]) -> None:
+    """Validate the optional min_score/top_k limits of a matching request."""
+    if min_score is not None and not 0 <= min_score <= 100:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="min_score must be between 0 and 100"
+        )
+    
+    if top_k is not None and top_k < 1:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="top_k must be at least 1"
+        )
+
+
+async def assess_match(client: OpenAI, job: Dict, text: str, file_name: str, match_score: Dict, settings) -> Dict:
+    """Get the AI assessment of a resume against a job, falling back to `match_score` if the answer is not JSON."""
+    prompt = f"""
+        Given the following job description and resume, evaluate the match and respond in the following JSON format:
+
+        {{
+                "resume_id": "<resume_file_id>",
+                "resume_name": "<resume_owner_name>",
+                "job_id": "<job_id>",
+                "job_title": "<job_title>",
+                "overall_score": <int>,
+                "skills_score": <float>,
+                "education_score": <float>,
+                "experience_score": <float>,
+                "keyword_match_score": <float>,
+                "matched_skills": [<list of matched skills which are present in JD, nothing else should be present>],
+                "matched_education": [<list of matched education qualifications>],
+                "matched_experience_keywords": [<list of experience-related keywords or phrases that matches with JD>],
+                "missing_skills": [<list of important skills in JD that are missing in resume>]
+            }}
+
+        Here is the job description:
+        {job['description']}
+
+        Here is the resume:
+        {text}
+
+        The scores should be on a scale of 0 to 100. Extract skills, education, experience, and relevant keywords carefully. 
+        Return only the JSON structure, don't send any other data than the JSON.
+    """
+
+    response = await run_io(
+        settings,
+        client.chat.completions.create,
+        model="meta-llama/Llama-4-Scout-17B-16E-Instruct",
+        messages=[{"role": "user", "content": prompt}],
+    )
+    
+    # Parse the response content
+    content = response.choices[0].message.content
+    json_str = content.strip('`json\n').strip()
+
+    # Use non-streaming response for now
+    # completion = client.chat.completions.create(
+    #     model="Qwen/Qwen3-32B", 
+    #     messages=[{"role": "user", "content": prompt}]
+    # )
+
+    # json_str = completion.choices[0].message.content
+    
+    try:
+        # Remove any content between <think> and </think> tags
+        
+        while '<think>' in json_str and '</think>' in json_str:
+            start = json_str.find('<think>')
+            end = json_str.find('</think>') + len('</think>')
+            json_str = json_str[:start] + json_str[end:]
+        
+        # Parse the cleaned json_str
+        assessment = json.loads(json_str)
+        logger.info(f"Successfully parsed AI assessment for {file_name}")
+        return assessment
+    except json.JSONDecodeError as e:
+        logger.error(f"Invalid JSON response from AI: {json_str}")
+        return match_score
+
+
+def ranking_summary(matches: List[Dict], top_k: Optional[int]) -> List[Dict]:
+    """The best top_k of streamed matches, as `{"resume_id", "overall_score"}`, best first."""
+    ranked = sorted(matches, key=lambda match: float(match["overall_score"]), reverse=True)
+    return [
+        {"resume_id": match["resume_id"], "overall_score": match["overall_score"]}
+        for match in (ranked[:top_k] if top_k else ranked)
+    ]
+
+
+async def match_resume(
+    run: MatchRun,
+    position: int,
+    file_name: str,
+    source: UploadSource,
+    duplicates: BatchDuplicates,
+    client: OpenAI,
+    job: Dict,
+    job_profile: Dict,
+    min_score: Optional[float],
+    settings
+) -> Optional[Dict]:
+    """
+    Parse, score and assess one resume of a `/match` run and save the match
+    to the run; None if it does not reach min_score.
+    
+    Copies of one resume in the run share its AI assessment.
+    """
+    # Archive entries reach the "uploaded" stage once they are read from the archive
+    progress = run.file(position, file_name, None if isinstance(source, ArchiveEntry) else "uploaded")
+    try:
+        text, parsed_resume = await parse_resume_file(source, file_name, settings, progress, duplicates)
+        match_score = await run_cpu(settings, calculate_match_score, parsed_resume, job, job_profile, min_score)
+        progress.reached("scored")
+        if match_score is None:
+            # Cannot reach min_score, so skip the AI assessment
+            return None
+        assessment, first = await duplicates.once(
+            ("assessment", parsed_resume["id"]),
+            lambda: assess_match(client, job, text, file_name, match_score, settings)
+        )
+        assessment = MatchScore(**assessment).dict()
+        if not first:
+            assessment["resume_id"] = match_score["resume_id"]
+        progress.reached("assessed")
+        # The AI assessment may score differently from the traditional matcher
+        if min_score is not None and assessment["overall_score"] < min_score:
+            return None
+        await run_io(settings, save_match_results, run.id, job["id"], [assessment], settings)
+        return assessment
+    except FileProcessingError as e:
+        progress.failed(e.detail)
+        raise
+    except Exception as e:
+        progress.failed(error_detail(e))
+        raise FileProcessingError(progress.pending_stage, e) from e
+
+
+async def stream_job_matches(
+    items: List[Tuple[str, UploadSource]],
+    run: MatchRun,
+    client: OpenAI,
+    job: Dict,
+    job_profile: Dict,
+    min_score: Optional[float],
+    top_k: Optional[int],
+    settings
+) -> AsyncIterator[Dict]:
+    """NDJSON lines for `/match`: each assessed resume as soon as it is ready, then a ranking summary."""
+    duplicates = BatchDuplicates()
+    
+    async def match(position: int) -> Optional[Dict]:
+        file_name, source = items[position]
+        return await match_resume(
+            run, position, file_name, source, duplicates, client, job, job_profile, min_score, settings
+        )
+    
+    matches = []
+    failed = 0
+    try:
+        async for position, match_score, error in process_as_completed(range(len(items)), match, settings.UPLOAD_CONCURRENCY):
+            file_name = items[position][0]
+            if error:
+                failed += 1
+                logger.error(f"Error processing file {file_name}: {error_detail(error)}")
+                yield {"type": "error", "file_name": file_name, "stage": getattr(error, "stage", None), "detail": error_detail(error)}
+            elif match_score is not None:
+                matches.append(match_score)
+                yield {"type": "result", "file_name": file_name, "data": match_score}
+        
+        run.complete(matched=len(matches), failed=failed)
+        yield {
+            "type": "summary",
+            "run_id": run.id,
+            "job_id": job.get("id"),
+            "total": len(items),
+            "matched": len(matches),
+            "failed": failed,
+            "ranking": ranking_summary(matches, top_k),
+        }
+    finally:
+        if run.status != "completed":
+            run.complete(cancelled=True)
+        release_uploads(items, settings)
+
+
+async def stream_batch_matches(
+    items: List[Tuple[str, UploadSource]],
+    run: MatchRun,
+    jobs: Dict[str, Tuple[Dict, Dict]],
+    min_score: Optional[float],
+    top_k: Optional[int],
+    settings
+) -> AsyncIterator[Dict]:
+    """
+    NDJSON lines for `/batch-match`: each resume's matches as soon as it is
+    scored, then per-job rankings.
+    
+    With top_k, only the best top_k matches per job so far are kept, and a
+    match that cannot enter them is neither streamed nor saved. The kept
+    matches are saved in one go before the summary.
+    """
+    duplicates = BatchDuplicates()
+    # Best first, ties in the order they were scored, as `ranking_summary` orders them
+    matches = {job_id: [] for job_id in jobs}
+    
+    def cutoff() -> Optional[float]:
+        """Score a match must reach to enter the top_k of at least one job."""
+        if not top_k or any(len(job_matches) < top_k for job_matches in matches.values()):
+            return min_score
+        lowest = min(float(job_matches[-1]["overall_score"]) for job_matches in matches.values())
+        return lowest if min_score is None else max(min_score, lowest)
+    
+    def keep(match_score: Dict) -> bool:
+        """Add a match to its job's top_k, if it makes it."""
+        job_matches = matches[match_score["job_id"]]
+        score = float(match_score["overall_score"])
+        if top_k and len(job_matches) >= top_k and score <= float(job_matches[-1]["overall_score"]):
+            return False
+        position = next(
+            (index for index, kept in enumerate(job_matches) if float(kept["overall_score"]) < score),
+            len(job_matches)
+        )
+        job_matches.insert(position, match_score)
+        if top_k:
+            del job_matches[top_k:]
+        return True
+    
+    async def match(position: int) -> List[Dict]:
+        file_name, source = items[position]
+        progress = run.file(position, file_name, "uploaded")
+        try:
+            _, parsed_resume = await parse_resume_file(source, file_name, settings, progress, duplicates)
+            job_matches = await run_cpu(settings, rank_jobs, parsed_resume, list(jobs.values()), None, cutoff())
+            progress.reached("scored")
+            return job_matches
+        except FileProcessingError as e:
+            progress.failed(e.detail)
+            raise
+        except Exception as e:
+            progress.failed(error_detail(e))
+            raise FileProcessingError(progress.pending_stage, e) from e
+    
+    failed = 0
+    try:
+        async for position, job_matches, error in process_as_completed(range(len(items)), match, settings.UPLOAD_CONCURRENCY):
+            file_name = items[position][0]
+            if error:
+                failed += 1
+                logger.error(f"Error processing file {file_name}: {error_detail(error)}")
+                yield {"type": "error", "file_name": file_name, "stage": getattr(error, "stage", None), "detail": error_detail(error)}
+                continue
+            for match_score in job_matches:
+                if keep(match_score):
+                    yield {"type": "result", "file_name": file_name, "job_id": match_score["job_id"], "data": match_score}
+        
+        await run_io(settings, save_matches_by_job, run.id, matches, settings)
+        run.complete(succeeded=len(items) - failed, failed=failed)
+        yield {
+            "type": "summary",
+            "run_id": run.id,
+            "total": len(items),
+            "failed": failed,
+            "ranking": {job_id: ranking_summary(job_matches, top_k) for job_id, job_matches in matches.items()},
+        }
+    finally:
+        if run.status != "completed":
+            run.complete(cancelled=True)
+        release_uploads(items, settings)
+
+
+def begin_match_run(run_id: Optional[str], settings) -> MatchRun:
+    """Claim the match run of a request."""
+    if run_id is not None and not 0 < len(run_id) <= 100:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="run_id must be 1 to 100 characters"
+        )
+    try:
+        run = match_runs.begin(run_id, settings)
+    except RunIdInUseError as e:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=str(e)
+        )
+    return run
+
+
+async def stage_run_uploads(
+    files: List[UploadFile],
+    run: MatchRun,
+    job_ids: List[str],
+    settings,
+    archives: bool = False
+) -> List[Tuple[str, UploadSource]]:
+    """
+    Record a match run in the match store, save its uploads, announce its
+    files and record the "uploaded" stage of each.
+    
+    With `archives`, ZIP archives are replaced by their entries, which reach
+    the "uploaded" stage once they are read from the archive.
+    """
+    copy_seconds = {}
+    try:
+        await run_io(settings, save_match_run, run.id, job_ids, settings)
+        staged = await stage_uploads(files, settings, on_saved=copy_seconds.__setitem__, archives=archives)
+        items = await run_io(settings, expand_archives, staged, settings)
+    except MatchRunExistsError as e:
+        run.complete(error=str(e))
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=str(e)
+        )
+    except Exception as e:
+        run.complete(error=error_detail(e))
+        raise
+    
+    run.start(len(items), file_names=[file_name for file_name, _ in items], job_ids=job_ids)
+    seconds = {file_path: copy_seconds[position] for position, (_, file_path) in enumerate(staged)}
+    for position, (file_name, source) in enumerate(items):
+        if not isinstance(source, ArchiveEntry):
+            run.file(position, file_name).reached("uploaded", seconds[source])
+    return items
+
+
+@router.post("/match", response_model=List[MatchResult], dependencies=[Depends(admit_uploads)])
 async def match_resumes_to_job(
+    response: Response,
     job_id: str = Form(...),
     files: List[UploadFile] = File(...),
+    min_score: Optional[float] = Form(None),
+    top_k: Optional[int] = Form(None),
+    run_id: Optional[str] = Form(None),
+    stream: bool = Depends(wants_ndjson),
     settings = Depends(get_settings)
 ):
     """
     Match uploaded resumes against a job description using traditional matching and AI inference.
     
     - **job_id**: ID of the job description to match against
-    - **files**: List of CV/Resume files to match
+    - **files**: List of CV/Resume files to match, or ZIP archives of them
+    - **min_score**: Only return matches with at least this overall score (0-100) (optional)
+    - **top_k**: Only return the best top_k matches (optional)
+    - **run_id**: ID to follow this request's progress under at `/match-runs/{run_id}/events` (optional)
+    
+    The run ID is returned in the `X-Match-Run-Id` response header.
+    
+    Files are matched UPLOAD_CONCURRENCY at a time. The resumes in a ZIP
+    archive are read straight from it and named `archive.zip/path/in/archive`.
+    Repeated files are parsed and assessed once.
+    
+    Returns one envelope per match, best first: `{"status": "ok", "data"}`
+    with the match, then `{"status": "error", "error": {"stage", "reason"}}`
+    for each file that could not be matched, so one bad file does not fail
+    the others. Files below min_score or outside top_k are left out.
+    
+    With `Accept: application/x-ndjson`, each match is streamed as soon as
+    it is ready, as a `{"type": "result"}` line; the final
+    `{"type": "summary"}` line ranks the best top_k.
     """
-    # Get job description
-    job = get_job_description(job_id, settings)
+    validate_match_limits(min_score, top_k)
+    
+    # Get job description and its precomputed match profile
+    job_entry = await get_job_with_profile(job_id, settings)
     
-    if not job:
+    if not job_entry:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=f"Job description with ID {job_id} not found"
         )
     
+    job, job_profile = job_entry
+    
     # Initialize Hugging Face client
     # client = InferenceClient(
     #     provider="cerebras",
@@ -62,114 +433,59 @@ async def match_resumes_to_job(
             detail="No files provided"
         )
     
+    run = begin_match_run(run_id, settings)
+    response.headers["X-Match-Run-Id"] = run.id
+    items = await stage_run_uploads(files, run, [job_id], settings, archives=True)
+    
+    if stream:
+        return ndjson_response(
+            stream_job_matches(items, run, client, job, job_profile, min_score, top_k, settings),
+            headers={"X-Match-Run-Id": run.id}
+        )
+    
+    duplicates = BatchDuplicates()
+    
+    async def match(position: int) -> Optional[Dict]:
+        file_name, source = items[position]
+        return await match_resume(
+            run, position, file_name, source, duplicates, client, job, job_profile, min_score, settings
+        )
+    
     match_results = []
+    errors = {}
+    try:
+        async for position, match_score, error in process_as_completed(range(len(items)), match, settings.UPLOAD_CONCURRENCY):
+            file_name = items[position][0]
+            if error:
+                logger.error(f"Error processing file {file_name}: {error_detail(error)}")
+                errors[position] = file_error(file_name, error)
+                continue
+            if match_score is None:
+                logger.info(f"Resume {file_name} is below min_score {min_score} for job {job_id}")
+                continue
+            match_results.append({"file_name": file_name, "status": "ok", "data": match_score})
+            logger.info(f"Successfully matched resume {file_name} with job {job_id}")
+    finally:
+        release_uploads(items, settings)
     
-    for file in files:
-        validate_file(file, settings)
-        
-        # Save file temporarily
-        file_id = f"{id(file)}"
-        file_path = Path(settings.UPLOAD_DIR) / f"{file_id}_{file.filename}"
-        
-        try:
-            with open(file_path, "wb") as buffer:
-                shutil.copyfileobj(file.file, buffer)
-            
-            # Extract text based on file type
-            text = extract_text_from_file(str(file_path))
-            
-            # Parse the resume
-            parsed_resume = extract_information(text, settings)
-            parsed_resume["file_name"] = file.filename
-            
-            # Calculate traditional match score
-            match_score = calculate_match_score(parsed_resume, job)
-            
-            # Get AI inference on match
-            prompt = f"""
-                Given the following job description and resume, evaluate the match and respond in the following JSON format:
-
-                {{
-                        "resume_id": "<resume_file_id>",
-                        "resume_name": "<resume_owner_name>",
-                        "job_id": "<job_id>",
-                        "job_title": "<job_title>",
-                        "overall_score": <int>,
-                        "skills_score": <float>,
-                        "education_score": <float>,
-                        "experience_score": <float>,
-                        "keyword_match_score": <float>,
-                        "matched_skills": [<list of matched skills which are present in JD, nothing else should be present>],
-                        "matched_education": [<list of matched education qualifications>],
-                        "matched_experience_keywords": [<list of experience-related keywords or phrases that matches with JD>],
-                        "missing_skills": [<list of important skills in JD that are missing in resume>]
-                    }}
-
-                Here is the job description:
-                {job['description']}
-
-                Here is the resume:
-                {text}
-
-                The scores should be on a scale of 0 to 100. Extract skills, education, experience, and relevant keywords carefully. 
-                Return only the JSON structure, don't send any other data than the JSON.
-            """
-
-            response = client.chat.completions.create(
-                model="meta-llama/Llama-4-Scout-17B-16E-Instruct",
-                messages=[{"role": "user", "content": prompt}],
-            )
-            
-            # Parse the response content
-            content = response.choices[0].message.content
-            json_str = content.strip('`json\n').strip()
-
-            # Use non-streaming response for now
-            # completion = client.chat.completions.create(
-            #     model="Qwen/Qwen3-32B", 
-            #     messages=[{"role": "user", "content": prompt}]
-            # )
-
-            # json_str = completion.choices[0].message.content
-            
-            try:
-                # Remove any content between <think> and </think> tags
-                
-                while '<think>' in json_str and '</think>' in json_str:
-                    start = json_str.find('<think>')
-                    end = json_str.find('</think>') + len('</think>')
-                    json_str = json_str[:start] + json_str[end:]
-                
-                # Parse the cleaned json_str
-                assessment = json.loads(json_str)
-                logger.info(f"Successfully parsed AI assessment for {file.filename}")
-                match_results.append(assessment)
-            except json.JSONDecodeError as e:
-                logger.error(f"Invalid JSON response from AI: {json_str}")
-                match_results.append(match_score)
-            
-            logger.info(f"Successfully matched resume {file.filename} with job {job_id}")
-            
-        except Exception as e:
-            logger.error(f"Error processing file {file.filename}: {str(e)}")
-            raise HTTPException(
-                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                detail=f"Error processing file {file.filename}: {str(e)}"
-            )
-        finally:
-            if settings.CLEANUP_FILES and file_path.exists():
-                file_path.unlink()
+    run.complete(matched=len(match_results), failed=len(errors))
     
     # Sort results by overall score (descending)
-    match_results.sort(key=lambda x: int(x["overall_score"]), reverse=True)
+    match_results.sort(key=lambda x: int(x["data"]["overall_score"]), reverse=True)
     
-    return match_results
+    # Failed files follow the matches, in upload order
+    return (match_results[:top_k] if top_k else match_results) + [errors[position] for position in sorted(errors)]
 
 
-@router.post("/batch-match", response_model=Dict[str, List[MatchScore]])
+@router.post("/batch-match", response_model=BatchMatchResult, dependencies=[Depends(admit_uploads)])
 async def batch_match_resumes_to_jobs(
+    response: Response,
     files: List[UploadFile] = File(...),
     job_ids: str = Form(...),
+    min_score: Optional[float] = Form(None),
+    top_k: Optional[int] = Form(None),
+    run_id: Optional[str] = Form(None),
+    stream: bool = Depends(wants_ndjson),
     settings = Depends(get_settings)
 ):
     """
@@ -177,7 +493,23 @@ async def batch_match_resumes_to_jobs(
     
     - **files**: List of CV/Resume files to match
     - **job_ids**: Comma-separated list of job IDs to match against
+    - **min_score**: Only return matches with at least this overall score (0-100) (optional)
+    - **top_k**: Only return the best top_k matches per job (optional)
+    - **run_id**: ID to follow this request's progress under at `/match-runs/{run_id}/events` (optional)
+    
+    IDs that match no stored job are listed in the `X-Missing-Job-Ids` response header,
+    and the run ID is returned in the `X-Match-Run-Id` header.
+    
+    Returns the matches per job ID, best first, and one envelope per file
+    in `files`: `{"status": "ok"}`, or `{"status": "error", "error": {"stage", "reason"}}`
+    for a file that could not be parsed and is left out of the matches.
+    
+    With `Accept: application/x-ndjson`, each resume is streamed as soon as
+    it is scored, as one `{"type": "result", "job_id"}` line per matching
+    job; the final `{"type": "summary"}` line ranks the best top_k per job.
     """
+    validate_match_limits(min_score, top_k)
+    
     # Parse job IDs
     job_id_list = [job_id.strip() for job_id in job_ids.split(",") if job_id.strip()]
     
@@ -187,12 +519,13 @@ async def batch_match_resumes_to_jobs(
             detail="No job IDs provided"
         )
     
-    # Get job descriptions
-    jobs = {}
-    for job_id in job_id_list:
-        job = get_job_description(job_id, settings)
-        if job:
-            jobs[job_id] = job
+    # Get job descriptions and their precomputed match profiles in one query
+    job_entries, missing_job_ids = await get_jobs_with_profiles_by_ids(job_id_list, settings)
+    jobs = {job["id"]: (job, job_profile) for job, job_profile in job_entries}
+    
+    if missing_job_ids:
+        logger.warning(f"Job descriptions not found: {', '.join(missing_job_ids)}")
+        response.headers["X-Missing-Job-Ids"] = ",".join(missing_job_ids)
     
     if not jobs:
         raise HTTPException(
@@ -207,149 +540,304 @@ async def batch_match_resumes_to_jobs(
             detail="No files provided"
         )
     
-    # Parse all resumes first
-    parsed_resumes = []
-    for file in files:
-        validate_file(file, settings)
-        
-        # Save file temporarily
-        file_id = f"{id(file)}"
-        file_path = Path(settings.UPLOAD_DIR) / f"{file_id}_{file.filename}"
-        
-        try:
-            with open(file_path, "wb") as buffer:
-                shutil.copyfileobj(file.file, buffer)
-            
-            # Extract text based on file type
-            text = extract_text_from_file(str(file_path))
-            
-            # Parse the resume
-            parsed_resume = extract_information(text, settings)
-            parsed_resume["file_name"] = file.filename
-            parsed_resumes.append(parsed_resume)
-            
-            logger.info(f"Successfully parsed resume: {file.filename}")
-            
-        except Exception as e:
-            logger.error(f"Error processing file {file.filename}: {str(e)}")
-            raise HTTPException(
-                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                detail=f"Error processing file {file.filename}: {str(e)}"
-            )
-        finally:
-            if settings.CLEANUP_FILES and file_path.exists():
-                file_path.unlink()
-    
-    # Match against each job
-    results = {}
-    for job_id, job in jobs.items():
-        job_matches = []
-        for resume in parsed_resumes:
-            match_score = calculate_match_score(resume, job)
-            job_matches.append(match_score)
+    run = begin_match_run(run_id, settings)
+    response.headers["X-Match-Run-Id"] = run.id
+    items = await stage_run_uploads(files, run, list(jobs), settings)
+    
+    if stream:
+        headers = {"X-Match-Run-Id": run.id}
+        if missing_job_ids:
+            headers["X-Missing-Job-Ids"] = ",".join(missing_job_ids)
+        return ndjson_response(stream_batch_matches(items, run, jobs, min_score, top_k, settings), headers=headers)
+    
+    duplicates = BatchDuplicates()
+    progresses = [run.file(position, file_name, "uploaded") for position, (file_name, _) in enumerate(items)]
+    
+    async def parse(position: int) -> Dict:
+        file_name, source = items[position]
+        # Extract, parse and store the resume
+        _, parsed_resume = await parse_resume_file(source, file_name, settings, progresses[position], duplicates)
+        return parsed_resume
+    
+    # Parse all resumes first, UPLOAD_CONCURRENCY at a time
+    parsed = {}
+    file_results = [None] * len(items)
+    try:
+        async for position, parsed_resume, error in process_as_completed(range(len(items)), parse, settings.UPLOAD_CONCURRENCY):
+            file_name = items[position][0]
+            if error:
+                logger.error(f"Error processing file {file_name}: {error_detail(error)}")
+                progresses[position].failed(error_detail(error))
+                file_results[position] = file_error(file_name, error)
+                continue
+            parsed[position] = parsed_resume
+            file_results[position] = {"file_name": file_name, "status": "ok"}
+            logger.info(f"Successfully parsed resume: {file_name}")
+    finally:
+        release_uploads(items, settings)
+    
+    # Rank against every job in one call, best matches first, and save them together
+    parsed_resumes = [parsed[position] for position in sorted(parsed)]
+    results = await run_cpu(settings, rank_resumes_by_job, parsed_resumes, jobs, top_k, min_score)
+    await run_io(settings, save_matches_by_job, run.id, results, settings)
+    
+    logger.info(f"Completed matching {len(parsed_resumes)} resumes against {len(jobs)} jobs")
+    
+    for position in parsed:
+        progresses[position].reached("scored")
+    run.complete(succeeded=len(parsed_resumes), failed=len(file_results) - len(parsed_resumes))
+    
+    return {"matches": results, "files": file_results}
+
+
+@router.get("/match-runs/{run_id}/events")
+async def stream_match_run_events(
+    run_id: str,
+    request: Request,
+    last_event_id: Optional[str] = Header(None),
+    settings = Depends(get_settings)
+):
+    """
+    Follow the progress of a `/match` or `/batch-match` request as Server-Sent Events.
+    
+    - **run_id**: ID of the match run, from the `run_id` form field or the `X-Match-Run-Id` header
+    
+    Events are `started`, one `stage` per file and stage reached (uploaded,
+    extracted, parsed, scored, assessed) with its `duration_ms`, `failed`
+    for a file that errored, and a final `completed`. Subscribing before the
+    match request is sent, or reconnecting with `Last-Event-ID`, replays
+    every event not yet seen; the stream ends after `completed`, or with
+    `expired` when the run is dropped first, e.g. because no match request
+    claimed it within MATCH_RUN_PENDING_TIMEOUT seconds.
+    """
+    try:
+        run = match_runs.subscribe(run_id, settings)
+    except TooManyPendingRunsError as e:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail=str(e)
+        )
+    seen = int(last_event_id) if last_event_id and last_event_id.isdigit() else 0
+    
+    async def events() -> AsyncIterator[str]:
+        nonlocal seen
+        while True:
+            for event in run.events[seen:]:
+                yield sse_event(event["id"], event["event"], event["data"])
+            seen = len(run.events)
+            if run.status == "completed" or await request.is_disconnected():
+                return
+            if match_runs.get(run_id, settings) is not run:
+                yield sse_event(seen + 1, "expired", {"run_id": run_id})
+                return
+            if not await run.wait(seen, settings.MATCH_RUN_KEEPALIVE):
+                # Keep proxies from closing an idle connection
+                yield ": keepalive\n\n"
+    
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+@router.get("/job/{job_id}/candidates", response_model=List[MatchScore])
+async def get_best_candidates(
+    job_id: str,
+    top_k: int = Query(10, ge=1, le=1000),
+    skills: Optional[str] = Query(None),
+    min_score: Optional[float] = Query(None, ge=0, le=100),
+    settings = Depends(get_settings)
+):
+    """
+    Rank the stored resume pool against a job description.
+    
+    - **job_id**: ID of the job description to rank candidates for
+    - **top_k**: Number of best candidates to return (default: 10)
+    - **skills**: Comma-separated list of skills every candidate must have (optional)
+    - **min_score**: Only return candidates with at least this overall score (0-100) (optional)
+    """
+    job_entry = await get_job_with_profile(job_id, settings)
+    
+    if not job_entry:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Job description with ID {job_id} not found"
+        )
+    
+    job, job_profile = job_entry
+    
+    required_skills = skills.split(",") if skills else None
+    
+    # In the I/O pool: the ranker keeps the pool as arrays in this process and
+    # scores it in bulk, so there is nothing to gain from a CPU worker
+    results = await run_io(settings, rank_candidate_pool, job, job_profile, top_k, min_score, required_skills, settings)
+    
+    logger.info(f"Ranked the stored resumes against job {job_id}")
+    
+    return results
+
+
+@router.post("/resume/match-jobs", response_model=List[MatchScore], dependencies=[Depends(admit_uploads)])
+async def match_resume_to_jobs(
+    file: UploadFile = File(...),
+    top_k: int = Form(10),
+    company: Optional[str] = Form(None),
+    title: Optional[str] = Form(None),
+    min_score: Optional[float] = Form(None),
+    settings = Depends(get_settings)
+):
+    """
+    Rank all stored job descriptions for one uploaded resume.
+    
+    - **file**: CV/Resume file to match
+    - **top_k**: Number of best matching jobs to return (default: 10)
+    - **company**: Only match jobs from this company (optional)
+    - **title**: Only match jobs whose title contains this keyword (optional)
+    - **min_score**: Only return jobs with at least this overall score (0-100) (optional)
+    """
+    validate_match_limits(min_score, top_k)
+    
+    [(_, file_path)] = await stage_uploads([file], settings)
+    
+    try:
+        # Extract, parse and store the resume once for every job
+        _, parsed_resume = await parse_resume_file(file_path, file.filename, settings)
         
-        # Sort matches by overall score (descending)
-        job_matches.sort(key=lambda x: x["overall_score"], reverse=True)
-        results[job_id] = job_matches
+        logger.info(f"Successfully parsed resume: {file.filename}")
         
-        logger.info(f"Completed matching {len(parsed_resumes)} resumes against job {job_id}")
+    except Exception as e:
+        logger.error(f"Error processing file {file.filename}: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Error processing file {file.filename}: {str(e)}"
+        )
+    finally:
+        remove_upload(file_path, settings)
+    
+    jobs = await get_job_profiles(settings, company=company, title_keyword=title)
+    # In the I/O pool: sending every job to a CPU worker would cost more than scoring them
+    results = await run_io(settings, rank_jobs, parsed_resume, jobs, top_k, min_score)
+    
+    logger.info(f"Ranked {len(jobs)} job descriptions for resume {file.filename}")
     
     return results
 
 
-@router.post("/export-matches/{job_id}")
+MATCH_COLUMNS = [
+    "Resume Name", "Resume File", "Job Title", "Overall Match Score", "Skills Score", "Education Score",
+    "Experience Score", "Keyword Match", "Matched Skills", "Missing Skills", "Matched Education",
+    "Matched Experience",
+]
+
+
+def match_row(match: Dict) -> Dict:
+    """Flatten a match into one export row."""
+    return {
+        "Resume Name": match["resume_name"],
+        "Resume File": match["resume_id"],
+        "Job Title": match["job_title"],
+        "Overall Match Score": f"{match['overall_score']}%",
+        "Skills Score": f"{match['skills_score']}%",
+        "Education Score": f"{match['education_score']}%",
+        "Experience Score": f"{match['experience_score']}%",
+        "Keyword Match": f"{match['keyword_match_score']}%",
+        "Matched Skills": ", ".join(match["matched_skills"]),
+        "Missing Skills": ", ".join(match["missing_skills"]),
+        "Matched Education": ", ".join(match["matched_education"]),
+        "Matched Experience": ", ".join(match["matched_experience_keywords"]),
+    }
+
+
+def job_rows(job: Dict) -> List[Dict]:
+    """The job description as `Field`/`Value` export rows."""
+    return [
+        {"Field": "Title", "Value": job.get("title", "")},
+        {"Field": "Company", "Value": job.get("company", "")},
+        {"Field": "Required Skills", "Value": ", ".join(job.get("required_skills", []))},
+        {"Field": "Preferred Skills", "Value": ", ".join(job.get("preferred_skills", []))},
+        {"Field": "Education Requirements", "Value": ", ".join(job.get("education_requirements", []))},
+        {"Field": "Experience Requirements", "Value": ", ".join(job.get("experience_requirements", []))},
+    ]
+
+
+async def export_match_run(run_id: str, export: str, settings) -> StreamingResponse:
+    """Stream the saved matches of a run as an `export` file, reading them from the match store as it is written."""
+    stored_run = await run_io(settings, get_match_run, run_id, settings)
+    if not stored_run:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Match run with ID {run_id} not found"
+        )
+    
+    sheets = [Sheet(
+        "Match Results",
+        lambda: (match_row(match) for match in iter_match_results(run_id, settings)),
+        MATCH_COLUMNS
+    )]
+    # One job's description fits a second sheet
+    if len(stored_run["job_ids"]) == 1:
+        job = await get_job_description(stored_run["job_ids"][0], settings)
+        if job:
+            sheets.append(Sheet("Job Description", lambda: job_rows(job), ["Field", "Value"]))
+    
+    logger.info(f"Exporting match run {run_id} as {export}")
+    return export_response(
+        sheets, export, f"match_run_{run_id}_{datetime.now().strftime('%Y%m%d_%H%M%S')}", settings
+    )
+
+
+@router.get("/match-runs/{run_id}/export")
+async def export_match_run_results(
+    run_id: str,
+    format: str = Query("xlsx"),
+    settings = Depends(get_settings)
+):
+    """
+    Export the matches of an earlier `/match`, `/batch-match` or `/export-matches` request.
+    
+    - **run_id**: ID of the match run, from the `run_id` form field or the `X-Match-Run-Id` header
+    - **format**: "xlsx" (or "excel"), "csv" or "parquet" (default: "xlsx")
+    
+    Matches are read from the match store, grouped by job and best first,
+    so nothing is parsed or assessed again. Matches are saved as the run
+    produces them, so a run still in progress exports the matches so far.
+    The XLSX workbook of a single-job run has a second sheet with the job
+    description.
+    """
+    return await export_match_run(run_id, export_format(format), settings)
+
+
+@router.post("/export-matches/{job_id}", dependencies=[Depends(admit_uploads)])
 async def export_matches(
     job_id: str,
     files: List[UploadFile] = File(...),
+    format: Optional[str] = Form("xlsx"),
+    run_id: Optional[str] = Form(None),
     settings = Depends(get_settings)
 ):
     """
-    Match resumes against a job description and export results to Excel.
+    Match resumes against a job description and export the results.
     
     - **job_id**: ID of the job description to match against
     - **files**: List of CV/Resume files to match
+    - **format**: "xlsx" (or "excel"), "csv" or "parquet" (default: "xlsx")
+    - **run_id**: ID to follow this request's progress under at `/match-runs/{run_id}/events` (optional)
+    
+    The matches are saved as a match run, returned in the `X-Match-Run-Id`
+    header, so `/match-runs/{run_id}/export` can export them again in any
+    format without matching again. Files that could not be matched are
+    left out.
     """
-    # Get matches
-    try:
-        match_results = await match_resumes_to_job(job_id=job_id, files=files, settings=settings)
-    except HTTPException as e:
-        raise e
+    export = export_format(format)
     
-    # Get job description
-    job = get_job_description(job_id, settings)
+    response = Response()
+    await match_resumes_to_job(
+        response=response, job_id=job_id, files=files, min_score=None, top_k=None, run_id=run_id,
+        stream=False, settings=settings
+    )
+    run_id = response.headers["X-Match-Run-Id"]
     
-    # Create Excel file
-    try:
-        # Ensure parsed directory exists
-        Path(settings.PARSED_DIR).mkdir(parents=True, exist_ok=True)
-        
-        # Flatten match results for Excel
-        flattened_data = []
-        for match in match_results:
-            flat_match = {}
-            
-            # Add basic fields
-            flat_match["Resume Name"] = match["resume_name"]
-            flat_match["Resume File"] = match["resume_id"]
-            flat_match["Job Title"] = match["job_title"]
-            flat_match["Overall Match Score"] = f"{match['overall_score']}%"
-            flat_match["Skills Score"] = f"{match['skills_score']}%"
-            flat_match["Education Score"] = f"{match['education_score']}%"
-            flat_match["Experience Score"] = f"{match['experience_score']}%"
-            flat_match["Keyword Match"] = f"{match['keyword_match_score']}%"
-            
-            # Add matched skills
-            flat_match["Matched Skills"] = ", ".join(match["matched_skills"])
-            
-            # Add missing skills
-            flat_match["Missing Skills"] = ", ".join(match["missing_skills"])
-            
-            # Add matched education
-            flat_match["Matched Education"] = ", ".join(match["matched_education"])
-            
-            # Add matched experience
-            flat_match["Matched Experience"] = ", ".join(match["matched_experience_keywords"])
-            
-            flattened_data.append(flat_match)
-        
-        # Create dataframe
-        df = pd.DataFrame(flattened_data)
-        
-        # Generate Excel file
-        excel_path = Path(settings.PARSED_DIR) / f"job_matches_{job_id}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.xlsx"
-        
-        # Create Excel writer with multiple sheets
-        with pd.ExcelWriter(excel_path, engine='openpyxl') as writer:
-            # Write match results to main sheet
-            df.to_excel(writer, sheet_name="Match Results", index=False)
-            
-            # Write job details to second sheet if job exists
-            if job:
-                job_df = pd.DataFrame({
-                    "Field": ["Title", "Company", "Required Skills", "Preferred Skills", "Education Requirements", "Experience Requirements"],
-                    "Value": [
-                        job.get("title", ""),
-                        job.get("company", ""),
-                        ", ".join(job.get("required_skills", [])),
-                        ", ".join(job.get("preferred_skills", [])),
-                        ", ".join(job.get("education_requirements", [])),
-                        ", ".join(job.get("experience_requirements", []))
-                    ]
-                })
-                job_df.to_excel(writer, sheet_name="Job Description", index=False)
-        
-        logger.info(f"Generated Excel report for job {job_id} with {len(match_results)} matches")
-        
-        # Return Excel file
-        return FileResponse(
-            path=str(excel_path),
-            media_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-            filename=excel_path.name,
-            background=BackgroundTasks(lambda: excel_path.unlink(missing_ok=True))  # Clean up the file after sending
-        )
-    except Exception as e:
-        logger.error(f"Error generating Excel file: {str(e)}")
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Error generating Excel file: {str(e)}"
-        )
\ No newline at end of file
+    export_file = await export_match_run(run_id, export, settings)
+    export_file.headers["X-Match-Run-Id"] = run_id
+    return export_file
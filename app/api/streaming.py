@@ -0,0 +1,46 @@
+import json
+from typing import AsyncIterator, Dict, Optional
+
+from fastapi import Header
+from fastapi.responses import StreamingResponse
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+
+
+def wants_ndjson(accept: Optional[str] = Header(None)) -> bool:
+    """Check whether the client asked for results streamed as newline-delimited JSON."""
+    return bool(accept) and NDJSON_MEDIA_TYPE in accept
+
+
+def error_detail(error: Exception) -> str:
+    """Client-facing message for an error raised while processing one file."""
+    return str(getattr(error, "detail", None) or error) or type(error).__name__
+
+
+def file_error(file_name: str, error: Exception) -> Dict:
+    """Result envelope of a file that failed, with the stage it failed in if known."""
+    return {
+        "file_name": file_name,
+        "status": "error",
+        "error": {"stage": getattr(error, "stage", None), "reason": error_detail(error)},
+    }
+
+
+async def _encode_lines(lines: AsyncIterator[Dict]) -> AsyncIterator[bytes]:
+    async for line in lines:
+        yield (json.dumps(line, default=str) + "\n").encode()
+
+
+def sse_event(event_id: int, event: str, data: Dict) -> str:
+    """Format one Server-Sent Event."""
+    return f"id: {event_id}\nevent: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+
+
+def ndjson_response(lines: AsyncIterator[Dict], headers: Optional[Dict[str, str]] = None) -> StreamingResponse:
+    """
+    Stream `lines` to the client, one JSON object per line, as they are produced.
+
+    Lines are `{"type": "result", ...}` or `{"type": "error", "stage", "detail", ...}`
+    per processed file, followed by one `{"type": "summary", ...}` line.
+    """
+    return StreamingResponse(_encode_lines(lines), media_type=NDJSON_MEDIA_TYPE, headers=headers)
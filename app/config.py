@@ -37,6 +37,78 @@ class Settings(BaseSettings):
     DB_DATABASE: str = Field(default=os.environ.get("db_database"), env="db_database")
     DB_USER: str = Field(default=os.environ.get("db_user"), env="db_user")
     DB_PASSWORD: str = Field(default=os.environ.get("db_password"), env="db_password")
+    DB_DRIVER: str = "asyncpg"  # "asyncpg" (native async) or "psycopg2" (run in threadpool)
+    DB_POOL_MIN_SIZE: int = 1
+    DB_POOL_MAX_SIZE: int = 10
+    DB_POOL_TIMEOUT: float = 30.0  # Seconds to wait for a free connection
+    DB_POOL_HEALTH_CHECK_INTERVAL: float = 30.0  # Ping connections idle for longer than this
+
+    # Job description store settings
+    JOB_STORE_BACKEND: str = "postgres"  # "postgres", "sqlite" or "memory"
+    JOB_DB_PATH: str = "data/jobs.db"
+
+    # Bulk job description upload settings
+    BULK_JOB_MAX_ITEMS: int = 1000
+    BULK_JOB_MAX_UPLOAD_SIZE: int = 100 * 1024 * 1024  # 100MB for all the files of a multipart request
+    BULK_JOB_CONCURRENCY: int = 8  # Job descriptions parsed at the same time
+
+    # Job description cache settings
+    JOB_CACHE_TTL: float = 300.0  # Seconds a cached job is served without reading the database
+    JOB_CACHE_MAX_ENTRIES: int = 1024  # 0 disables the cache
+    JOB_CACHE_NOTIFY: bool = False  # Share invalidations between workers via Postgres LISTEN/NOTIFY
+
+    # Resume store settings
+    RESUME_STORE_BACKEND: str = "postgres"  # "postgres", "sqlite" or "memory"
+    RESUME_DB_PATH: str = "data/resumes.db"
+    STORE_PARSED_RESUMES: bool = True
+    RESUME_POOL_PAGE_SIZE: int = 1000  # Stored resumes read per query when the in-memory pool syncs
+    RESUME_POOL_GAP_TIMEOUT: float = 60.0  # Seconds a skipped sequence number is watched for a late commit
+    RESUME_POOL_RESYNC_INTERVAL: float = 600.0  # Seconds between full reloads of the pool; 0 disables them
+    DEDUP_STORED_RESUMES: bool = True  # Reuse the stored resume instead of parsing an upload with nearly the same text
+    DEDUP_SIMILARITY: float = 0.9  # Share of word 3-grams (estimated Jaccard similarity) at which texts count as the same
+
+    # Executor settings
+    IO_WORKERS: int = 16  # Threads for file copies and remote AI calls
+    CPU_WORKERS: int = 2  # Processes for text extraction, spaCy parsing and scoring; 0 uses the I/O threads
+    UPLOAD_CONCURRENCY: int = 4  # Files of one request processed at the same time
+
+    # Admission control for parsing requests, per worker process
+    ADMISSION_MAX_FILES: int = 64  # Uploaded files being processed at the same time
+    ADMISSION_MAX_BYTES: int = 512 * 1024 * 1024  # 512MB of uploads being processed at the same time
+    ADMISSION_QUEUE_SIZE: int = 100  # Requests waiting for admission; more are rejected with 429
+    ADMISSION_QUEUE_TIMEOUT: float = 60.0  # Seconds a request waits for admission before it is rejected with 429
+    ADMISSION_RETRY_AFTER: int = 10  # Seconds sent in Retry-After with a 429
+
+    # ZIP archive upload settings (each entry is also held to ALLOWED_EXTENSIONS and MAX_FILE_SIZE)
+    ZIP_MAX_ARCHIVE_SIZE: int = 1024 * 1024 * 1024  # 1GB
+    ZIP_MAX_ENTRIES: int = 10000
+    ZIP_MAX_TOTAL_SIZE: int = 4 * 1024 * 1024 * 1024  # 4GB uncompressed
+    ZIP_MAX_RATIO: float = 100.0  # Entries compressed more than this are rejected as zip bombs
+
+    # Match result store settings
+    MATCH_STORE_BACKEND: str = "postgres"  # "postgres", "sqlite" or "memory"
+    MATCH_DB_PATH: str = "data/matches.db"
+
+    # Match run progress settings
+    MATCH_RUN_TTL: float = 3600.0  # Seconds a match run's progress is kept after its last event
+    MATCH_RUN_MAX_RUNS: int = 1000  # Runs kept at once; the oldest finished ones are dropped first
+    MATCH_RUN_MAX_PENDING: int = 100  # Subscribed runs waiting for their match request; more are rejected with 429
+    MATCH_RUN_PENDING_TIMEOUT: float = 300.0  # Seconds a subscribed run waits for its match request before it is dropped
+    MATCH_RUN_KEEPALIVE: float = 15.0  # Seconds between keep-alive comments on idle event streams
+
+    # Export settings
+    EXPORT_CHUNK_SIZE: int = 256 * 1024  # Bytes of an export file buffered before they are sent
+    EXPORT_PARQUET_ROW_GROUP_SIZE: int = 10000  # Rows held in memory per Parquet row group
+
+    # Background parse job settings
+    PARSE_QUEUE_DB_PATH: str = "data/parse_jobs.db"
+    PARSE_QUEUE_DIR: str = "data/parse_jobs"  # Uploads waiting to be parsed
+    PARSE_WORKERS: int = 2  # 0 leaves queued jobs to other processes
+    PARSE_JOB_LEASE: float = 600.0  # Seconds before a file claimed by a dead worker is retried
+    PARSE_JOB_MAX_ATTEMPTS: int = 3
+    PARSE_JOB_MAX_FILES: int = 1000  # Files in one parse job
+    PARSE_JOB_MAX_SIZE: int = 512 * 1024 * 1024  # 512MB for all the files of one parse job
+    PARSE_QUEUE_POLL_INTERVAL: float = 2.0  # Seconds between checks for jobs queued by other processes
 
     class Config:
         env_file = ".env"
@@ -1,11 +1,18 @@
 import logging
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from starlette.concurrency import run_in_threadpool
 from pathlib import Path
 
 from app.config import get_settings
 from app.api.routes import router as api_router
 from app.core.exceptions import add_exception_handlers
+from app.services.admission import admission
+from app.services.database import init_db_pool, close_db_pool, uses_postgres
+from app.services.async_storage import init_async_pool, close_async_pool
+from app.services.executors import executor_metrics, shutdown_executors, start_executors
+from app.services.job_cache import job_cache, start_invalidation_listener, stop_invalidation_listener
+from app.services.parse_queue import start_parse_workers, stop_parse_workers
 
 # Set up logging
 logging.basicConfig(
@@ -19,7 +26,7 @@ logger = logging.getLogger(__name__)
 def create_directories():
     """Create necessary directories for application."""
     settings = get_settings()
-    for directory in [settings.UPLOAD_DIR, settings.PARSED_DIR, settings.JD_DIR]:
+    for directory in [settings.UPLOAD_DIR, settings.PARSED_DIR, settings.JD_DIR, settings.PARSE_QUEUE_DIR]:
         Path(directory).mkdir(parents=True, exist_ok=True)
     logger.info("Application directories created")
 
@@ -41,6 +48,7 @@ def create_application() -> FastAPI:
         allow_credentials=True,
         allow_methods=["*"],
         allow_headers=["*"],
+        expose_headers=["X-Next-Cursor", "X-Missing-Job-Ids", "X-Match-Run-Id", "Retry-After"],
     )
     
     # Add exception handlers
@@ -52,6 +60,37 @@ def create_application() -> FastAPI:
     # Create directories
     create_directories()
     
+    @app.on_event("startup")
+    async def open_database_pools():
+        """Open the database connection pools, applying schema migrations, before serving requests."""
+        try:
+            if uses_postgres(settings):
+                init_db_pool(settings)
+            await init_async_pool(settings)
+            await start_invalidation_listener(settings)
+        except Exception as e:
+            # The pools are opened, and the migrations applied, on first use once the database is reachable
+            logger.warning(f"Could not prepare database at startup: {str(e)}")
+    
+    @app.on_event("startup")
+    def start_background_workers():
+        """Start the executor pools and resume queued parse jobs."""
+        start_executors(settings)
+        start_parse_workers(settings)
+    
+    @app.on_event("shutdown")
+    async def stop_background_workers():
+        """Let the parse workers and executors finish their current work before the pools close."""
+        await run_in_threadpool(stop_parse_workers)
+        await run_in_threadpool(shutdown_executors)
+    
+    @app.on_event("shutdown")
+    async def close_database_pools():
+        """Close pooled database connections."""
+        await stop_invalidation_listener()
+        await close_async_pool()
+        close_db_pool()
+    
     @app.get("/", tags=["Health"])
     def health_check():
         """Check if the API is running."""
@@ -61,6 +100,15 @@ def create_application() -> FastAPI:
             "status": "healthy"
         }
     
+    @app.get("/metrics", tags=["Health"])
+    def metrics():
+        """Get the size and load of the executor pools, admission control and the job cache usage."""
+        return {
+            "executors": executor_metrics(),
+            "admission": admission.stats(settings),
+            "job_cache": job_cache.stats()
+        }
+    
     return app
 
 
@@ -0,0 +1,132 @@
+import asyncio
+import logging
+from collections import deque
+from typing import Deque, Dict, List, Tuple
+
+from app.config import Settings
+
+logger = logging.getLogger(__name__)
+
+
+class AdmissionRejected(Exception):
+    """Raised when a request cannot be admitted; the client should retry after `retry_after` seconds."""
+
+    def __init__(self, detail: str, retry_after: int):
+        super().__init__(detail)
+        self.detail = detail
+        self.retry_after = retry_after
+
+
+class AdmissionController:
+    """
+    Limits the files and bytes that parsing requests on this worker process
+    hold at once.
+
+    A request is admitted when its files and bytes fit under
+    `ADMISSION_MAX_FILES` and `ADMISSION_MAX_BYTES`; otherwise it waits in a
+    first-come, first-served queue of at most `ADMISSION_QUEUE_SIZE`
+    requests. A request that finds the queue full, or waits longer than
+    `ADMISSION_QUEUE_TIMEOUT` seconds, is rejected. A request larger than
+    the limits on its own is admitted once nothing else is in flight.
+    """
+
+    def __init__(self):
+        self._files = 0
+        self._bytes = 0
+        self._requests = 0
+        # `[files, size, future]` of each waiting request, oldest first
+        self._waiters: Deque[List] = deque()
+        self.admitted = 0
+        self.rejected = 0
+        self.timed_out = 0
+
+    def _fits(self, files: int, size: int, settings: Settings) -> bool:
+        return (
+            self._files + files <= settings.ADMISSION_MAX_FILES
+            and self._bytes + size <= settings.ADMISSION_MAX_BYTES
+        )
+
+    def _take(self, files: int, size: int) -> None:
+        self._files += files
+        self._bytes += size
+        self._requests += 1
+        self.admitted += 1
+
+    def _admit_waiters(self, settings: Settings) -> None:
+        # Strictly in order, so a large request is not passed over forever by small ones
+        while self._waiters and self._fits(self._waiters[0][0], self._waiters[0][1], settings):
+            files, size, future = self._waiters.popleft()
+            self._take(files, size)
+            future.set_result(None)
+
+    async def acquire(self, files: int, size: int, settings: Settings) -> Tuple[int, int]:
+        """
+        Wait until `files` files of `size` bytes in total may be processed.
+
+        Returns the `(files, size)` that were taken, to give to `release`.
+        """
+        files = min(files, settings.ADMISSION_MAX_FILES)
+        size = min(size, settings.ADMISSION_MAX_BYTES)
+
+        if not self._waiters and self._fits(files, size, settings):
+            self._take(files, size)
+            return files, size
+
+        if len(self._waiters) >= settings.ADMISSION_QUEUE_SIZE:
+            self.rejected += 1
+            logger.warning(f"Rejected request with {files} files: admission queue is full")
+            raise AdmissionRejected("Server is busy: too many requests waiting", settings.ADMISSION_RETRY_AFTER)
+
+        waiter = [files, size, asyncio.get_running_loop().create_future()]
+        self._waiters.append(waiter)
+        try:
+            done, _ = await asyncio.wait({waiter[2]}, timeout=settings.ADMISSION_QUEUE_TIMEOUT)
+        except BaseException:
+            # The client went away while waiting
+            self._abandon(waiter, settings)
+            raise
+        if not done:
+            self._abandon(waiter, settings)
+            self.timed_out += 1
+            self.rejected += 1
+            logger.warning(f"Rejected request with {files} files after waiting {settings.ADMISSION_QUEUE_TIMEOUT:g}s for admission")
+            raise AdmissionRejected(
+                f"Server is busy: not admitted within {settings.ADMISSION_QUEUE_TIMEOUT:g}s",
+                settings.ADMISSION_RETRY_AFTER
+            )
+        return files, size
+
+    def _abandon(self, waiter: List, settings: Settings) -> None:
+        if waiter[2].done():
+            # Admitted just as the wait ended
+            self.release(waiter[0], waiter[1], settings)
+            return
+        self._waiters.remove(waiter)
+        waiter[2].cancel()
+        # Requests queued behind it may fit now
+        self._admit_waiters(settings)
+
+    def release(self, files: int, size: int, settings: Settings) -> None:
+        """Give back what `acquire` took and admit the waiting requests that now fit."""
+        self._files -= files
+        self._bytes -= size
+        self._requests -= 1
+        self._admit_waiters(settings)
+
+    def stats(self, settings: Settings) -> Dict[str, int]:
+        """Current load, queue depth and totals since startup."""
+        return {
+            "in_flight_requests": self._requests,
+            "in_flight_files": self._files,
+            "in_flight_bytes": self._bytes,
+            "queue_depth": len(self._waiters),
+            "admitted": self.admitted,
+            "rejected": self.rejected,
+            "timed_out": self.timed_out,
+            "max_files": settings.ADMISSION_MAX_FILES,
+            "max_bytes": settings.ADMISSION_MAX_BYTES,
+            "max_queue": settings.ADMISSION_QUEUE_SIZE,
+        }
+
+
+admission = AdmissionController()
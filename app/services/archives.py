@@ -0,0 +1,142 @@
+import logging
+import zipfile
+from pathlib import Path, PurePosixPath
+from typing import BinaryIO, List, Optional, Tuple, Union
+
+from fastapi import HTTPException, status
+
+from app.config import Settings
+
+logger = logging.getLogger(__name__)
+
+ARCHIVE_EXTENSIONS = [".zip"]
+
+
+class ArchiveEntry:
+    """
+    One resume inside a saved ZIP archive, read straight from the archive
+    when it is processed. `error` says why an entry cannot be read at all,
+    in which case reading it fails without decompressing anything.
+    """
+
+    def __init__(self, archive: zipfile.ZipFile, archive_path: Path, info: zipfile.ZipInfo, error: Optional[str] = None):
+        self.archive = archive
+        self.archive_path = archive_path
+        self.info = info
+        self.error = error
+
+
+# A saved upload: a file on disk, or an entry of a saved archive
+UploadSource = Union[Path, ArchiveEntry]
+
+
+def is_archive(file_name: str) -> bool:
+    return Path(file_name).suffix.lower() in ARCHIVE_EXTENSIONS
+
+
+def _is_resume_entry(info: zipfile.ZipInfo) -> bool:
+    # Skip folders and the metadata files archivers add, e.g. __MACOSX/ and .DS_Store
+    path = PurePosixPath(info.filename)
+    return not info.is_dir() and path.parts[0] != "__MACOSX" and not path.name.startswith(".")
+
+
+def _entry_error(info: zipfile.ZipInfo, settings: Settings) -> Optional[str]:
+    """Why an entry cannot be read, judged before any of it is decompressed; the limits guard against zip bombs."""
+    if PurePosixPath(info.filename).suffix.lower() not in settings.ALLOWED_EXTENSIONS:
+        return f"unsupported file type. Allowed types: {', '.join(settings.ALLOWED_EXTENSIONS)}"
+    if info.flag_bits & 0x1:
+        return "encrypted entries are not supported"
+    if info.file_size > settings.MAX_FILE_SIZE:
+        return f"file too large. Maximum size: {settings.MAX_FILE_SIZE/1024/1024}MB"
+    if info.file_size == 0:
+        return "file is empty"
+    if info.file_size > settings.ZIP_MAX_RATIO * max(info.compress_size, 1):
+        return f"compression ratio above {settings.ZIP_MAX_RATIO:g}"
+    return None
+
+
+def archive_load(file: BinaryIO, settings: Settings) -> Optional[Tuple[int, int]]:
+    """
+    Count the readable resumes in an uploaded ZIP archive and their
+    uncompressed bytes, from the central directory alone; blocking, so run
+    it in the I/O pool. None if the file is not a ZIP archive.
+    """
+    try:
+        with zipfile.ZipFile(file) as archive:
+            infos = [info for info in archive.infolist() if _is_resume_entry(info)]
+    except (zipfile.BadZipFile, OSError):
+        return None
+    finally:
+        file.seek(0)
+    sizes = [info.file_size for info in infos if _entry_error(info, settings) is None]
+    return len(sizes), sum(sizes)
+
+
+def open_archive(file_name: str, file_path: Path, settings: Settings) -> List[Tuple[str, ArchiveEntry]]:
+    """
+    Open a saved ZIP archive and validate its entries from the central directory.
+
+    Returns `(file_name, entry)` for each resume, named `archive.zip/path/in/archive`.
+    An archive with too many entries, or too many bytes in the entries that
+    can be read, is rejected as a whole; an entry that cannot be read, e.g.
+    a photo, only fails on its own when it is processed. The archive stays
+    open for the entries to be read; `release_upload` closes it.
+    """
+    try:
+        archive = zipfile.ZipFile(file_path)
+    except (zipfile.BadZipFile, OSError) as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Invalid ZIP archive {file_name}: {str(e)}"
+        )
+
+    try:
+        infos = [info for info in archive.infolist() if _is_resume_entry(info)]
+        errors = [_entry_error(info, settings) for info in infos]
+        if len(infos) > settings.ZIP_MAX_ENTRIES:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Too many files in {file_name}. Maximum: {settings.ZIP_MAX_ENTRIES}"
+            )
+        if sum(info.file_size for info, error in zip(infos, errors) if error is None) > settings.ZIP_MAX_TOTAL_SIZE:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"{file_name} is too large uncompressed. Maximum: {settings.ZIP_MAX_TOTAL_SIZE/1024/1024}MB"
+            )
+        if not infos:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"No files found in {file_name}"
+            )
+    except Exception:
+        archive.close()
+        raise
+
+    unreadable = sum(error is not None for error in errors)
+    logger.info(f"Opened archive {file_name} with {len(infos)} files ({unreadable} unreadable)")
+    return [
+        (f"{file_name}/{info.filename}", ArchiveEntry(archive, file_path, info, error))
+        for info, error in zip(infos, errors)
+    ]
+
+
+def read_entry(entry: ArchiveEntry, settings: Settings) -> bytes:
+    """
+    Decompress one entry into memory; blocking, so run it in the I/O pool.
+
+    At most MAX_FILE_SIZE bytes are read, whatever size the entry header claims.
+    """
+    if entry.error:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Cannot read {entry.info.filename}: {entry.error}"
+        )
+    with entry.archive.open(entry.info) as source:
+        data = source.read(settings.MAX_FILE_SIZE + 1)
+    if len(data) > settings.MAX_FILE_SIZE:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"File too large. Maximum size: {settings.MAX_FILE_SIZE/1024/1024}MB"
+        )
+    return data
+
@@ -0,0 +1,329 @@
+import json
+import logging
+import uuid
+from typing import Dict, List, Optional, Tuple
+
+import asyncpg
+from starlette.concurrency import run_in_threadpool
+
+from app.config import Settings
+from app.services import storage
+from app.services.database import init_db_pool
+from app.services.job_cache import INVALIDATION_CHANNEL, job_cache
+from app.services.job_store import get_job_store
+from app.services.matcher import build_job_profile, is_current_profile
+
+logger = logging.getLogger(__name__)
+
+_pool: Optional[asyncpg.Pool] = None
+
+
+def uses_asyncpg(settings: Settings) -> bool:
+    """
+    Check whether jobs are stored in Postgres through the native async driver.
+
+    Otherwise every function here runs its counterpart on the configured
+    job store in the threadpool, so routes never block the event loop.
+    """
+    return settings.JOB_STORE_BACKEND == "postgres" and settings.DB_DRIVER == "asyncpg"
+
+
+async def _init_connection(conn: asyncpg.Connection) -> None:
+    """Decode JSONB columns to Python objects, as psycopg2 does."""
+    await conn.set_type_codec("jsonb", encoder=json.dumps, decoder=json.loads, schema="pg_catalog")
+
+
+async def init_async_pool(settings: Settings) -> Optional[asyncpg.Pool]:
+    """Create the shared asyncpg pool if the async driver is selected."""
+    global _pool
+    if _pool is None and uses_asyncpg(settings):
+        # The psycopg2 pool applies the schema migrations when it opens
+        await run_in_threadpool(init_db_pool, settings)
+        _pool = await asyncpg.create_pool(
+            host=settings.DB_HOST,
+            port=settings.DB_PORT,
+            database=settings.DB_DATABASE,
+            user=settings.DB_USER,
+            password=settings.DB_PASSWORD,
+            min_size=settings.DB_POOL_MIN_SIZE,
+            max_size=settings.DB_POOL_MAX_SIZE,
+            init=_init_connection,
+        )
+        logger.info(
+            f"Async database connection pool opened "
+            f"(min={settings.DB_POOL_MIN_SIZE}, max={settings.DB_POOL_MAX_SIZE})"
+        )
+    return _pool
+
+
+async def close_async_pool() -> None:
+    """Close the shared asyncpg pool."""
+    global _pool
+    if _pool is not None:
+        await _pool.close()
+        _pool = None
+        logger.info("Async database connection pool closed")
+
+
+async def _get_pool(settings: Settings) -> asyncpg.Pool:
+    return _pool or await init_async_pool(settings)
+
+
+async def save_job_description(job_data: Dict, settings: Settings) -> str:
+    """Save job description to the database."""
+    if not uses_asyncpg(settings):
+        return await run_in_threadpool(get_job_store(settings).save_job_description, job_data)
+
+    if "id" not in job_data:
+        job_data["id"] = str(uuid.uuid4())
+
+    pool = await _get_pool(settings)
+    async with pool.acquire() as conn:
+        # Insert the job description together with its match profile
+        await conn.execute(
+            "INSERT INTO job_descriptions (id, data, match_profile) VALUES ($1, $2, $3)",
+            job_data["id"], job_data, build_job_profile(job_data)
+        )
+
+    return job_data["id"]
+
+
+async def save_job_descriptions(jobs: List[Dict], settings: Settings) -> List[str]:
+    """Save several job descriptions in one transaction and return their IDs."""
+    if not uses_asyncpg(settings):
+        return await run_in_threadpool(get_job_store(settings).save_job_descriptions, jobs)
+
+    for job_data in jobs:
+        if "id" not in job_data:
+            job_data["id"] = str(uuid.uuid4())
+
+    pool = await _get_pool(settings)
+    async with pool.acquire() as conn:
+        async with conn.transaction():
+            await conn.executemany(
+                "INSERT INTO job_descriptions (id, data, match_profile) VALUES ($1, $2, $3)",
+                [(job_data["id"], job_data, build_job_profile(job_data)) for job_data in jobs]
+            )
+
+    return [job_data["id"] for job_data in jobs]
+
+
+async def get_job_descriptions(settings: Settings) -> List[Dict]:
+    """Get all job descriptions from the database."""
+    if not uses_asyncpg(settings):
+        return await run_in_threadpool(get_job_store(settings).get_job_descriptions)
+
+    pool = await _get_pool(settings)
+    rows = await pool.fetch("SELECT data FROM job_descriptions")
+    return [row["data"] for row in rows]
+
+
+async def get_job_description_page(
+    settings: Settings,
+    limit: int = 50,
+    cursor: Optional[str] = None,
+    fields: Optional[List[str]] = None,
+    title: Optional[str] = None,
+    company: Optional[str] = None,
+    skills: Optional[List[str]] = None
+) -> Tuple[List[Dict], Optional[str]]:
+    """Get one page of job descriptions, newest first, and the cursor of the next page."""
+    if not uses_asyncpg(settings):
+        return await run_in_threadpool(
+            get_job_store(settings).get_job_description_page, limit, cursor, fields, title, company, skills
+        )
+
+    query, params = storage.build_job_page_query(
+        lambda position: f"${position}", limit, cursor, fields, title, company, skills
+    )
+    pool = await _get_pool(settings)
+    return storage.paginate_job_rows(await pool.fetch(query, *params), limit)
+
+
+async def search_job_descriptions(
+    settings: Settings,
+    query: str,
+    limit: int = 20,
+    cursor: Optional[str] = None,
+    fields: Optional[List[str]] = None
+) -> Tuple[List[Dict], Optional[str]]:
+    """Full-text search over job descriptions: one page of matches, best first, and the next cursor."""
+    if not uses_asyncpg(settings):
+        return await run_in_threadpool(get_job_store(settings).search_job_descriptions, query, limit, cursor, fields)
+
+    search_query, params = storage.build_job_search_query(
+        lambda position: f"${position}", query, limit, cursor, fields
+    )
+    pool = await _get_pool(settings)
+    return storage.paginate_search_rows(await pool.fetch(search_query, *params), limit)
+
+
+async def get_job_description(job_id: str, settings: Settings) -> Optional[Dict]:
+    """Get a specific job description by ID, from the job cache when possible."""
+    job_entry = await get_job_with_profile(job_id, settings)
+    return job_entry[0] if job_entry else None
+
+
+async def get_job_descriptions_by_ids(job_ids: List[str], settings: Settings) -> Tuple[List[Dict], List[str]]:
+    """Get several job descriptions in one query, in request order, plus the IDs not found."""
+    if not uses_asyncpg(settings):
+        return await run_in_threadpool(get_job_store(settings).get_job_descriptions_by_ids, job_ids)
+
+    canonical_ids = storage.normalize_job_ids(job_ids)
+    lookup_ids = list({canonical_id for canonical_id in canonical_ids.values() if canonical_id})
+    if not lookup_ids:
+        return [], list(canonical_ids)
+
+    pool = await _get_pool(settings)
+    rows = await pool.fetch(
+        "SELECT id, data FROM job_descriptions WHERE id = ANY($1::uuid[])",
+        lookup_ids
+    )
+    return storage.order_by_request({str(row["id"]): row["data"] for row in rows}, canonical_ids)
+
+
+async def get_jobs_with_profiles_by_ids(
+    job_ids: List[str],
+    settings: Settings
+) -> Tuple[List[Tuple[Dict, Dict]], List[str]]:
+    """Get several jobs with their match profiles in one query, in request order, plus the IDs not found."""
+    if not uses_asyncpg(settings):
+        return await run_in_threadpool(get_job_store(settings).get_jobs_with_profiles_by_ids, job_ids)
+
+    canonical_ids = storage.normalize_job_ids(job_ids)
+    lookup_ids = list({canonical_id for canonical_id in canonical_ids.values() if canonical_id})
+    if not lookup_ids:
+        return [], list(canonical_ids)
+
+    pool = await _get_pool(settings)
+    async with pool.acquire() as conn:
+        rows = {}
+        rebuilt = []
+        for row in await conn.fetch(
+            "SELECT id, data, match_profile FROM job_descriptions WHERE id = ANY($1::uuid[])",
+            lookup_ids
+        ):
+            match_profile = row["match_profile"]
+            if not is_current_profile(match_profile):
+                match_profile = build_job_profile(row["data"])
+                rebuilt.append((match_profile, row["id"]))
+            rows[str(row["id"])] = (row["data"], match_profile)
+
+        if rebuilt:
+            await conn.executemany("UPDATE job_descriptions SET match_profile = $1 WHERE id = $2", rebuilt)
+
+    return storage.order_by_request(rows, canonical_ids)
+
+
+async def get_job_with_profile(job_id: str, settings: Settings) -> Optional[Tuple[Dict, Dict]]:
+    """Get a job description together with its match profile, from the job cache when possible."""
+    cached = job_cache.get(job_id)
+    if cached is not None:
+        return cached
+
+    generation = job_cache.generation()
+    job_entry = await _fetch_job_with_profile(job_id, settings)
+    if job_entry:
+        job_cache.put(job_id, job_entry[0], job_entry[1], generation, settings)
+    return job_entry
+
+
+async def _fetch_job_with_profile(job_id: str, settings: Settings) -> Optional[Tuple[Dict, Dict]]:
+    """Read a job description and its match profile from the database, rebuilding outdated profiles."""
+    if not uses_asyncpg(settings):
+        return await run_in_threadpool(get_job_store(settings).get_job_with_profile, job_id)
+
+    pool = await _get_pool(settings)
+    async with pool.acquire() as conn:
+        row = await conn.fetchrow("SELECT data, match_profile FROM job_descriptions WHERE id = $1", job_id)
+        if not row:
+            return None
+
+        job, match_profile = row["data"], row["match_profile"]
+        if not is_current_profile(match_profile):
+            match_profile = build_job_profile(job)
+            await conn.execute("UPDATE job_descriptions SET match_profile = $1 WHERE id = $2", match_profile, job_id)
+        return job, match_profile
+
+
+async def get_job_profiles(
+    settings: Settings,
+    company: Optional[str] = None,
+    title_keyword: Optional[str] = None
+) -> List[Tuple[Dict, Dict]]:
+    """Get `(job, match_profile)` for every stored job description, optionally filtered."""
+    if not uses_asyncpg(settings):
+        return await run_in_threadpool(get_job_store(settings).get_job_profiles, company, title_keyword)
+
+    pool = await _get_pool(settings)
+    async with pool.acquire() as conn:
+        rows = await conn.fetch(
+            """
+            SELECT id, data, match_profile FROM job_descriptions
+            WHERE ($1::text IS NULL OR lower(company) = lower($1))
+              AND ($2::text IS NULL OR position(lower($2) in lower(title)) > 0)
+            """,
+            company, title_keyword
+        )
+
+        jobs = []
+        rebuilt = []
+        for row in rows:
+            match_profile = row["match_profile"]
+            if not is_current_profile(match_profile):
+                match_profile = build_job_profile(row["data"])
+                rebuilt.append((match_profile, row["id"]))
+            jobs.append((row["data"], match_profile))
+
+        if rebuilt:
+            await conn.executemany("UPDATE job_descriptions SET match_profile = $1 WHERE id = $2", rebuilt)
+        return jobs
+
+
+async def _notify_job_changed(conn: asyncpg.Connection, job_id: str, settings: Settings) -> None:
+    """Tell other workers to drop a job from their caches once the transaction commits."""
+    if settings.JOB_CACHE_NOTIFY:
+        await conn.execute("SELECT pg_notify($1, $2)", INVALIDATION_CHANNEL, str(job_id))
+
+
+async def update_job_description(job_id: str, updated_data: Dict, settings: Settings) -> bool:
+    """Update an existing job description and rebuild its match profile."""
+    if not uses_asyncpg(settings):
+        return await run_in_threadpool(get_job_store(settings).update_job_description, job_id, updated_data)
+
+    pool = await _get_pool(settings)
+    async with pool.acquire() as conn:
+        async with conn.transaction():
+            data = await conn.fetchval(
+                "UPDATE job_descriptions SET data = data || $1::jsonb WHERE id = $2 RETURNING data",
+                updated_data, job_id
+            )
+            if data is None:
+                return False
+
+            # The old profile no longer describes the merged data
+            await conn.execute(
+                "UPDATE job_descriptions SET match_profile = $1 WHERE id = $2",
+                build_job_profile(data), job_id
+            )
+            await _notify_job_changed(conn, job_id, settings)
+
+    job_cache.invalidate(job_id)
+    return True
+
+
+async def delete_job_description(job_id: str, settings: Settings) -> bool:
+    """Delete a job description."""
+    if not uses_asyncpg(settings):
+        return await run_in_threadpool(get_job_store(settings).delete_job_description, job_id)
+
+    pool = await _get_pool(settings)
+    async with pool.acquire() as conn:
+        async with conn.transaction():
+            status = await conn.execute("DELETE FROM job_descriptions WHERE id = $1", job_id)
+            deleted = status != "DELETE 0"
+            if deleted:
+                await _notify_job_changed(conn, job_id, settings)
+
+    job_cache.invalidate(job_id)
+    return deleted
@@ -0,0 +1,232 @@
+import threading
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from app.config import Settings
+from app.services.matcher import keyword_similarities, normalize_skill, score_profiles
+from app.services.resume_store import PoolListener, add_pool_listener, get_candidate_pool
+
+# Scores are rounded to two decimals of a percentage; candidates this close
+# to a cut-off are rescored exactly rather than trusted to the bulk scores
+_MARGIN = 0.0002
+
+
+class _Column:
+    """Append-only numpy buffer that doubles its capacity as it fills."""
+
+    def __init__(self, dtype):
+        self._data = np.zeros(1024, dtype=dtype)
+        self._size = 0
+
+    def extend(self, values: List) -> None:
+        end = self._size + len(values)
+        if end > len(self._data):
+            grown = np.zeros(max(end, 2 * len(self._data)), dtype=self._data.dtype)
+            grown[:self._size] = self._data[:self._size]
+            self._data = grown
+        self._data[self._size:end] = values
+        self._size = end
+
+    def view(self) -> np.ndarray:
+        return self._data[:self._size]
+
+
+class CandidateRanker(PoolListener):
+    """
+    The resume pool laid out as arrays, fed from the pool, for ranking every
+    stored candidate against a job in bulk.
+
+    Skills are kept as postings per skill and term counts as one (candidate,
+    term, count) entry per term, so every component of `score_profiles` is
+    computed for the whole pool with a handful of numpy operations. Only the
+    candidates that can make the cut are then scored one by one, which gives
+    their match details and keeps the results exactly those of
+    `rank_candidates`.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        with self._lock:
+            self._candidates: List[Dict] = []
+            self._postings: Dict[str, List[int]] = {}
+            # Postings as arrays, built on first use and dropped when a posting grows
+            self._arrays: Dict[str, np.ndarray] = {}
+            self._education: List[str] = []
+            self._experience: List[str] = []
+            self._square_sums = _Column(np.float64)
+            self._vocabulary: Dict[str, int] = {}
+            self._rows = _Column(np.int32)
+            self._terms = _Column(np.int32)
+            self._counts = _Column(np.float64)
+
+    def add(self, candidate: Dict, data: Dict) -> None:
+        profile = candidate["match_profile"]
+        with self._lock:
+            position = len(self._candidates)
+            self._candidates.append(candidate)
+            for skill in candidate["skills"]:
+                self._postings.setdefault(skill, []).append(position)
+                self._arrays.pop(skill, None)
+
+            self._education.append(profile["education"])
+            self._experience.append(profile["experience"])
+            self._square_sums.extend([profile["term_square_sum"]])
+            term_counts = profile["term_counts"]
+            self._rows.extend([position] * len(term_counts))
+            self._terms.extend([self._vocabulary.setdefault(term, len(self._vocabulary)) for term in term_counts])
+            self._counts.extend(list(term_counts.values()))
+
+    def _positions(self, skill: str) -> np.ndarray:
+        positions = self._arrays.get(skill)
+        if positions is None:
+            positions = self._arrays[skill] = np.array(self._postings[skill], dtype=np.int64)
+        return positions
+
+    def _matching(self, job_skill: str, size: int) -> np.ndarray:
+        """Which candidates have a skill matching `job_skill` the way `score_profiles` matches skills."""
+        mask = np.zeros(size, dtype=bool)
+        for skill in self._postings:
+            if job_skill == skill or job_skill in skill or skill in job_skill:
+                mask[self._positions(skill)] = True
+        return mask
+
+    def _requirement_scores(self, texts: List[str], requirements: List[str]) -> np.ndarray:
+        """Share of `requirements` found in each text, or 0.5 with no requirements, as in `score_profiles`."""
+        if not requirements:
+            return np.full(len(texts), 0.5)
+        matches = np.zeros(len(texts))
+        for requirement in requirements:
+            matches += np.fromiter((requirement in text for text in texts), dtype=bool, count=len(texts))
+        return matches / max(len(requirements), 1)
+
+    def _keyword_scores(self, job_profile: Dict, size: int) -> np.ndarray:
+        job_counts = np.zeros(len(self._vocabulary))
+        for term, count in job_profile["term_counts"].items():
+            column = self._vocabulary.get(term)
+            if column is not None:
+                job_counts[column] = count
+
+        terms = self._terms.view()
+        weights = job_counts[terms]
+        shared = np.flatnonzero(weights)
+        rows = self._rows.view()[shared]
+        counts = self._counts.view()[shared]
+        weights = weights[shared]
+
+        return keyword_similarities(
+            np.bincount(rows, counts * weights, minlength=size),
+            np.bincount(rows, counts * counts, minlength=size),
+            np.bincount(rows, weights * weights, minlength=size),
+            self._square_sums.view()[:size],
+            job_profile["term_square_sum"]
+        )
+
+    def _overall_scores(self, job_profile: Dict, required_skills: Iterable[str]) -> Tuple[List[Dict], np.ndarray, np.ndarray]:
+        """
+        Snapshot the pool and compute the overall score (0-1) of every
+        candidate, as `score_profiles` would, and which candidates list every
+        skill in `required_skills`.
+        """
+        with self._lock:
+            candidates = self._candidates
+            size = len(candidates)
+            required = set(job_profile["required_skills"])
+            preferred = set(job_profile["preferred_skills"])
+
+            required_matches = np.zeros(size)
+            preferred_matches = np.zeros(size)
+            for job_skill in job_profile["required_skills"] + job_profile["preferred_skills"]:
+                mask = self._matching(job_skill, size)
+                if job_skill in required:
+                    required_matches += mask
+                if job_skill in preferred:
+                    preferred_matches += mask
+
+            eligible = np.ones(size, dtype=bool)
+            for skill in {normalize_skill(skill) for skill in required_skills if skill.strip()}:
+                has_skill = np.zeros(size, dtype=bool)
+                if skill in self._postings:
+                    has_skill[self._positions(skill)] = True
+                eligible &= has_skill
+
+            education = self._education[:size]
+            experience = self._experience[:size]
+            keyword_scores = self._keyword_scores(job_profile, size)
+
+        required_score = required_matches / max(len(required), 1)
+        preferred_score = preferred_matches / max(len(preferred), 1) if preferred else 1.0
+        skills_scores = (required_score * 0.7) + (preferred_score * 0.3)
+        education_scores = self._requirement_scores(education, job_profile["education_requirements"])
+        experience_scores = self._requirement_scores(experience, job_profile["experience_requirements"])
+
+        overall_scores = (
+            (skills_scores * 0.4) +
+            (education_scores * 0.2) +
+            (experience_scores * 0.2) +
+            (keyword_scores * 0.2)
+        )
+        return candidates, overall_scores, eligible
+
+    def rank(
+        self,
+        job: Dict,
+        job_profile: Dict,
+        top_k: int,
+        min_score: Optional[float] = None,
+        required_skills: Optional[Iterable[str]] = None
+    ) -> List[Dict]:
+        """Same results as `rank_candidates` over the pool filtered to `required_skills`."""
+        candidates, overall_scores, eligible = self._overall_scores(job_profile, required_skills or [])
+
+        positions = np.flatnonzero(eligible)
+        if min_score is not None:
+            positions = positions[overall_scores[positions] >= min_score / 100 - _MARGIN]
+        if len(positions) > top_k:
+            scores = overall_scores[positions]
+            kth = np.partition(scores, len(scores) - top_k)[len(scores) - top_k]
+            positions = positions[scores >= kth - _MARGIN]
+
+        matches: List[Tuple[float, int, Dict, Dict]] = []
+        for position in positions.tolist():
+            candidate = candidates[position]
+            score = score_profiles(candidate["match_profile"], job_profile, min_score)
+            if score is not None:
+                matches.append((score["overall_score"], -position, candidate, score))
+
+        # Highest score first, ties in pool order, as `select_top_matches` keeps them
+        matches.sort(key=lambda match: match[:2], reverse=True)
+        return [
+            {
+                "resume_id": candidate["id"],
+                "resume_name": candidate.get("name") or "Unknown",
+                "job_id": job.get("id", "Unknown"),
+                "job_title": job.get("title", "Unknown"),
+                **score
+            }
+            for _, _, candidate, score in matches[:top_k]
+        ]
+
+
+_ranker = CandidateRanker()
+add_pool_listener(_ranker)
+
+
+def rank_candidate_pool(
+    job: Dict,
+    job_profile: Dict,
+    top_k: int,
+    min_score: Optional[float],
+    required_skills: Optional[Iterable[str]],
+    settings: Settings
+) -> List[Dict]:
+    """
+    Rank the stored resumes that list every skill in `required_skills`
+    against a job and keep the best `top_k`; blocking, so run it in the I/O
+    pool. The pool picks up resumes stored since the previous request first.
+    """
+    get_candidate_pool(settings)
+    return _ranker.rank(job, job_profile, top_k, min_score, required_skills)
@@ -0,0 +1,224 @@
+import re
+import threading
+from typing import Callable, Dict, List, Set, Tuple
+
+from app.config import Settings
+from app.services.matcher import normalize_skill
+from app.services.resume_store import PoolListener, add_pool_listener, get_candidate_pool
+
+
+# Quoted phrases, parentheses, or bare words
+QUERY_TOKEN_PATTERN = re.compile(r'"([^"]*)"|(\()|(\))|([^\s()"]+)')
+OPERATORS = {"AND", "OR", "NOT"}
+
+# Limits that keep parsing and evaluating a query from recursing too deeply
+MAX_QUERY_TOKENS = 256
+MAX_QUERY_DEPTH = 32  # Nested parentheses and NOTs
+
+
+class QuerySyntaxError(ValueError):
+    """Raised when a candidate search query cannot be parsed."""
+
+
+class PostingList:
+    """
+    Sorted resume sequence numbers for one skill, stored as delta-encoded varints.
+
+    Resumes are indexed in increasing `seq` order, so new postings are
+    appended without re-encoding the list.
+    """
+    __slots__ = ("data", "last", "count")
+
+    def __init__(self):
+        self.data = bytearray()
+        self.last = 0
+        self.count = 0
+
+    def add(self, doc_id: int) -> None:
+        delta = doc_id - self.last
+        while delta >= 0x80:
+            self.data.append((delta & 0x7F) | 0x80)
+            delta >>= 7
+        self.data.append(delta)
+        self.last = doc_id
+        self.count += 1
+
+    def decode(self) -> List[int]:
+        doc_ids = []
+        current = value = shift = 0
+        for byte in self.data:
+            value |= (byte & 0x7F) << shift
+            if byte & 0x80:
+                shift += 7
+            else:
+                current += value
+                doc_ids.append(current)
+                value = shift = 0
+        return doc_ids
+
+
+def tokenize_query(query: str) -> List[Tuple[str, str]]:
+    """
+    Split a query into `(kind, value)` tokens.
+
+    Consecutive bare words are joined into one skill term, so multi-word
+    skills such as `machine learning` work without quotes.
+    """
+    tokens: List[Tuple[str, str]] = []
+    joinable = False
+    for match in QUERY_TOKEN_PATTERN.finditer(query):
+        phrase, open_paren, close_paren, word = match.groups()
+        if open_paren:
+            tokens.append(("(", open_paren))
+        elif close_paren:
+            tokens.append((")", close_paren))
+        elif phrase is not None:
+            tokens.append(("term", phrase))
+        elif word.upper() in OPERATORS:
+            tokens.append((word.upper(), word))
+        elif joinable:
+            tokens[-1] = ("term", f"{tokens[-1][1]} {word}")
+        else:
+            tokens.append(("term", word))
+        joinable = word is not None and word.upper() not in OPERATORS
+    return tokens
+
+
+def parse_query(query: str) -> Tuple:
+    """
+    Parse a boolean skill query into a tree of `("term", skill)`, `("and", a, b)`,
+    `("or", a, b)` and `("not", a)` nodes.
+
+    AND binds tighter than OR, and `a NOT b` is read as `a AND NOT b`.
+    Queries of more than MAX_QUERY_TOKENS tokens, or nested more than
+    MAX_QUERY_DEPTH levels deep, are rejected.
+    """
+    tokens = tokenize_query(query)
+    if len(tokens) > MAX_QUERY_TOKENS:
+        raise QuerySyntaxError(f"Query is too long. Maximum: {MAX_QUERY_TOKENS} terms and operators")
+    position = 0
+    depth = 0
+
+    def peek() -> str:
+        return tokens[position][0] if position < len(tokens) else ""
+
+    def take(kind: str) -> str:
+        nonlocal position
+        if peek() != kind:
+            found = tokens[position][1] if position < len(tokens) else "end of query"
+            raise QuerySyntaxError(f"Expected {kind} but found '{found}'")
+        value = tokens[position][1]
+        position += 1
+        return value
+
+    def parse_or() -> Tuple:
+        node = parse_and()
+        while peek() == "OR":
+            take("OR")
+            node = ("or", node, parse_and())
+        return node
+
+    def parse_and() -> Tuple:
+        node = parse_not()
+        while peek() in {"AND", "NOT"}:
+            if peek() == "AND":
+                take("AND")
+            node = ("and", node, parse_not())
+        return node
+
+    def nested(parse: Callable[[], Tuple]) -> Tuple:
+        nonlocal depth
+        depth += 1
+        if depth > MAX_QUERY_DEPTH:
+            raise QuerySyntaxError(f"Query is nested too deeply. Maximum: {MAX_QUERY_DEPTH} levels")
+        try:
+            return parse()
+        finally:
+            depth -= 1
+
+    def parse_parenthesized() -> Tuple:
+        take("(")
+        node = parse_or()
+        take(")")
+        return node
+
+    def parse_not() -> Tuple:
+        if peek() == "NOT":
+            take("NOT")
+            return ("not", nested(parse_not))
+        if peek() == "(":
+            return nested(parse_parenthesized)
+        skill = normalize_skill(take("term"))
+        if not skill:
+            raise QuerySyntaxError("Empty skill in query")
+        return ("term", skill)
+
+    if not tokens:
+        raise QuerySyntaxError("Query is empty")
+
+    tree = parse_or()
+    if position != len(tokens):
+        raise QuerySyntaxError(f"Unexpected '{tokens[position][1]}'")
+    return tree
+
+
+class SkillIndex(PoolListener):
+    """Inverted index from normalized skill IDs to the stored resumes listing them, fed from the resume pool."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._postings: Dict[str, PostingList] = {}
+        self._documents: Dict[int, Dict] = {}
+
+    def reset(self) -> None:
+        with self._lock:
+            self._postings = {}
+            self._documents = {}
+
+    def add(self, candidate: Dict, data: Dict) -> None:
+        with self._lock:
+            # Resumes can reach the pool out of `seq` order, and posting lists need increasing IDs
+            doc_id = len(self._documents)
+            for skill in candidate["skills"]:
+                postings = self._postings.get(skill)
+                if postings is None:
+                    postings = self._postings[skill] = PostingList()
+                postings.add(doc_id)
+            self._documents[doc_id] = candidate
+
+    def _evaluate(self, node: Tuple) -> Set[int]:
+        kind = node[0]
+        if kind == "term":
+            postings = self._postings.get(node[1])
+            return set(postings.decode()) if postings else set()
+        if kind == "and":
+            left = self._evaluate(node[1])
+            if node[2][0] == "not":
+                return left - self._evaluate(node[2][1])
+            return left & self._evaluate(node[2]) if left else left
+        if kind == "or":
+            return self._evaluate(node[1]) | self._evaluate(node[2])
+        return set(self._documents) - self._evaluate(node[1])
+
+    def search(self, query: str) -> List[Dict]:
+        """Get the candidates matching a boolean skill query, most recently stored first."""
+        tree = parse_query(query)
+        with self._lock:
+            candidates = [self._documents[doc_id] for doc_id in self._evaluate(tree)]
+        return sorted(candidates, key=lambda candidate: candidate["seq"], reverse=True)
+
+
+_index = SkillIndex()
+add_pool_listener(_index)
+
+
+def search_candidates(query: str, settings: Settings) -> List[Dict]:
+    """
+    Search the stored resumes with a boolean skill query such as
+    `python AND (django OR fastapi) NOT php`.
+
+    The index picks up resumes stored since the previous search before
+    answering, so newly uploaded CVs are searchable without a rebuild.
+    """
+    get_candidate_pool(settings)
+    return _index.search(query)
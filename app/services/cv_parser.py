@@ -1,3 +1,4 @@
+import logging
 import re
 import spacy
 from typing import Dict
@@ -6,6 +7,10 @@ from huggingface_hub import InferenceClient
 from openai import OpenAI
 import json
 
+from app.services.executors import run_cpu, run_io
+
+logger = logging.getLogger(__name__)
+
 # Initialize spaCy model
 try:
     nlp = spacy.load("en_core_web_sm")
@@ -18,118 +23,133 @@ except OSError:
 
 def extract_information(text: str, settings) -> Dict:
     """Extract relevant information from resume text using AI and fallback to spaCy."""
-
     try:
-        # Try AI-based extraction first
-
-        # Initialize Hugging Face client
-        # client = InferenceClient(
-        #     provider="cerebras",
-        #     api_key=settings.HUGGING_FACE_TOKEN
-        # )
-
-        client = OpenAI(
-            api_key=settings.OPEN_AI,
-            base_url="https://inference.baseten.co/v1"
-        )
-
-        prompt = f"""
-        Extract information from this resume text and respond in the following JSON format:
-        {{
-            "name": "full name",
-            "email": "email address",
-            "phone": "phone number",
-            "education": ["list of education details"],
-            "skills": ["list of skills"],
-            "experience": [
-                {{"description": "experience description"}}
-            ]
-        }}
-
-        Resume text:
-        {text}
-
-        Return only the JSON structure, no other text.
-        """
-
-        # completion = client.chat.completions.create(
-        #     model="Qwen/Qwen3-32B",
-        #     messages=[{"role": "user", "content": prompt}]
-        # )
-
-        # # Parse AI response
-        # json_str = completion.choices[0].message.content
-
-
-        response = client.chat.completions.create(
-            model="meta-llama/Llama-4-Scout-17B-16E-Instruct",
-            messages=[{"role": "user", "content": prompt}],
-        )
-        
-        # Parse the response content
-        content = response.choices[0].message.content
-        json_str = content.strip('`json\n').strip()
-
-        while '<think>' in json_str and '</think>' in json_str:
-            start = json_str.find('<think>')
-            end = json_str.find('</think>') + len('</think>')
-            json_str = json_str[:start] + json_str[end:]
-        
-        result = json.loads(json_str)
-        result["parsed_date"] = datetime.now().isoformat()
-
-        # Check if either email or phone is empty and process accordingly
-        if not result["email"] or not result["phone"]:
-            doc = nlp(text)
-            
-            if not result["email"]:
-                email_pattern = r"[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+`\.[a-zA-Z]{2,}"
-                if emails := re.findall(email_pattern, text):
-                    result["email"] = emails[0]
-            
-            if not result["phone"]:
-                phone_pattern = r"(?:\+91[\s-]?(?:\d{5}\s\d{5}|\d{10}|\d{4}-\d{6}))|(?:\+\d{1,3}[-\s]?\d{3}[-\s]?\d{3}[-\s]?\d{4})|(?:\b\d{3}[-\.]?\d{3}[-\.]?\d{4}\b)|(?:\b\d{10}\b)"
-                if phones := re.findall(phone_pattern, text):
-                    result["phone"] = phones[0]
-
-        return result
+        return extract_information_with_ai(text, settings)
+    except Exception as e:
+        logger.warning(f"AI extraction failed, falling back to spaCy: {str(e)}")
+        return extract_information_with_spacy(text)
+
 
+async def extract_information_offloaded(text: str, settings) -> Dict:
+    """
+    `extract_information` for async code: the AI call waits in the I/O pool
+    and the spaCy fallback runs in the CPU pool, so neither blocks the event loop.
+    """
+    try:
+        return await run_io(settings, extract_information_with_ai, text, settings)
     except Exception as e:
-        # Fallback to spaCy-based extraction
-        print(e)
-        doc = nlp(text)
-        
-        email_pattern = r"[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+`\.[a-zA-Z]{2,}"
-        emails = re.findall(email_pattern, text)
-        
-        phone_pattern = r"(?:\+91[\s-]?(?:\d{5}\s\d{5}|\d{10}|\d{4}-\d{6}))|(?:\+\d{1,3}[-\s]?\d{3}[-\s]?\d{3}[-\s]?\d{4})|(?:\b\d{3}[-\.]?\d{3}[-\.]?\d{4}\b)|(?:\b\d{10}\b)"
-        phones = re.findall(phone_pattern, text)
-        
-        name = next((ent.text for ent in doc.ents if ent.label_ == "PERSON"), None)
-        
-        education = []
-        edu_keywords = {"degree", "bachelor", "master", "phd", "diploma", "university", "college", "school", "certification"}
-        for sent in doc.sents:
-            if any(keyword in sent.text.lower() for keyword in edu_keywords):
-                education.append(sent.text.strip())
-        
-        skills = []
-        for token in doc:
-            if token.pos_ in {"PROPN", "NOUN"} and len(token.text) > 2 and token.text.lower() not in {"the", "and", "for", "with"}:
-                skills.append(token.text)
-        
-        experience = []
-        exp_keywords = {"experience", "work", "employment", "job", "position", "role", "career", "professional"}
-        for sent in doc.sents:
-            if any(keyword in sent.text.lower() for keyword in exp_keywords):
-                experience.append({"description": sent.text.strip()})
+        logger.warning(f"AI extraction failed, falling back to spaCy: {str(e)}")
+        return await run_cpu(settings, extract_information_with_spacy, text)
+
+
+def extract_information_with_ai(text: str, settings) -> Dict:
+    """Extract relevant information from resume text with the AI model; raises if the model gives no usable answer."""
+    # Initialize Hugging Face client
+    # client = InferenceClient(
+    #     provider="cerebras",
+    #     api_key=settings.HUGGING_FACE_TOKEN
+    # )
+
+    client = OpenAI(
+        api_key=settings.OPEN_AI,
+        base_url="https://inference.baseten.co/v1"
+    )
+
+    prompt = f"""
+    Extract information from this resume text and respond in the following JSON format:
+    {{
+        "name": "full name",
+        "email": "email address",
+        "phone": "phone number",
+        "education": ["list of education details"],
+        "skills": ["list of skills"],
+        "experience": [
+            {{"description": "experience description"}}
+        ]
+    }}
+
+    Resume text:
+    {text}
+
+    Return only the JSON structure, no other text.
+    """
+
+    # completion = client.chat.completions.create(
+    #     model="Qwen/Qwen3-32B",
+    #     messages=[{"role": "user", "content": prompt}]
+    # )
+
+    # # Parse AI response
+    # json_str = completion.choices[0].message.content
+
+
+    response = client.chat.completions.create(
+        model="meta-llama/Llama-4-Scout-17B-16E-Instruct",
+        messages=[{"role": "user", "content": prompt}],
+    )
+    
+    # Parse the response content
+    content = response.choices[0].message.content
+    json_str = content.strip('`json\n').strip()
+
+    while '<think>' in json_str and '</think>' in json_str:
+        start = json_str.find('<think>')
+        end = json_str.find('</think>') + len('</think>')
+        json_str = json_str[:start] + json_str[end:]
+    
+    result = json.loads(json_str)
+    result["parsed_date"] = datetime.now().isoformat()
+
+    # Check if either email or phone is empty and process accordingly
+    if not result["email"] or not result["phone"]:
+        if not result["email"]:
+            email_pattern = r"[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+`\.[a-zA-Z]{2,}"
+            if emails := re.findall(email_pattern, text):
+                result["email"] = emails[0]
         
-        return {
-            "name": name,
-            "email": emails[0] if emails else None,
-            "phone": phones[0] if phones else None,
-            "education": list(set(education)),
-            "skills": list(set(skills)),
-            "experience": experience[:5],
-            "parsed_date": datetime.now().isoformat()
-        }
\ No newline at end of file
+        if not result["phone"]:
+            phone_pattern = r"(?:\+91[\s-]?(?:\d{5}\s\d{5}|\d{10}|\d{4}-\d{6}))|(?:\+\d{1,3}[-\s]?\d{3}[-\s]?\d{3}[-\s]?\d{4})|(?:\b\d{3}[-\.]?\d{3}[-\.]?\d{4}\b)|(?:\b\d{10}\b)"
+            if phones := re.findall(phone_pattern, text):
+                result["phone"] = phones[0]
+
+    return result
+
+
+def extract_information_with_spacy(text: str) -> Dict:
+    """Extract relevant information from resume text with spaCy and regular expressions."""
+    doc = nlp(text)
+    
+    email_pattern = r"[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+`\.[a-zA-Z]{2,}"
+    emails = re.findall(email_pattern, text)
+    
+    phone_pattern = r"(?:\+91[\s-]?(?:\d{5}\s\d{5}|\d{10}|\d{4}-\d{6}))|(?:\+\d{1,3}[-\s]?\d{3}[-\s]?\d{3}[-\s]?\d{4})|(?:\b\d{3}[-\.]?\d{3}[-\.]?\d{4}\b)|(?:\b\d{10}\b)"
+    phones = re.findall(phone_pattern, text)
+    
+    name = next((ent.text for ent in doc.ents if ent.label_ == "PERSON"), None)
+    
+    education = []
+    edu_keywords = {"degree", "bachelor", "master", "phd", "diploma", "university", "college", "school", "certification"}
+    for sent in doc.sents:
+        if any(keyword in sent.text.lower() for keyword in edu_keywords):
+            education.append(sent.text.strip())
+    
+    skills = []
+    for token in doc:
+        if token.pos_ in {"PROPN", "NOUN"} and len(token.text) > 2 and token.text.lower() not in {"the", "and", "for", "with"}:
+            skills.append(token.text)
+    
+    experience = []
+    exp_keywords = {"experience", "work", "employment", "job", "position", "role", "career", "professional"}
+    for sent in doc.sents:
+        if any(keyword in sent.text.lower() for keyword in exp_keywords):
+            experience.append({"description": sent.text.strip()})
+    
+    return {
+        "name": name,
+        "email": emails[0] if emails else None,
+        "phone": phones[0] if phones else None,
+        "education": list(set(education)),
+        "skills": list(set(skills)),
+        "experience": experience[:5],
+        "parsed_date": datetime.now().isoformat()
+    }
\ No newline at end of file
@@ -0,0 +1,203 @@
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional, Tuple
+
+import psycopg2
+from psycopg2 import extensions
+
+from app.config import Settings
+
+logger = logging.getLogger(__name__)
+
+
+class PoolTimeoutError(Exception):
+    """Raised when no database connection becomes available in time."""
+
+
+class ConnectionPool:
+    """
+    Thread-safe pool of psycopg2 connections.
+
+    Keeps up to `DB_POOL_MAX_SIZE` connections open and reuses them across
+    requests. Idle connections are health-checked before being handed out
+    again, and callers wait up to `DB_POOL_TIMEOUT` seconds when every
+    connection is in use.
+    """
+
+    def __init__(self, settings: Settings):
+        self._settings = settings
+        self._lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(settings.DB_POOL_MAX_SIZE)
+        self._idle: List[Tuple[extensions.connection, float]] = []
+        self._in_use = 0
+        self._closed = False
+
+    def _connect(self) -> extensions.connection:
+        settings = self._settings
+        return psycopg2.connect(
+            host=settings.DB_HOST,
+            port=settings.DB_PORT,
+            database=settings.DB_DATABASE,
+            user=settings.DB_USER,
+            password=settings.DB_PASSWORD
+        )
+
+    def open(self) -> None:
+        """Open the minimum number of connections up front."""
+        with self._lock:
+            while len(self._idle) < self._settings.DB_POOL_MIN_SIZE:
+                self._idle.append((self._connect(), time.monotonic()))
+
+    def _is_healthy(self, conn: extensions.connection, idle_since: float) -> bool:
+        if conn.closed or conn.info.transaction_status == extensions.TRANSACTION_STATUS_UNKNOWN:
+            return False
+        if time.monotonic() - idle_since < self._settings.DB_POOL_HEALTH_CHECK_INTERVAL:
+            return True
+        try:
+            with conn.cursor() as cur:
+                cur.execute("SELECT 1")
+            conn.rollback()
+            return True
+        except psycopg2.Error:
+            return False
+
+    def _checkout(self) -> extensions.connection:
+        while True:
+            with self._lock:
+                if self._closed:
+                    raise psycopg2.InterfaceError("connection pool is closed")
+                # Most recently used first, so the rest can age out of use
+                entry = self._idle.pop() if self._idle else None
+            if entry is None:
+                return self._connect()
+            conn, idle_since = entry
+            if self._is_healthy(conn, idle_since):
+                return conn
+            logger.warning("Discarding broken database connection from pool")
+            conn.close()
+
+    def _checkin(self, conn: extensions.connection) -> None:
+        if not conn.closed and conn.info.transaction_status != extensions.TRANSACTION_STATUS_IDLE:
+            try:
+                conn.rollback()
+            except psycopg2.Error:
+                conn.close()
+        with self._lock:
+            if self._closed or conn.closed:
+                conn.close()
+            else:
+                self._idle.append((conn, time.monotonic()))
+
+    @contextmanager
+    def connection(self) -> Iterator[extensions.connection]:
+        """
+        Borrow a connection for the duration of the block.
+
+        Like using a psycopg2 connection as a context manager, the transaction
+        is committed when the block succeeds and rolled back when it raises.
+        """
+        if not self._slots.acquire(timeout=self._settings.DB_POOL_TIMEOUT):
+            raise PoolTimeoutError(
+                f"No database connection available after {self._settings.DB_POOL_TIMEOUT}s"
+            )
+        try:
+            conn = self._checkout()
+            with self._lock:
+                self._in_use += 1
+            try:
+                yield conn
+                if not conn.closed:
+                    conn.commit()
+            except BaseException:
+                if not conn.closed:
+                    conn.rollback()
+                raise
+            finally:
+                with self._lock:
+                    self._in_use -= 1
+                self._checkin(conn)
+        finally:
+            self._slots.release()
+
+    def close(self) -> None:
+        """Close every idle connection; connections in use are closed when returned."""
+        with self._lock:
+            self._closed = True
+            idle, self._idle = self._idle, []
+        for conn, _ in idle:
+            conn.close()
+
+    def stats(self) -> Dict[str, int]:
+        """Current pool usage."""
+        with self._lock:
+            return {
+                "idle": len(self._idle),
+                "in_use": self._in_use,
+                "max_size": self._settings.DB_POOL_MAX_SIZE,
+            }
+
+
+def uses_postgres(settings: Settings) -> bool:
+    """Check whether any store is configured to use Postgres."""
+    return "postgres" in (settings.JOB_STORE_BACKEND, settings.RESUME_STORE_BACKEND, settings.MATCH_STORE_BACKEND)
+
+
+_pool: Optional[ConnectionPool] = None
+_pool_lock = threading.Lock()
+
+
+def init_db_pool(settings: Settings) -> ConnectionPool:
+    """
+    Create the shared connection pool if it does not exist yet, and apply
+    the pending schema migrations before anything can use it.
+
+    Called at startup and again on first use when the database was not
+    reachable then, so the schema exists whenever the pool does.
+    """
+    # Imported here, as the migrations module imports this one
+    from app.services.migrations import run_migrations
+
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            pool = ConnectionPool(settings)
+            try:
+                pool.open()
+                with pool.connection() as conn:
+                    applied = run_migrations(conn)
+            except BaseException:
+                pool.close()
+                raise
+            if applied:
+                logger.info(f"Applied database migrations: {applied}")
+            _pool = pool
+            logger.info(
+                f"Database connection pool opened "
+                f"(min={settings.DB_POOL_MIN_SIZE}, max={settings.DB_POOL_MAX_SIZE})"
+            )
+        return _pool
+
+
+def close_db_pool() -> None:
+    """Close the shared connection pool."""
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.close()
+            _pool = None
+            logger.info("Database connection pool closed")
+
+
+def get_db_pool_stats() -> Optional[Dict[str, int]]:
+    """Usage of the shared connection pool, or None when it is not open."""
+    return _pool.stats() if _pool is not None else None
+
+
+@contextmanager
+def get_db_connection(settings: Settings) -> Iterator[extensions.connection]:
+    """Borrow a pooled connection to the database, opening the pool on first use."""
+    pool = _pool or init_db_pool(settings)
+    with pool.connection() as conn:
+        yield conn
@@ -0,0 +1,153 @@
+import asyncio
+import hashlib
+import re
+import threading
+import zlib
+from typing import Any, Awaitable, Callable, Dict, Hashable, List, Optional, Tuple
+
+import numpy as np
+
+from app.config import Settings
+from app.services.resume_store import PoolListener, add_pool_listener, get_candidate_pool, get_parsed_resume
+
+# Words per shingle; resumes are compared by the sets of their word 3-grams
+SHINGLE_SIZE = 3
+
+# MinHash signature length, split into LSH bands of rows. 16 bands of 8
+# rows find texts with a Jaccard similarity of 0.9 with probability > 0.999
+# and rarely pair texts below 0.7.
+MINHASH_PERMUTATIONS = 128
+LSH_BANDS = 16
+LSH_ROWS = MINHASH_PERMUTATIONS // LSH_BANDS
+
+WORD_PATTERN = re.compile(r"\w+")
+
+_MERSENNE_PRIME = (1 << 31) - 1
+# Signatures are stored, so the permutations must be the same in every process and release
+_random = np.random.RandomState(20240601)
+_PERMUTATION_A = _random.randint(1, _MERSENNE_PRIME, MINHASH_PERMUTATIONS).astype(np.uint64)
+_PERMUTATION_B = _random.randint(0, _MERSENNE_PRIME, MINHASH_PERMUTATIONS).astype(np.uint64)
+
+
+def content_hash(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+def fingerprint(text: str) -> Dict:
+    """
+    Fingerprint extracted resume text for duplicate detection.
+
+    `text_hash` identifies texts that are the same after lower-casing and
+    dropping punctuation and layout; `minhash` estimates how much of their
+    wording two texts share. Both are None for a text without words, e.g.
+    a scanned PDF, so such files are never taken for each other.
+    """
+    words = WORD_PATTERN.findall(text.lower())
+    if not words:
+        return {"text_hash": None, "minhash": None}
+
+    shingles = {" ".join(words[i:i + SHINGLE_SIZE]) for i in range(max(len(words) - SHINGLE_SIZE + 1, 1))}
+    hashes = np.fromiter(
+        (zlib.crc32(shingle.encode()) & _MERSENNE_PRIME for shingle in shingles),
+        dtype=np.uint64,
+        count=len(shingles)
+    )
+    # Operands stay below 2**31, so the products fit in 64 bits
+    signature = ((np.outer(hashes, _PERMUTATION_A) + _PERMUTATION_B) % _MERSENNE_PRIME).min(axis=0)
+    return {
+        "text_hash": hashlib.sha256(" ".join(words).encode()).hexdigest(),
+        "minhash": signature.tolist(),
+    }
+
+
+def _signature(minhash: List[int]) -> np.ndarray:
+    # Values are below 2**31, so 4 bytes each are enough
+    return np.array(minhash, dtype=np.uint32)
+
+
+def _band_keys(signature: np.ndarray) -> List[Tuple[int, bytes]]:
+    return [(band, signature[band * LSH_ROWS:(band + 1) * LSH_ROWS].tobytes()) for band in range(LSH_BANDS)]
+
+
+class DuplicateIndex(PoolListener):
+    """LSH index over the fingerprints of stored resumes, fed from the resume pool."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._by_text_hash: Dict[str, str] = {}
+        self._buckets: Dict[Tuple[int, bytes], List[Tuple[str, np.ndarray]]] = {}
+
+    def reset(self) -> None:
+        with self._lock:
+            self._by_text_hash = {}
+            self._buckets = {}
+
+    def add(self, candidate: Dict, data: Dict) -> None:
+        resume_fingerprint = data.get("fingerprint") or {}
+        if not resume_fingerprint.get("minhash"):
+            # Stored before fingerprints were kept, or without words
+            return
+        # Only this index keeps the signature, packed, not the resume pool
+        signature = _signature(resume_fingerprint["minhash"])
+        with self._lock:
+            self._by_text_hash.setdefault(resume_fingerprint["text_hash"], candidate["id"])
+            for key in _band_keys(signature):
+                self._buckets.setdefault(key, []).append((candidate["id"], signature))
+
+    def find(self, resume_fingerprint: Dict, min_similarity: float) -> Optional[str]:
+        """ID of the stored resume most similar to `resume_fingerprint`, if it is at least `min_similarity` similar."""
+        with self._lock:
+            resume_id = self._by_text_hash.get(resume_fingerprint["text_hash"])
+            if resume_id:
+                return resume_id
+
+            signature = _signature(resume_fingerprint["minhash"])
+            best_id, best_similarity = None, min_similarity
+            compared = set()
+            for key in _band_keys(signature):
+                for candidate_id, candidate_signature in self._buckets.get(key, []):
+                    if candidate_id in compared:
+                        continue
+                    compared.add(candidate_id)
+                    # The share of equal MinHash values estimates the Jaccard similarity
+                    similarity = float(np.mean(signature == candidate_signature))
+                    if similarity >= best_similarity:
+                        best_id, best_similarity = candidate_id, similarity
+            return best_id
+
+
+_index = DuplicateIndex()
+add_pool_listener(_index)
+
+
+def find_stored_duplicate(resume_fingerprint: Dict, settings: Settings) -> Optional[Dict]:
+    """
+    Get the stored resume with the same or nearly the same text, with an
+    estimated shingle similarity of at least DEDUP_SIMILARITY; blocking.
+    """
+    if not resume_fingerprint.get("minhash"):
+        return None
+    get_candidate_pool(settings)
+    resume_id = _index.find(resume_fingerprint, settings.DEDUP_SIMILARITY)
+    return get_parsed_resume(resume_id, settings) if resume_id else None
+
+
+class BatchDuplicates:
+    """
+    Work shared between the files of one request, so identical documents
+    are extracted, parsed and assessed once however often they are attached.
+    """
+
+    def __init__(self):
+        self._tasks: Dict[Hashable, asyncio.Future] = {}
+
+    async def once(self, key: Hashable, compute: Callable[[], Awaitable[Any]]) -> Tuple[Any, bool]:
+        """
+        Run `compute` for the first file with `key` and give every later one
+        its result; returns `(result, first)`.
+        """
+        task = self._tasks.get(key)
+        first = task is None
+        if first:
+            task = self._tasks[key] = asyncio.ensure_future(compute())
+        return await task, first
@@ -0,0 +1,237 @@
+import asyncio
+import logging
+import multiprocessing
+import threading
+import time
+from concurrent.futures import BrokenExecutor, Executor, Future, InvalidStateError, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+
+from fastapi import HTTPException
+
+from app.config import Settings
+
+logger = logging.getLogger(__name__)
+
+
+class PoolMetrics:
+    """Counters for one executor pool."""
+
+    def __init__(self, workers: int):
+        self._lock = threading.Lock()
+        self.workers = workers
+        self.in_flight = 0
+        self.completed = 0
+        self.failed = 0
+        self.wait_seconds = 0.0
+        self.run_seconds = 0.0
+
+    def submitted(self) -> None:
+        with self._lock:
+            self.in_flight += 1
+
+    def finished(self, ok: bool, wait_seconds: float, run_seconds: float) -> None:
+        with self._lock:
+            self.in_flight -= 1
+            if ok:
+                self.completed += 1
+            else:
+                self.failed += 1
+            self.wait_seconds += wait_seconds
+            self.run_seconds += run_seconds
+
+    def snapshot(self) -> Dict[str, float]:
+        with self._lock:
+            finished = self.completed + self.failed
+            return {
+                "workers": self.workers,
+                "in_flight": self.in_flight,
+                # Tasks beyond the worker count are waiting for a free worker
+                "queued": max(self.in_flight - self.workers, 0),
+                "completed": self.completed,
+                "failed": self.failed,
+                "avg_wait_ms": round(1000 * self.wait_seconds / finished, 2) if finished else 0.0,
+                "avg_run_ms": round(1000 * self.run_seconds / finished, 2) if finished else 0.0,
+            }
+
+
+class _HTTPError:
+    """An HTTPException raised in a worker process; HTTPException itself cannot be unpickled."""
+
+    def __init__(self, status_code: int, detail: Any):
+        self.status_code = status_code
+        self.detail = detail
+
+
+def _timed_call(func: Callable, args: tuple, kwargs: dict) -> tuple:
+    """Run `func` in a worker and return `(started, finished, outcome)`."""
+    started = time.time()
+    try:
+        outcome = func(*args, **kwargs)
+    except HTTPException as e:
+        outcome = _HTTPError(e.status_code, e.detail)
+    return started, time.time(), outcome
+
+
+def _preload_models() -> None:
+    """Load spaCy once per CPU worker process instead of on its first task."""
+    import app.services.cv_parser  # noqa: F401
+    import app.services.matcher  # noqa: F401
+
+
+def _ready() -> bool:
+    return True
+
+
+class ManagedPool:
+    """An executor with metrics, shared by every request on this worker."""
+
+    def __init__(self, name: str, factory: Callable[[], Executor], workers: int):
+        self.name = name
+        self._factory = factory
+        self._lock = threading.Lock()
+        self.executor = factory()
+        self.metrics = PoolMetrics(workers)
+
+    def _replace(self, broken: Executor) -> None:
+        # A worker process that dies (e.g. a parser crashing on a malformed file)
+        # breaks the whole pool; later tasks get a fresh one
+        with self._lock:
+            if self.executor is broken:
+                logger.error(f"Executor pool '{self.name}' broke; starting a new one")
+                self.executor = self._factory()
+        broken.shutdown(wait=False, cancel_futures=True)
+
+    def submit(self, func: Callable, *args, **kwargs) -> Future:
+        """Submit `func(*args, **kwargs)`; the future resolves to its result."""
+        submitted = time.time()
+        self.metrics.submitted()
+        result: Future = Future()
+        executor = self.executor
+
+        def resolve(set_outcome: Callable, value: Any) -> None:
+            # The caller may have cancelled `result` already, e.g. when a request stops early
+            try:
+                set_outcome(value)
+            except InvalidStateError:
+                pass
+
+        def done(inner: Future) -> None:
+            finished = time.time()
+            try:
+                started, finished, outcome = inner.result()
+            except BaseException as e:
+                self.metrics.finished(False, 0.0, finished - submitted)
+                if isinstance(e, BrokenExecutor):
+                    self._replace(executor)
+                resolve(result.set_exception, e)
+                return
+            failed = isinstance(outcome, _HTTPError)
+            self.metrics.finished(not failed, max(started - submitted, 0.0), finished - started)
+            if failed:
+                resolve(result.set_exception, HTTPException(status_code=outcome.status_code, detail=outcome.detail))
+            else:
+                resolve(result.set_result, outcome)
+
+        try:
+            inner = executor.submit(_timed_call, func, args, kwargs)
+        except BrokenExecutor:
+            self._replace(executor)
+            executor = self.executor
+            inner = executor.submit(_timed_call, func, args, kwargs)
+        inner.add_done_callback(done)
+        return result
+
+    def call(self, func: Callable, *args, **kwargs) -> Any:
+        """Run `func` in the pool and wait for it; for code that is already off the event loop."""
+        return self.submit(func, *args, **kwargs).result()
+
+    async def run(self, func: Callable, *args, **kwargs) -> Any:
+        """Run `func` in the pool without blocking the event loop."""
+        return await asyncio.wrap_future(self.submit(func, *args, **kwargs))
+
+    def shutdown(self) -> None:
+        self.executor.shutdown(wait=True, cancel_futures=True)
+
+
+_io_pool: Optional[ManagedPool] = None
+_cpu_pool: Optional[ManagedPool] = None
+_pools_lock = threading.Lock()
+
+
+def io_pool(settings: Settings) -> ManagedPool:
+    """
+    Thread pool for blocking I/O: file copies, database calls and remote AI calls.
+
+    It is separate from the threadpool FastAPI uses for plain `def`
+    endpoints, so bulk uploads cannot starve health checks.
+    """
+    global _io_pool
+    with _pools_lock:
+        if _io_pool is None:
+            _io_pool = ManagedPool(
+                "io",
+                lambda: ThreadPoolExecutor(max_workers=settings.IO_WORKERS, thread_name_prefix="io-worker"),
+                settings.IO_WORKERS
+            )
+        return _io_pool
+
+
+def cpu_pool(settings: Settings) -> ManagedPool:
+    """
+    Process pool for CPU-heavy work: text extraction, spaCy parsing and scoring.
+
+    Separate processes keep such work from holding the GIL of the worker
+    serving requests. With `CPU_WORKERS` set to 0 the work runs in the I/O
+    thread pool instead.
+    """
+    global _cpu_pool
+    if settings.CPU_WORKERS <= 0:
+        return io_pool(settings)
+    with _pools_lock:
+        if _cpu_pool is None:
+            # Forking a process that runs threads can copy held locks, so start clean interpreters
+            _cpu_pool = ManagedPool(
+                "cpu",
+                lambda: ProcessPoolExecutor(
+                    max_workers=settings.CPU_WORKERS,
+                    mp_context=multiprocessing.get_context("spawn"),
+                    initializer=_preload_models
+                ),
+                settings.CPU_WORKERS
+            )
+        return _cpu_pool
+
+
+async def run_io(settings: Settings, func: Callable, *args, **kwargs) -> Any:
+    """Run blocking I/O in the I/O thread pool."""
+    return await io_pool(settings).run(func, *args, **kwargs)
+
+
+async def run_cpu(settings: Settings, func: Callable, *args, **kwargs) -> Any:
+    """Run CPU-heavy work in the CPU process pool; `func` and its arguments must be picklable."""
+    return await cpu_pool(settings).run(func, *args, **kwargs)
+
+
+def start_executors(settings: Settings) -> None:
+    """Create the pools and start every CPU worker, so models are loaded before the first request."""
+    pool = cpu_pool(settings)
+    io_pool(settings)
+    if pool.name == "cpu":
+        for _ in range(settings.CPU_WORKERS):
+            pool.submit(_ready)
+        logger.info(f"Started executors (io={settings.IO_WORKERS}, cpu={settings.CPU_WORKERS})")
+
+
+def shutdown_executors() -> None:
+    """Wait for running tasks and stop the pools."""
+    global _io_pool, _cpu_pool
+    with _pools_lock:
+        pools = [pool for pool in (_cpu_pool, _io_pool) if pool is not None]
+        _io_pool = _cpu_pool = None
+    for pool in pools:
+        pool.shutdown()
+
+
+def executor_metrics() -> Dict[str, Dict[str, float]]:
+    """Current size and load of each pool."""
+    return {pool.name: pool.metrics.snapshot() for pool in (_io_pool, _cpu_pool) if pool is not None}
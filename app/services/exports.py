@@ -0,0 +1,249 @@
+import csv
+import io
+import math
+import re
+import zipfile
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+from xml.sax.saxutils import escape, quoteattr
+
+from fastapi import HTTPException, status
+from fastapi.responses import StreamingResponse
+
+from app.config import Settings
+
+EXPORT_FORMATS = {
+    "xlsx": ("xlsx", "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"),
+    "csv": ("csv", "text/csv"),
+    "parquet": ("parquet", "application/vnd.apache.parquet"),
+}
+# Older clients ask for "excel"
+FORMAT_ALIASES = {"excel": "xlsx"}
+
+# Characters XML 1.0 does not allow, e.g. control characters from PDF text
+_ILLEGAL_XML_CHARS = re.compile("[\x00-\x08\x0b\x0c\x0e-\x1f\ufffe\uffff]")
+
+
+class Sheet:
+    """
+    One table of an export. `rows` is called for a fresh iterator of row
+    dicts each time the rows are read, so they are never all held at once.
+    """
+
+    def __init__(self, name: str, rows: Callable[[], Iterable[Dict]], columns: Optional[List[str]] = None):
+        self.name = name
+        self.rows = rows
+        self._columns = columns
+
+    @property
+    def columns(self) -> List[str]:
+        """The given columns, or every key of the rows in order of first appearance."""
+        if self._columns is None:
+            columns = {}
+            for row in self.rows():
+                columns.update(dict.fromkeys(row))
+            self._columns = list(columns)
+        return self._columns
+
+
+def export_format(name: str) -> str:
+    """Normalize a requested export format; 400 if it is unknown or its library is missing."""
+    export = FORMAT_ALIASES.get(name.lower(), name.lower())
+    if export not in EXPORT_FORMATS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unsupported export format: {name}. Supported formats: {', '.join(EXPORT_FORMATS)}"
+        )
+    if export == "parquet":
+        try:
+            import pyarrow  # noqa: F401
+        except ImportError:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Parquet export is not available: pyarrow is not installed"
+            )
+    return export
+
+
+class _ChunkBuffer(io.RawIOBase):
+    """Write-only sink that hands out what was written since the last drain."""
+
+    def __init__(self):
+        self._chunks: List[bytes] = []
+        self.size = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        self.size += len(data)
+        return len(data)
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks = []
+        self.size = 0
+        return data
+
+
+def _column_letter(index: int) -> str:
+    letters = ""
+    index += 1
+    while index:
+        index, remainder = divmod(index - 1, 26)
+        letters = chr(65 + remainder) + letters
+    return letters
+
+
+def _xlsx_cell(reference: str, value: Any) -> str:
+    if value is None:
+        return ""
+    if isinstance(value, bool):
+        return f'<c r="{reference}" t="b"><v>{int(value)}</v></c>'
+    if isinstance(value, (int, float)) and math.isfinite(value):
+        return f'<c r="{reference}"><v>{value}</v></c>'
+    text = escape(_ILLEGAL_XML_CHARS.sub("", str(value)))
+    return f'<c r="{reference}" t="inlineStr"><is><t xml:space="preserve">{text}</t></is></c>'
+
+
+def _xlsx_row(number: int, references: List[str], values: Iterable[Any]) -> str:
+    cells = "".join(_xlsx_cell(f"{letter}{number}", value) for letter, value in zip(references, values))
+    return f'<row r="{number}">{cells}</row>'
+
+
+def _xlsx_workbook_parts(sheet_names: List[str]) -> List[Tuple[str, str]]:
+    sheets = "".join(
+        f'<sheet name={quoteattr(name[:31])} sheetId="{i}" r:id="rId{i}"/>'
+        for i, name in enumerate(sheet_names, 1)
+    )
+    relationships = "".join(
+        f'<Relationship Id="rId{i}" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet" Target="worksheets/sheet{i}.xml"/>'
+        for i in range(1, len(sheet_names) + 1)
+    )
+    overrides = "".join(
+        f'<Override PartName="/xl/worksheets/sheet{i}.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+        for i in range(1, len(sheet_names) + 1)
+    )
+    return [
+        ("[Content_Types].xml",
+         '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+         '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+         '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+         '<Default Extension="xml" ContentType="application/xml"/>'
+         '<Override PartName="/xl/workbook.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+         f'{overrides}</Types>'),
+        ("_rels/.rels",
+         '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+         '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+         '<Relationship Id="rId1" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" Target="xl/workbook.xml"/>'
+         '</Relationships>'),
+        ("xl/workbook.xml",
+         '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+         '<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+         'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">'
+         f'<sheets>{sheets}</sheets></workbook>'),
+        ("xl/_rels/workbook.xml.rels",
+         '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+         '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+         f'{relationships}</Relationships>'),
+    ]
+
+
+def _write_xlsx(sheets: List[Sheet], chunk_size: int) -> Iterator[bytes]:
+    """
+    Write an XLSX workbook row by row into a ZIP stream.
+
+    The ZIP entries are written without seeking (with data descriptors) and
+    cells hold inline strings instead of a shared string table, so memory
+    stays at about one chunk whatever the number of rows.
+    """
+    buffer = _ChunkBuffer()
+    with zipfile.ZipFile(buffer, "w", compression=zipfile.ZIP_DEFLATED) as workbook:
+        for part_name, content in _xlsx_workbook_parts([sheet.name for sheet in sheets]):
+            workbook.writestr(part_name, content)
+
+        for number, sheet in enumerate(sheets, 1):
+            columns = sheet.columns
+            references = [_column_letter(i) for i in range(len(columns))]
+            with workbook.open(f"xl/worksheets/sheet{number}.xml", "w", force_zip64=True) as part:
+                part.write(
+                    b'<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+                    b'<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main"><sheetData>'
+                )
+                part.write(_xlsx_row(1, references, columns).encode())
+                for row_number, row in enumerate(sheet.rows(), 2):
+                    part.write(_xlsx_row(row_number, references, (row.get(column) for column in columns)).encode())
+                    if buffer.size >= chunk_size:
+                        yield buffer.drain()
+                part.write(b"</sheetData></worksheet>")
+            yield buffer.drain()
+    yield buffer.drain()
+
+
+def _write_csv(sheet: Sheet, chunk_size: int) -> Iterator[bytes]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    columns = sheet.columns
+    writer.writerow(columns)
+    for row in sheet.rows():
+        writer.writerow(["" if row.get(column) is None else row.get(column) for column in columns])
+        if buffer.tell() >= chunk_size:
+            yield buffer.getvalue().encode()
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue().encode()
+
+
+def _write_parquet(sheet: Sheet, chunk_size: int, row_group_size: int) -> Iterator[bytes]:
+    """Write a Parquet file one row group at a time; every column is a nullable string."""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    columns = sheet.columns
+    schema = pa.schema([(column, pa.string()) for column in columns])
+    buffer = _ChunkBuffer()
+
+    def row_group(rows: List[Dict]) -> "pa.RecordBatch":
+        return pa.record_batch(
+            [
+                pa.array([None if row.get(column) is None else str(row.get(column)) for row in rows], pa.string())
+                for column in columns
+            ],
+            schema=schema
+        )
+
+    with pq.ParquetWriter(pa.PythonFile(buffer, mode="w"), schema) as writer:
+        rows = []
+        for row in sheet.rows():
+            rows.append(row)
+            if len(rows) >= row_group_size:
+                writer.write_batch(row_group(rows))
+                rows = []
+                if buffer.size >= chunk_size:
+                    yield buffer.drain()
+        if rows:
+            writer.write_batch(row_group(rows))
+    yield buffer.drain()
+
+
+def export_response(sheets: List[Sheet], export: str, file_stem: str, settings: Settings) -> StreamingResponse:
+    """
+    Stream `sheets` as an `export` file ("xlsx", "csv" or "parquet") without
+    a temporary file. CSV and Parquet hold one table, so they contain the
+    first sheet only.
+
+    The rows are written while the response is sent, in the threadpool
+    starlette iterates synchronous bodies in.
+    """
+    extension, media_type = EXPORT_FORMATS[export]
+    if export == "xlsx":
+        body = _write_xlsx(sheets, settings.EXPORT_CHUNK_SIZE)
+    elif export == "csv":
+        body = _write_csv(sheets[0], settings.EXPORT_CHUNK_SIZE)
+    else:
+        body = _write_parquet(sheets[0], settings.EXPORT_CHUNK_SIZE, settings.EXPORT_PARQUET_ROW_GROUP_SIZE)
+    return StreamingResponse(
+        body,
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{file_stem}.{extension}"'}
+    )
@@ -0,0 +1,141 @@
+import asyncio
+import logging
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+
+import asyncpg
+
+from app.config import Settings
+
+logger = logging.getLogger(__name__)
+
+# Postgres channel on which changed job IDs are announced to every worker
+INVALIDATION_CHANNEL = "job_description_changed"
+
+
+def cache_key(job_id: str) -> str:
+    """Canonical form of a job ID, so differently formatted UUIDs share an entry."""
+    try:
+        return str(uuid.UUID(job_id))
+    except ValueError:
+        return job_id
+
+
+class JobCache:
+    """
+    In-process LRU cache of `(job, match_profile)` by job ID.
+
+    Entries expire after `JOB_CACHE_TTL` seconds, at most
+    `JOB_CACHE_MAX_ENTRIES` are kept, and updates or deletes drop them
+    explicitly. Cached jobs are shared between requests and must not be
+    modified by callers.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, Tuple[float, Dict, Dict]]" = OrderedDict()
+        # Bumped on every invalidation, so a read that raced with an update
+        # cannot put the old version back into the cache
+        self._generation = 0
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, job_id: str) -> Optional[Tuple[Dict, Dict]]:
+        """Get a cached `(job, match_profile)`, or None when missing or expired."""
+        job_id = cache_key(job_id)
+        with self._lock:
+            entry = self._entries.get(job_id)
+            if entry is None or entry[0] < time.monotonic():
+                if entry is not None:
+                    del self._entries[job_id]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(job_id)
+            self.hits += 1
+            return entry[1], entry[2]
+
+    def generation(self) -> int:
+        """Token to pass to `put` for a value read from the database after this call."""
+        return self._generation
+
+    def put(self, job_id: str, job: Dict, match_profile: Dict, generation: int, settings: Settings) -> None:
+        """Cache a job read from the database, unless a job changed since `generation`."""
+        if settings.JOB_CACHE_MAX_ENTRIES <= 0:
+            return
+        job_id = cache_key(job_id)
+        with self._lock:
+            if generation != self._generation:
+                return
+            self._entries[job_id] = (time.monotonic() + settings.JOB_CACHE_TTL, job, match_profile)
+            self._entries.move_to_end(job_id)
+            while len(self._entries) > settings.JOB_CACHE_MAX_ENTRIES:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, job_id: Optional[str] = None) -> None:
+        """Drop one job from the cache, or every job when no ID is given."""
+        with self._lock:
+            self._generation += 1
+            if job_id is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(cache_key(job_id), None)
+
+    def stats(self) -> Dict[str, int]:
+        """Current cache usage."""
+        with self._lock:
+            return {"entries": len(self._entries), "hits": self.hits, "misses": self.misses}
+
+
+job_cache = JobCache()
+
+_listener: Optional[asyncpg.Connection] = None
+
+
+def _on_notification(connection: asyncpg.Connection, pid: int, channel: str, payload: str) -> None:
+    job_cache.invalidate(payload or None)
+
+
+def _on_listener_lost(connection: asyncpg.Connection) -> None:
+    # Notifications sent while disconnected are lost, so nothing cached can be trusted
+    global _listener
+    if connection is not _listener:
+        return
+    logger.warning("Job cache invalidation listener disconnected; clearing cache")
+    job_cache.invalidate()
+    _listener = None
+
+
+async def start_invalidation_listener(settings: Settings) -> None:
+    """
+    Listen for job changes made by other workers, if `JOB_CACHE_NOTIFY` is enabled.
+
+    Without the listener, changes made by other processes become visible
+    here once the cached entry expires.
+    """
+    global _listener
+    if _listener is not None or not settings.JOB_CACHE_NOTIFY or settings.JOB_STORE_BACKEND != "postgres":
+        return
+    _listener = await asyncpg.connect(
+        host=settings.DB_HOST,
+        port=settings.DB_PORT,
+        database=settings.DB_DATABASE,
+        user=settings.DB_USER,
+        password=settings.DB_PASSWORD,
+    )
+    _listener.add_termination_listener(_on_listener_lost)
+    await _listener.add_listener(INVALIDATION_CHANNEL, _on_notification)
+    logger.info(f"Listening for job cache invalidations on '{INVALIDATION_CHANNEL}'")
+
+
+async def stop_invalidation_listener() -> None:
+    """Close the invalidation listener connection."""
+    global _listener
+    if _listener is not None:
+        listener, _listener = _listener, None
+        try:
+            await asyncio.wait_for(listener.close(), timeout=5)
+        except (asyncio.TimeoutError, OSError, asyncpg.PostgresError):
+            listener.terminate()
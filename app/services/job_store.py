@@ -0,0 +1,717 @@
+import bisect
+import copy
+import json
+import re
+import sqlite3
+import threading
+import uuid
+from abc import ABC, abstractmethod
+from contextlib import closing
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from app.config import Settings
+from app.services import storage
+from app.services.job_cache import job_cache
+from app.services.matcher import build_job_profile, is_current_profile, normalize_skill
+
+
+def canonical_job_id(job_id: str) -> str:
+    """Canonical form of a job ID, matching how Postgres compares UUIDs."""
+    try:
+        return str(uuid.UUID(job_id))
+    except (ValueError, TypeError, AttributeError):
+        return job_id
+
+
+def project_job(job: Dict, keys: Optional[List[str]]) -> Dict:
+    """Keep only `keys` of a job, or the whole job when no projection is given."""
+    if keys is None:
+        return job
+    return {key: job.get(key) for key in keys}
+
+
+# Quoted phrases or bare words of a web-style search query
+SEARCH_TOKEN_PATTERN = re.compile(r'"([^"]*)"|(\S+)')
+
+# How much a match in each searchable part of a job counts towards its rank
+SEARCH_WEIGHTS = {"title": 10.0, "company": 5.0, "skills": 5.0, "description": 1.0}
+
+
+def parse_search_query(query: str) -> List[Tuple[List[str], List[str]]]:
+    """
+    Split a web-style search query into OR-separated groups of
+    `(required phrases, excluded phrases)`, like Postgres `websearch_to_tsquery`:
+    `python "machine learning" -php or golang`.
+    """
+    groups = [([], [])]
+    for match in SEARCH_TOKEN_PATTERN.finditer(query):
+        phrase, word = match.groups()
+        if word is not None and word.lower() == "or":
+            if groups[-1][0]:
+                groups.append(([], []))
+            continue
+        text = (phrase if phrase is not None else word).strip().lower()
+        if word is not None and text.startswith("-"):
+            text = text[1:]
+            if text:
+                groups[-1][1].append(text)
+        elif text:
+            groups[-1][0].append(text)
+    return [group for group in groups if group[0]]
+
+
+def search_fields(job: Dict) -> Dict[str, str]:
+    """The searchable text of a job, keyed like `SEARCH_WEIGHTS`."""
+    skills = [
+        skill for field in ("required_skills", "preferred_skills")
+        for skill in (job.get(field) or []) if isinstance(skill, str)
+    ]
+    return {
+        "title": str(job.get("title") or ""),
+        "company": str(job.get("company") or ""),
+        "skills": " ".join(skills),
+        "description": str(job.get("description") or ""),
+    }
+
+
+class JobStore(ABC):
+    """
+    Storage for job descriptions and their match profiles.
+
+    Every backend behaves the same way, which
+    tests/test_job_store_conformance.py checks, so routes and scripts do not
+    care which one `JOB_STORE_BACKEND` selects.
+    """
+
+    @abstractmethod
+    def save_job_description(self, job_data: Dict) -> str:
+        """Save a job description and return its ID."""
+
+    def save_job_descriptions(self, jobs: List[Dict]) -> List[str]:
+        """Save several job descriptions and return their IDs."""
+        return [self.save_job_description(job_data) for job_data in jobs]
+
+    @abstractmethod
+    def get_job_descriptions(self) -> List[Dict]:
+        """Get all job descriptions."""
+
+    @abstractmethod
+    def get_job_with_profile(self, job_id: str) -> Optional[Tuple[Dict, Dict]]:
+        """Get a job description together with its match profile."""
+
+    def get_job_description(self, job_id: str) -> Optional[Dict]:
+        """Get a specific job description by ID."""
+        job_entry = self.get_job_with_profile(job_id)
+        return job_entry[0] if job_entry else None
+
+    @abstractmethod
+    def get_jobs_with_profiles_by_ids(self, job_ids: List[str]) -> Tuple[List[Tuple[Dict, Dict]], List[str]]:
+        """Get `(job, match_profile)` pairs in request order and the IDs that were not found."""
+
+    def get_job_descriptions_by_ids(self, job_ids: List[str]) -> Tuple[List[Dict], List[str]]:
+        """Get job descriptions in request order and the IDs that were not found."""
+        job_entries, missing = self.get_jobs_with_profiles_by_ids(job_ids)
+        return [job for job, _ in job_entries], missing
+
+    @abstractmethod
+    def get_job_profiles(
+        self,
+        company: Optional[str] = None,
+        title_keyword: Optional[str] = None
+    ) -> List[Tuple[Dict, Dict]]:
+        """Get `(job, match_profile)` for every job, optionally filtered by company and title."""
+
+    @abstractmethod
+    def get_job_description_page(
+        self,
+        limit: int = 50,
+        cursor: Optional[str] = None,
+        fields: Optional[List[str]] = None,
+        title: Optional[str] = None,
+        company: Optional[str] = None,
+        skills: Optional[List[str]] = None
+    ) -> Tuple[List[Dict], Optional[str]]:
+        """Get one page of job descriptions, newest first, and the cursor of the next page."""
+
+    @abstractmethod
+    def search_job_descriptions(
+        self,
+        query: str,
+        limit: int = 20,
+        cursor: Optional[str] = None,
+        fields: Optional[List[str]] = None
+    ) -> Tuple[List[Dict], Optional[str]]:
+        """
+        Full-text search over job titles, companies, skills and descriptions.
+
+        Returns one page of matches, best first, each with its `rank`, and
+        the cursor of the next page.
+        """
+
+    @abstractmethod
+    def update_job_description(self, job_id: str, updated_data: Dict) -> bool:
+        """Merge `updated_data` into a job description and rebuild its match profile."""
+
+    @abstractmethod
+    def delete_job_description(self, job_id: str) -> bool:
+        """Delete a job description."""
+
+
+class PostgresJobStore(JobStore):
+    """Job store backed by the `job_descriptions` table in Postgres."""
+
+    def __init__(self, settings: Settings):
+        self.settings = settings
+
+    def save_job_description(self, job_data: Dict) -> str:
+        return storage.save_job_description(job_data, self.settings)
+
+    def save_job_descriptions(self, jobs: List[Dict]) -> List[str]:
+        return storage.save_job_descriptions(jobs, self.settings)
+
+    def get_job_descriptions(self) -> List[Dict]:
+        return storage.get_job_descriptions(self.settings)
+
+    def get_job_description(self, job_id: str) -> Optional[Dict]:
+        return storage.get_job_description(job_id, self.settings)
+
+    def get_job_with_profile(self, job_id: str) -> Optional[Tuple[Dict, Dict]]:
+        return storage.get_job_with_profile(job_id, self.settings)
+
+    def get_job_descriptions_by_ids(self, job_ids: List[str]) -> Tuple[List[Dict], List[str]]:
+        return storage.get_job_descriptions_by_ids(job_ids, self.settings)
+
+    def get_jobs_with_profiles_by_ids(self, job_ids: List[str]) -> Tuple[List[Tuple[Dict, Dict]], List[str]]:
+        return storage.get_jobs_with_profiles_by_ids(job_ids, self.settings)
+
+    def get_job_profiles(
+        self,
+        company: Optional[str] = None,
+        title_keyword: Optional[str] = None
+    ) -> List[Tuple[Dict, Dict]]:
+        return storage.get_job_profiles(self.settings, company, title_keyword)
+
+    def get_job_description_page(
+        self,
+        limit: int = 50,
+        cursor: Optional[str] = None,
+        fields: Optional[List[str]] = None,
+        title: Optional[str] = None,
+        company: Optional[str] = None,
+        skills: Optional[List[str]] = None
+    ) -> Tuple[List[Dict], Optional[str]]:
+        return storage.get_job_description_page(self.settings, limit, cursor, fields, title, company, skills)
+
+    def search_job_descriptions(
+        self,
+        query: str,
+        limit: int = 20,
+        cursor: Optional[str] = None,
+        fields: Optional[List[str]] = None
+    ) -> Tuple[List[Dict], Optional[str]]:
+        return storage.search_job_descriptions(self.settings, query, limit, cursor, fields)
+
+    def update_job_description(self, job_id: str, updated_data: Dict) -> bool:
+        return storage.update_job_description(job_id, updated_data, self.settings)
+
+    def delete_job_description(self, job_id: str) -> bool:
+        return storage.delete_job_description(job_id, self.settings)
+
+
+SQLITE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS job_descriptions (
+    -- Explicit so rowids, which key the search index, survive VACUUM
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    id TEXT NOT NULL UNIQUE,
+    data TEXT NOT NULL,
+    match_profile TEXT NOT NULL,
+    title TEXT,
+    company TEXT,
+    created_date TEXT
+);
+-- Jobs without a created_date sort as the oldest
+CREATE INDEX IF NOT EXISTS idx_job_descriptions_order
+    ON job_descriptions (COALESCE(created_date, '') DESC, id DESC);
+DROP INDEX IF EXISTS idx_job_descriptions_created_date_id;
+CREATE INDEX IF NOT EXISTS idx_job_descriptions_company
+    ON job_descriptions (lower(company));
+CREATE TABLE IF NOT EXISTS job_skills (
+    skill TEXT NOT NULL,
+    job_id TEXT NOT NULL,
+    PRIMARY KEY (skill, job_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_job_skills_job_id ON job_skills (job_id);
+-- Full-text index keyed by job_descriptions.rowid
+CREATE VIRTUAL TABLE IF NOT EXISTS job_search USING fts5(
+    title, company, skills, description,
+    tokenize = 'porter unicode61'
+);
+"""
+
+
+class SQLiteJobStore(JobStore):
+    """
+    Job store in a local SQLite database in WAL mode.
+
+    Meant for single-node deployments and local testing: readers never
+    block the writer, and each thread keeps its own connection.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._local = threading.local()
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        with closing(sqlite3.connect(path)) as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(SQLITE_SCHEMA)
+            # Index jobs stored before the search index existed
+            with conn:
+                for rowid, data in conn.execute(
+                    "SELECT rowid, data FROM job_descriptions WHERE rowid NOT IN (SELECT rowid FROM job_search)"
+                ).fetchall():
+                    self._index_search(conn, rowid, json.loads(data))
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30)
+            # No fsync per commit; WAL keeps the database consistent after a crash
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def _index_search(self, conn: sqlite3.Connection, rowid: int, job: Dict) -> None:
+        conn.execute("DELETE FROM job_search WHERE rowid = ?", (rowid,))
+        text = search_fields(job)
+        conn.execute(
+            "INSERT INTO job_search (rowid, title, company, skills, description) VALUES (?, ?, ?, ?, ?)",
+            (rowid, text["title"], text["company"], text["skills"], text["description"])
+        )
+
+    def _insert(self, conn: sqlite3.Connection, job_data: Dict, match_profile: Dict) -> None:
+        inserted = conn.execute(
+            """
+            INSERT INTO job_descriptions (id, data, match_profile, title, company, created_date)
+            VALUES (?, ?, ?, ?, ?, ?)
+            """,
+            (
+                canonical_job_id(job_data["id"]),
+                json.dumps(job_data),
+                json.dumps(match_profile),
+                job_data.get("title"),
+                job_data.get("company"),
+                job_data.get("created_date"),
+            )
+        )
+        self._index_skills(conn, canonical_job_id(job_data["id"]), match_profile)
+        self._index_search(conn, inserted.lastrowid, job_data)
+
+    def _index_skills(self, conn: sqlite3.Connection, job_id: str, match_profile: Dict) -> None:
+        conn.execute("DELETE FROM job_skills WHERE job_id = ?", (job_id,))
+        skills = set(match_profile["required_skills"]) | set(match_profile["preferred_skills"])
+        conn.executemany(
+            "INSERT INTO job_skills (skill, job_id) VALUES (?, ?)",
+            [(skill, job_id) for skill in skills]
+        )
+
+    def _rebuild_stale(self, conn: sqlite3.Connection, rows: List) -> List[Tuple[Dict, Dict]]:
+        """Decode `(id, data, match_profile)` rows, rebuilding and storing outdated profiles."""
+        job_entries = []
+        rebuilt = []
+        for job_id, data, match_profile in rows:
+            job, match_profile = json.loads(data), json.loads(match_profile)
+            if not is_current_profile(match_profile):
+                match_profile = build_job_profile(job)
+                rebuilt.append((job_id, match_profile))
+            job_entries.append((job, match_profile))
+        if rebuilt:
+            with conn:
+                for job_id, match_profile in rebuilt:
+                    conn.execute(
+                        "UPDATE job_descriptions SET match_profile = ? WHERE id = ?",
+                        (json.dumps(match_profile), job_id)
+                    )
+                    self._index_skills(conn, job_id, match_profile)
+        return job_entries
+
+    def save_job_description(self, job_data: Dict) -> str:
+        return self.save_job_descriptions([job_data])[0]
+
+    def save_job_descriptions(self, jobs: List[Dict]) -> List[str]:
+        conn = self._connect()
+        with conn:
+            for job_data in jobs:
+                if "id" not in job_data:
+                    job_data["id"] = str(uuid.uuid4())
+                self._insert(conn, job_data, build_job_profile(job_data))
+        return [job_data["id"] for job_data in jobs]
+
+    def get_job_descriptions(self) -> List[Dict]:
+        rows = self._connect().execute("SELECT data FROM job_descriptions").fetchall()
+        return [json.loads(row[0]) for row in rows]
+
+    def get_job_description(self, job_id: str) -> Optional[Dict]:
+        row = self._connect().execute(
+            "SELECT data FROM job_descriptions WHERE id = ?", (canonical_job_id(job_id),)
+        ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def get_job_with_profile(self, job_id: str) -> Optional[Tuple[Dict, Dict]]:
+        conn = self._connect()
+        rows = conn.execute(
+            "SELECT id, data, match_profile FROM job_descriptions WHERE id = ?", (canonical_job_id(job_id),)
+        ).fetchall()
+        return self._rebuild_stale(conn, rows)[0] if rows else None
+
+    def get_jobs_with_profiles_by_ids(self, job_ids: List[str]) -> Tuple[List[Tuple[Dict, Dict]], List[str]]:
+        canonical_ids = storage.normalize_job_ids(job_ids)
+        lookup_ids = list({canonical_id for canonical_id in canonical_ids.values() if canonical_id})
+        if not lookup_ids:
+            return [], list(canonical_ids)
+
+        conn = self._connect()
+        rows = conn.execute(
+            "SELECT id, data, match_profile FROM job_descriptions WHERE id IN (SELECT value FROM json_each(?))",
+            (json.dumps(lookup_ids),)
+        ).fetchall()
+        job_entries = self._rebuild_stale(conn, rows)
+        return storage.order_by_request(
+            {row[0]: job_entry for row, job_entry in zip(rows, job_entries)}, canonical_ids
+        )
+
+    def get_job_profiles(
+        self,
+        company: Optional[str] = None,
+        title_keyword: Optional[str] = None
+    ) -> List[Tuple[Dict, Dict]]:
+        conn = self._connect()
+        rows = conn.execute(
+            """
+            SELECT id, data, match_profile FROM job_descriptions
+            WHERE (:company IS NULL OR lower(company) = lower(:company))
+              AND (:title IS NULL OR instr(lower(title), lower(:title)) > 0)
+            """,
+            {"company": company, "title": title_keyword}
+        ).fetchall()
+        return self._rebuild_stale(conn, rows)
+
+    def get_job_description_page(
+        self,
+        limit: int = 50,
+        cursor: Optional[str] = None,
+        fields: Optional[List[str]] = None,
+        title: Optional[str] = None,
+        company: Optional[str] = None,
+        skills: Optional[List[str]] = None
+    ) -> Tuple[List[Dict], Optional[str]]:
+        keys = storage.job_field_keys(fields)
+
+        conditions = []
+        params = []
+        if cursor:
+            conditions.append("(COALESCE(created_date, ''), id) < (?, ?)")
+            params.extend(storage.decode_job_cursor(cursor))
+        if title:
+            conditions.append("instr(lower(title), lower(?)) > 0")
+            params.append(title)
+        if company:
+            conditions.append("lower(company) = lower(?)")
+            params.append(company)
+        normalized_skills = {normalize_skill(skill) for skill in skills or [] if skill.strip()}
+        if normalized_skills:
+            conditions.append(
+                "id IN (SELECT job_id FROM job_skills WHERE skill IN (SELECT value FROM json_each(?)) "
+                "GROUP BY job_id HAVING count(*) = ?)"
+            )
+            params.extend([json.dumps(sorted(normalized_skills)), len(normalized_skills)])
+
+        query = f"""
+        SELECT data, created_date, id FROM job_descriptions
+        {"WHERE " + " AND ".join(conditions) if conditions else ""}
+        ORDER BY COALESCE(created_date, '') DESC, id DESC
+        LIMIT ?
+        """
+        rows = self._connect().execute(query, params + [limit + 1]).fetchall()
+        return storage.paginate_job_rows(
+            [
+                {"data": project_job(json.loads(data), keys), "created_date": created_date, "id": job_id}
+                for data, created_date, job_id in rows
+            ],
+            limit
+        )
+
+    def search_job_descriptions(
+        self,
+        query: str,
+        limit: int = 20,
+        cursor: Optional[str] = None,
+        fields: Optional[List[str]] = None
+    ) -> Tuple[List[Dict], Optional[str]]:
+        keys = storage.job_field_keys(fields)
+
+        def phrase(text: str) -> str:
+            return '"' + text.replace('"', '""') + '"'
+
+        groups = []
+        for required, excluded in parse_search_query(query):
+            expression = "(" + " AND ".join(phrase(text) for text in required) + ")"
+            groups.append(expression + "".join(f" NOT {phrase(text)}" for text in excluded))
+        if not groups:
+            return [], None
+
+        params = [" OR ".join(groups)]
+        cursor_condition = ""
+        if cursor:
+            cursor_condition = "WHERE (rank, id) < (?, ?)"
+            params.extend(storage.decode_search_cursor(cursor))
+
+        weights = ", ".join(str(SEARCH_WEIGHTS[column]) for column in ("title", "company", "skills", "description"))
+        rows = self._connect().execute(
+            f"""
+            SELECT data, rank, id FROM (
+                SELECT j.data AS data, -bm25(job_search, {weights}) AS rank, j.id AS id
+                FROM job_search JOIN job_descriptions j ON j.rowid = job_search.rowid
+                WHERE job_search MATCH ?
+            )
+            {cursor_condition}
+            ORDER BY rank DESC, id DESC
+            LIMIT ?
+            """,
+            params + [limit + 1]
+        ).fetchall()
+        return storage.paginate_search_rows(
+            [
+                {"data": project_job(json.loads(data), keys), "rank": rank, "id": job_id}
+                for data, rank, job_id in rows
+            ],
+            limit
+        )
+
+    def update_job_description(self, job_id: str, updated_data: Dict) -> bool:
+        job_id = canonical_job_id(job_id)
+        conn = self._connect()
+        with conn:
+            row = conn.execute("SELECT data FROM job_descriptions WHERE id = ?", (job_id,)).fetchone()
+            if not row:
+                return False
+
+            data = {**json.loads(row[0]), **updated_data}
+            match_profile = build_job_profile(data)
+            conn.execute(
+                """
+                UPDATE job_descriptions
+                SET data = ?, match_profile = ?, title = ?, company = ?, created_date = ?
+                WHERE id = ?
+                """,
+                (
+                    json.dumps(data),
+                    json.dumps(match_profile),
+                    data.get("title"),
+                    data.get("company"),
+                    data.get("created_date"),
+                    job_id,
+                )
+            )
+            self._index_skills(conn, job_id, match_profile)
+            rowid = conn.execute("SELECT rowid FROM job_descriptions WHERE id = ?", (job_id,)).fetchone()[0]
+            self._index_search(conn, rowid, data)
+
+        job_cache.invalidate(job_id)
+        return True
+
+    def delete_job_description(self, job_id: str) -> bool:
+        job_id = canonical_job_id(job_id)
+        conn = self._connect()
+        with conn:
+            conn.execute(
+                "DELETE FROM job_search WHERE rowid = (SELECT rowid FROM job_descriptions WHERE id = ?)", (job_id,)
+            )
+            deleted = conn.execute("DELETE FROM job_descriptions WHERE id = ?", (job_id,)).rowcount > 0
+            conn.execute("DELETE FROM job_skills WHERE job_id = ?", (job_id,))
+
+        job_cache.invalidate(job_id)
+        return deleted
+
+
+class MemoryJobStore(JobStore):
+    """
+    Job store that keeps everything in process memory.
+
+    Nothing survives a restart; it is for tests, benchmarks and demos.
+    Jobs are copied on the way in and out, like a database round trip.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._jobs: Dict[str, Tuple[Dict, Dict]] = {}
+        # (created_date, id) of every job in ascending order, for pagination
+        self._order: List[Tuple[str, str]] = []
+
+    @staticmethod
+    def _sort_key(job: Dict, job_id: str) -> Tuple[str, str]:
+        return (job.get("created_date") or "", job_id)
+
+    def _put(self, job_id: str, job: Dict) -> None:
+        previous = self._jobs.get(job_id)
+        if previous:
+            self._order.pop(bisect.bisect_left(self._order, self._sort_key(previous[0], job_id)))
+        self._jobs[job_id] = (job, build_job_profile(job))
+        bisect.insort(self._order, self._sort_key(job, job_id))
+
+    def save_job_description(self, job_data: Dict) -> str:
+        if "id" not in job_data:
+            job_data["id"] = str(uuid.uuid4())
+        with self._lock:
+            self._put(canonical_job_id(job_data["id"]), copy.deepcopy(job_data))
+        return job_data["id"]
+
+    def get_job_descriptions(self) -> List[Dict]:
+        with self._lock:
+            return [copy.deepcopy(job) for job, _ in self._jobs.values()]
+
+    def get_job_with_profile(self, job_id: str) -> Optional[Tuple[Dict, Dict]]:
+        with self._lock:
+            job_entry = self._jobs.get(canonical_job_id(job_id))
+            return copy.deepcopy(job_entry) if job_entry else None
+
+    def get_jobs_with_profiles_by_ids(self, job_ids: List[str]) -> Tuple[List[Tuple[Dict, Dict]], List[str]]:
+        canonical_ids = storage.normalize_job_ids(job_ids)
+        with self._lock:
+            rows = {
+                canonical_id: copy.deepcopy(self._jobs[canonical_id])
+                for canonical_id in canonical_ids.values()
+                if canonical_id in self._jobs
+            }
+        return storage.order_by_request(rows, canonical_ids)
+
+    def get_job_profiles(
+        self,
+        company: Optional[str] = None,
+        title_keyword: Optional[str] = None
+    ) -> List[Tuple[Dict, Dict]]:
+        with self._lock:
+            job_entries = list(self._jobs.values())
+        if company is not None:
+            job_entries = [
+                (job, profile) for job, profile in job_entries
+                if isinstance(job.get("company"), str) and job["company"].lower() == company.lower()
+            ]
+        if title_keyword is not None:
+            job_entries = [
+                (job, profile) for job, profile in job_entries
+                if isinstance(job.get("title"), str) and title_keyword.lower() in job["title"].lower()
+            ]
+        return copy.deepcopy(job_entries)
+
+    def get_job_description_page(
+        self,
+        limit: int = 50,
+        cursor: Optional[str] = None,
+        fields: Optional[List[str]] = None,
+        title: Optional[str] = None,
+        company: Optional[str] = None,
+        skills: Optional[List[str]] = None
+    ) -> Tuple[List[Dict], Optional[str]]:
+        keys = storage.job_field_keys(fields)
+        required = {normalize_skill(skill) for skill in skills or [] if skill.strip()}
+
+        rows = []
+        with self._lock:
+            end = bisect.bisect_left(self._order, storage.decode_job_cursor(cursor)) if cursor else len(self._order)
+            for position in range(end - 1, -1, -1):
+                _, job_id = self._order[position]
+                job, profile = self._jobs[job_id]
+                if title and title.lower() not in str(job.get("title") or "").lower():
+                    continue
+                if company and str(job.get("company") or "").lower() != company.lower():
+                    continue
+                if required and not required <= set(profile["required_skills"]) | set(profile["preferred_skills"]):
+                    continue
+                rows.append({
+                    "data": copy.deepcopy(project_job(job, keys)),
+                    "created_date": job.get("created_date"),
+                    "id": job_id,
+                })
+                if len(rows) > limit:
+                    break
+        return storage.paginate_job_rows(rows, limit)
+
+    def search_job_descriptions(
+        self,
+        query: str,
+        limit: int = 20,
+        cursor: Optional[str] = None,
+        fields: Optional[List[str]] = None
+    ) -> Tuple[List[Dict], Optional[str]]:
+        keys = storage.job_field_keys(fields)
+        groups = parse_search_query(query)
+        after = storage.decode_search_cursor(cursor) if cursor else None
+
+        matches = []
+        with self._lock:
+            for job_id, (job, _) in self._jobs.items():
+                text = {field: value.lower() for field, value in search_fields(job).items()}
+                everything = " ".join(text.values())
+                rank = 0.0
+                for required, excluded in groups:
+                    if all(phrase in everything for phrase in required) and not any(
+                        phrase in everything for phrase in excluded
+                    ):
+                        rank = max(rank, sum(
+                            weight * text[field].count(phrase)
+                            for phrase in required for field, weight in SEARCH_WEIGHTS.items()
+                        ))
+                if rank and (after is None or (rank, job_id) < after):
+                    matches.append((rank, job_id, job))
+
+            matches.sort(key=lambda match: (match[0], match[1]), reverse=True)
+            rows = [
+                {"data": copy.deepcopy(project_job(job, keys)), "rank": rank, "id": job_id}
+                for rank, job_id, job in matches[:limit + 1]
+            ]
+        return storage.paginate_search_rows(rows, limit)
+
+    def update_job_description(self, job_id: str, updated_data: Dict) -> bool:
+        job_id = canonical_job_id(job_id)
+        with self._lock:
+            job_entry = self._jobs.get(job_id)
+            if not job_entry:
+                return False
+            self._put(job_id, {**job_entry[0], **copy.deepcopy(updated_data)})
+
+        job_cache.invalidate(job_id)
+        return True
+
+    def delete_job_description(self, job_id: str) -> bool:
+        job_id = canonical_job_id(job_id)
+        with self._lock:
+            job_entry = self._jobs.pop(job_id, None)
+            if job_entry:
+                self._order.pop(bisect.bisect_left(self._order, self._sort_key(job_entry[0], job_id)))
+
+        job_cache.invalidate(job_id)
+        return job_entry is not None
+
+
+_stores: Dict[Tuple[str, str], JobStore] = {}
+_stores_lock = threading.Lock()
+
+
+def get_job_store(settings: Settings) -> JobStore:
+    """Get the job store selected by `JOB_STORE_BACKEND`, creating it once per process."""
+    backend = settings.JOB_STORE_BACKEND
+    key = (backend, settings.JOB_DB_PATH if backend == "sqlite" else "")
+    with _stores_lock:
+        store = _stores.get(key)
+        if store is None:
+            if backend == "postgres":
+                store = PostgresJobStore(settings)
+            elif backend == "sqlite":
+                store = SQLiteJobStore(settings.JOB_DB_PATH)
+            elif backend == "memory":
+                store = MemoryJobStore()
+            else:
+                raise ValueError(f"Unknown job store backend: {backend}")
+            _stores[key] = store
+        return store
@@ -0,0 +1,166 @@
+import asyncio
+import time
+import uuid
+from collections import OrderedDict
+from typing import Dict, List, Optional
+
+from app.config import Settings
+
+# Stages every file of a match run passes through, in order
+STAGES = ("uploaded", "extracted", "parsed", "scored", "assessed")
+
+
+class FileProgress:
+    """Stage timings of one file in a match run."""
+
+    def __init__(self, run: "MatchRun", position: int, file_name: str, stage: Optional[str] = None):
+        self.run = run
+        self.position = position
+        self.file_name = file_name
+        self.stage = stage
+        self._stage_time = time.monotonic()
+
+    def reached(self, stage: str, seconds: Optional[float] = None) -> None:
+        """Record that the file finished `stage`, taking `seconds` or the time since the previous stage."""
+        now = time.monotonic()
+        self.run.publish(
+            "stage",
+            file=self.position,
+            file_name=self.file_name,
+            stage=stage,
+            duration_ms=round(1000 * (now - self._stage_time if seconds is None else seconds), 1),
+        )
+        self.stage = stage
+        self._stage_time = now
+
+    @property
+    def pending_stage(self) -> str:
+        """The stage the file is in: the one after the last stage it reached."""
+        position = STAGES.index(self.stage) + 1 if self.stage else 0
+        return STAGES[min(position, len(STAGES) - 1)]
+
+    def failed(self, detail: str) -> None:
+        """Record that the file failed in its pending stage."""
+        self.run.publish(
+            "failed",
+            file=self.position,
+            file_name=self.file_name,
+            stage=self.pending_stage,
+            detail=detail,
+        )
+
+
+class MatchRun:
+    """
+    Progress of one `/match` or `/batch-match` request, as an append-only event log.
+
+    Subscribers read the log from any position and wait for new events, so
+    a client that connects late or reconnects still sees every event.
+    """
+
+    def __init__(self, run_id: str):
+        self.id = run_id
+        self.status = "pending"  # "pending" until a match request claims the ID, then "running" and "completed"
+        self.events: List[Dict] = []
+        self.updated = time.monotonic()
+        self._started = time.monotonic()
+        self._changed = asyncio.Event()
+
+    def publish(self, event: str, **data) -> None:
+        self.events.append({
+            "id": len(self.events) + 1,
+            "event": event,
+            "data": {"run_id": self.id, "elapsed_ms": round(1000 * (time.monotonic() - self._started), 1), **data},
+        })
+        self.updated = time.monotonic()
+        # Wake every waiting subscriber; later waits use a fresh event
+        self._changed.set()
+        self._changed = asyncio.Event()
+
+    def start(self, files: int, **data) -> None:
+        self.status = "running"
+        self._started = time.monotonic()
+        self.publish("started", files=files, **data)
+
+    def file(self, position: int, file_name: str, stage: Optional[str] = None) -> FileProgress:
+        """Track the stages of one file, starting the clock now; `stage` is the last one it already reached."""
+        return FileProgress(self, position, file_name, stage)
+
+    def complete(self, **data) -> None:
+        self.status = "completed"
+        self.publish("completed", **data)
+
+    async def wait(self, seen: int, timeout: float) -> bool:
+        """Wait until there are more than `seen` events; False on timeout."""
+        if len(self.events) > seen:
+            return True
+        changed = self._changed
+        try:
+            await asyncio.wait_for(changed.wait(), timeout)
+        except asyncio.TimeoutError:
+            return False
+        return True
+
+
+class RunIdInUseError(ValueError):
+    """Raised when a match request names a run ID that another request already used."""
+
+
+class TooManyPendingRunsError(Exception):
+    """Raised when a subscription would register more pending runs than `MATCH_RUN_MAX_PENDING`."""
+
+
+class MatchRunRegistry:
+    """
+    In-process match runs by ID.
+
+    Finished runs are dropped `MATCH_RUN_TTL` seconds after their last event,
+    and runs still waiting for their match request after
+    `MATCH_RUN_PENDING_TIMEOUT` seconds. Runs in progress are never dropped,
+    even to stay under `MATCH_RUN_MAX_RUNS`.
+    """
+
+    def __init__(self):
+        self._runs: "OrderedDict[str, MatchRun]" = OrderedDict()
+
+    def _expire(self, settings: Settings) -> None:
+        now = time.monotonic()
+        timeouts = {"pending": settings.MATCH_RUN_PENDING_TIMEOUT, "completed": settings.MATCH_RUN_TTL}
+        for run_id in [
+            run_id for run_id, run in self._runs.items()
+            if run.status in timeouts and run.updated < now - timeouts[run.status]
+        ]:
+            del self._runs[run_id]
+        excess = len(self._runs) - settings.MATCH_RUN_MAX_RUNS
+        if excess > 0:
+            # Oldest first
+            for run_id in [run_id for run_id, run in self._runs.items() if run.status != "running"][:excess]:
+                del self._runs[run_id]
+
+    def get(self, run_id: str, settings: Settings) -> Optional[MatchRun]:
+        self._expire(settings)
+        return self._runs.get(run_id)
+
+    def subscribe(self, run_id: str, settings: Settings) -> MatchRun:
+        """Get a run to follow, registering it as pending if the match request has not arrived yet."""
+        run = self.get(run_id, settings)
+        if run is None:
+            if sum(other.status == "pending" for other in self._runs.values()) >= settings.MATCH_RUN_MAX_PENDING:
+                raise TooManyPendingRunsError("Too many match runs are waiting for their match request")
+            run = self._runs[run_id] = MatchRun(run_id)
+        return run
+
+    def begin(self, run_id: Optional[str], settings: Settings) -> MatchRun:
+        """Claim a run for a match request; a client-chosen ID lets it subscribe before uploading."""
+        self._expire(settings)
+        run_id = run_id or str(uuid.uuid4())
+        run = self._runs.get(run_id)
+        if run is None:
+            run = self._runs[run_id] = MatchRun(run_id)
+        elif run.status != "pending":
+            raise RunIdInUseError(f"Match run {run_id} already exists")
+        run.status = "running"
+        return run
+
+
+match_runs = MatchRunRegistry()
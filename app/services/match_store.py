@@ -0,0 +1,192 @@
+import json
+import sqlite3
+import threading
+from contextlib import closing
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+
+import psycopg2
+from psycopg2.extras import RealDictCursor
+
+from app.config import Settings
+from app.services.database import get_db_connection
+
+
+SQLITE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS match_runs (
+    id TEXT PRIMARY KEY,
+    job_ids TEXT NOT NULL,
+    created_date TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS match_results (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    run_id TEXT NOT NULL REFERENCES match_runs(id),
+    job_id TEXT NOT NULL,
+    overall_score REAL NOT NULL,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_match_results_run ON match_results(run_id, job_id, overall_score);
+"""
+
+# Rows fetched at a time while reading the results of a run
+FETCH_SIZE = 1000
+
+
+class MatchRunExistsError(ValueError):
+    """Raised when a match run is saved under an ID that is already stored."""
+
+
+# SQLite databases whose schema was already created by this process
+_sqlite_initialized = set()
+
+# Runs and the `(job_id, overall_score, data)` of their results by run ID when MATCH_STORE_BACKEND is "memory"
+_memory_runs: Dict[str, Dict] = {}
+_memory_results: Dict[str, List[Tuple[str, float, Dict]]] = {}
+_memory_lock = threading.Lock()
+
+
+def get_sqlite_connection(settings: Settings) -> sqlite3.Connection:
+    """Open the SQLite stand-in for the match store, creating its schema once."""
+    path = settings.MATCH_DB_PATH
+    if path not in _sqlite_initialized:
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        with closing(sqlite3.connect(path)) as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(SQLITE_SCHEMA)
+        _sqlite_initialized.add(path)
+    return sqlite3.connect(path)
+
+
+def save_match_run(run_id: str, job_ids: List[str], settings: Settings) -> None:
+    """
+    Record a match run, before any of its results are saved.
+
+    Raises MatchRunExistsError if a run with this ID is already stored,
+    e.g. by another worker process or before its in-memory run expired.
+    """
+    created_date = datetime.now().isoformat()
+    exists = MatchRunExistsError(f"Match run {run_id} already exists")
+
+    if settings.MATCH_STORE_BACKEND == "memory":
+        with _memory_lock:
+            if run_id in _memory_runs:
+                raise exists
+            _memory_runs[run_id] = {"id": run_id, "job_ids": list(job_ids), "created_date": created_date}
+            _memory_results[run_id] = []
+    elif settings.MATCH_STORE_BACKEND == "sqlite":
+        with closing(get_sqlite_connection(settings)) as conn:
+            try:
+                with conn:
+                    conn.execute(
+                        "INSERT INTO match_runs (id, job_ids, created_date) VALUES (?, ?, ?)",
+                        (run_id, json.dumps(job_ids), created_date)
+                    )
+            except sqlite3.IntegrityError:
+                raise exists
+    else:
+        try:
+            with get_db_connection(settings) as conn:
+                with conn.cursor() as cur:
+                    cur.execute(
+                        "INSERT INTO match_runs (id, job_ids, created_date) VALUES (%s, %s, %s)",
+                        (run_id, json.dumps(job_ids), created_date)
+                    )
+                    conn.commit()
+        except psycopg2.IntegrityError:
+            raise exists
+
+
+def save_match_results(run_id: str, job_id: str, matches: List[Dict], settings: Settings) -> None:
+    """Add matches against one job to a saved run."""
+    save_matches_by_job(run_id, {job_id: matches}, settings)
+
+
+def save_matches_by_job(run_id: str, matches_by_job: Dict[str, List[Dict]], settings: Settings) -> None:
+    """Add matches against several jobs to a saved run, in one transaction."""
+    rows = [
+        (run_id, job_id, float(match["overall_score"]), json.dumps(match))
+        for job_id, matches in matches_by_job.items()
+        for match in matches
+    ]
+    if not rows:
+        return
+
+    if settings.MATCH_STORE_BACKEND == "memory":
+        with _memory_lock:
+            _memory_results[run_id].extend((job_id, score, json.loads(data)) for _, job_id, score, data in rows)
+    elif settings.MATCH_STORE_BACKEND == "sqlite":
+        with closing(get_sqlite_connection(settings)) as conn:
+            with conn:
+                conn.executemany(
+                    "INSERT INTO match_results (run_id, job_id, overall_score, data) VALUES (?, ?, ?, ?)",
+                    rows
+                )
+    else:
+        with get_db_connection(settings) as conn:
+            with conn.cursor() as cur:
+                cur.executemany(
+                    "INSERT INTO match_results (run_id, job_id, overall_score, data) VALUES (%s, %s, %s, %s)",
+                    rows
+                )
+                conn.commit()
+
+
+def get_match_run(run_id: str, settings: Settings) -> Optional[Dict]:
+    """Get a saved run as `{"id", "job_ids", "created_date"}`."""
+    if settings.MATCH_STORE_BACKEND == "memory":
+        with _memory_lock:
+            run = _memory_runs.get(run_id)
+            return dict(run) if run else None
+
+    if settings.MATCH_STORE_BACKEND == "sqlite":
+        with closing(get_sqlite_connection(settings)) as conn:
+            row = conn.execute(
+                "SELECT id, job_ids, created_date FROM match_runs WHERE id = ?", (run_id,)
+            ).fetchone()
+            return {"id": row[0], "job_ids": json.loads(row[1]), "created_date": row[2]} if row else None
+
+    with get_db_connection(settings) as conn:
+        with conn.cursor(cursor_factory=RealDictCursor) as cur:
+            cur.execute("SELECT id, job_ids, created_date FROM match_runs WHERE id = %s", (run_id,))
+            row = cur.fetchone()
+            return dict(row) if row else None
+
+
+def iter_match_results(run_id: str, settings: Settings) -> Iterator[Dict]:
+    """
+    Yield the saved matches of a run, grouped by job and best first; blocking.
+
+    Rows are read FETCH_SIZE at a time, so a large run is never held in
+    memory at once. The connection stays open until the iterator is done.
+    """
+    if settings.MATCH_STORE_BACKEND == "memory":
+        with _memory_lock:
+            results = list(_memory_results.get(run_id, []))
+        for _, _, data in sorted(results, key=lambda result: (result[0], -result[1])):
+            yield data
+        return
+
+    if settings.MATCH_STORE_BACKEND == "sqlite":
+        with closing(get_sqlite_connection(settings)) as conn:
+            cursor = conn.execute(
+                "SELECT data FROM match_results WHERE run_id = ? ORDER BY job_id, overall_score DESC, seq",
+                (run_id,)
+            )
+            while True:
+                rows = cursor.fetchmany(FETCH_SIZE)
+                if not rows:
+                    return
+                for row in rows:
+                    yield json.loads(row[0])
+
+    with get_db_connection(settings) as conn:
+        # A named cursor reads the rows on the server side, FETCH_SIZE per round trip
+        with conn.cursor(name="match_results_export") as cur:
+            cur.itersize = FETCH_SIZE
+            cur.execute(
+                "SELECT data FROM match_results WHERE run_id = %s ORDER BY job_id, overall_score DESC, seq",
+                (run_id,)
+            )
+            for row in cur:
+                yield row[0]
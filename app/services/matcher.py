@@ -1,98 +1,245 @@
-from typing import Dict, List, Set
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.metrics.pairwise import cosine_similarity
+import heapq
+import math
+import re
+from collections import Counter
+from typing import Any, Dict, Iterable, List, Optional, Tuple
 
+import numpy as np
 
-def calculate_match_score(resume: Dict, job: Dict) -> Dict:
-    """Calculate match score between resume and job description."""
+# Bump whenever the profile builders change shape or semantics so stored
+# profiles are rebuilt instead of being scored with stale data.
+PROFILE_VERSION = 2
+
+# Same tokenisation as scikit-learn's TfidfVectorizer default token_pattern
+TOKEN_PATTERN = re.compile(r"(?u)\b\w\w+\b")
+
+# IDF weight TfidfVectorizer (smooth_idf=True) assigns when fitted on a
+# resume/job pair: terms in both documents get 1, terms in only one get this.
+_SINGLE_DOC_IDF = math.log(3 / 2) + 1
+
+
+def normalize_skill(skill: str) -> str:
+    """Normalize a skill name into the ID used for matching."""
+    return " ".join(skill.lower().split())
+
+
+def term_counts(text: str) -> Dict[str, int]:
+    """Count the TF-IDF terms of a text."""
+    return dict(Counter(TOKEN_PATTERN.findall(text.lower())))
+
+
+def build_job_profile(job: Dict) -> Dict:
+    """Precompute everything calculate_match_score needs from the job side."""
+    job_text = " ".join([
+        job.get("description", ""),
+        " ".join(job.get("required_skills", [])),
+        " ".join(job.get("preferred_skills", [])),
+        " ".join(job.get("education_requirements", [])),
+        " ".join(job.get("experience_requirements", []))
+    ]).lower()
+    job_terms = term_counts(job_text)
+
+    return {
+        "version": PROFILE_VERSION,
+        "required_skills": sorted({normalize_skill(skill) for skill in job.get("required_skills", [])}),
+        "preferred_skills": sorted({normalize_skill(skill) for skill in job.get("preferred_skills", [])}),
+        "education_requirements": [req.lower() for req in job.get("education_requirements", [])],
+        "experience_requirements": [req.lower() for req in job.get("experience_requirements", [])],
+        "term_counts": job_terms,
+        "term_square_sum": term_square_sum(job_terms),
+    }
+
+
+def is_current_profile(profile: Optional[Dict]) -> bool:
+    """Check whether a stored profile was built by this version of the matcher."""
+    return bool(profile) and profile.get("version") == PROFILE_VERSION
+
+
+def term_square_sum(counts: Dict[str, int]) -> int:
+    """Sum of squared term counts, stored with a profile to skip a pass over its terms."""
+    return sum(count * count for count in counts.values())
+
+
+def keyword_similarity(
+    resume_terms: Dict[str, int],
+    job_terms: Dict[str, int],
+    resume_square_sum: Optional[int] = None,
+    job_square_sum: Optional[int] = None
+) -> float:
+    """
+    Cosine similarity of the TF-IDF vectors of a resume/job pair.
+
+    Gives the same result as fitting TfidfVectorizer on [resume_text, job_text],
+    but works from precomputed term counts so the job side is never re-tokenised.
+    Only the shared terms are visited: every other term carries the single
+    document IDF weight, so its contribution to the norms follows from the
+    square sums.
+    """
+    if not resume_terms or not job_terms:
+        return 0.0
+
+    if resume_square_sum is None:
+        resume_square_sum = term_square_sum(resume_terms)
+    if job_square_sum is None:
+        job_square_sum = term_square_sum(job_terms)
+
+    smaller, larger = (resume_terms, job_terms) if len(resume_terms) <= len(job_terms) else (job_terms, resume_terms)
+    dot = 0
+    shared_smaller = 0
+    shared_larger = 0
+    for term, count in smaller.items():
+        other = larger.get(term)
+        if other is not None:
+            dot += count * other
+            shared_smaller += count * count
+            shared_larger += other * other
+
+    if not dot:
+        return 0.0
+
+    if smaller is resume_terms:
+        shared_resume, shared_job = shared_smaller, shared_larger
+    else:
+        shared_resume, shared_job = shared_larger, shared_smaller
+
+    idf_squared = _SINGLE_DOC_IDF ** 2
+    resume_norm = idf_squared * resume_square_sum - (idf_squared - 1) * shared_resume
+    job_norm = idf_squared * job_square_sum - (idf_squared - 1) * shared_job
+    return max(0.0, min(dot / math.sqrt(resume_norm * job_norm), 1.0))
+
+
+def keyword_similarities(
+    dots: np.ndarray,
+    shared_resume: np.ndarray,
+    shared_job: np.ndarray,
+    resume_square_sums: np.ndarray,
+    job_square_sum: int
+) -> np.ndarray:
+    """
+    `keyword_similarity` of one job against many resumes at once.
+
+    Takes, per resume, the dot product of its term counts with the job's and
+    the square sums of both over their shared terms, and gives exactly the
+    values `keyword_similarity` computes one pair at a time.
+    """
+    idf_squared = _SINGLE_DOC_IDF ** 2
+    resume_norms = idf_squared * resume_square_sums - (idf_squared - 1) * shared_resume
+    job_norms = idf_squared * job_square_sum - (idf_squared - 1) * shared_job
+    with np.errstate(divide="ignore", invalid="ignore"):
+        similarities = dots / np.sqrt(resume_norms * job_norms)
+    return np.where(dots > 0, np.clip(similarities, 0.0, 1.0), 0.0)
+
+
+def build_resume_profile(resume: Dict) -> Dict:
+    """Precompute everything the scorer needs from the resume side."""
+    education = " ".join(resume.get("education", [])).lower()
+    experience = " ".join([exp.get("description", "") for exp in resume.get("experience", [])]).lower()
+    resume_text = " ".join([" ".join(resume.get("skills", [])).lower(), education, experience])
+    resume_terms = term_counts(resume_text)
+
+    return {
+        "version": PROFILE_VERSION,
+        "skills": sorted({normalize_skill(skill) for skill in resume.get("skills", [])}),
+        "education": education,
+        "experience": experience,
+        "term_counts": resume_terms,
+        "term_square_sum": term_square_sum(resume_terms),
+    }
+
+
+def _cannot_reach(upper_bound: float, min_score: Optional[float]) -> bool:
+    """Check whether an upper bound on the overall score (0-1) falls below `min_score` (0-100)."""
+    return min_score is not None and round(upper_bound * 100, 2) < min_score
+
+
+def score_profiles(resume_profile: Dict, job_profile: Dict, min_score: Optional[float] = None) -> Optional[Dict]:
+    """
+    Score a resume profile against a job profile.
+
+    - **min_score**: Overall score (0-100) the match must reach. Components
+      are computed cheapest and heaviest-weighted first, and None is returned
+      as soon as the best possible overall score falls below the threshold.
+    """
     # 1. Calculate skill match score
-    resume_skills = set([skill.lower() for skill in resume.get("skills", [])])
-    required_skills = set([skill.lower() for skill in job.get("required_skills", [])])
-    preferred_skills = set([skill.lower() for skill in job.get("preferred_skills", [])])
-    
+    resume_skills = resume_profile["skills"]
+    required_skills = set(job_profile["required_skills"])
+    preferred_skills = set(job_profile["preferred_skills"])
+
     # Match skills (accounting for partial matches)
     matched_skills = []
-    for job_skill in list(required_skills) + list(preferred_skills):
+    for job_skill in job_profile["required_skills"] + job_profile["preferred_skills"]:
         for resume_skill in resume_skills:
             # Check for exact match or if job skill is contained in resume skill or vice versa
-            if (job_skill == resume_skill or 
-                job_skill in resume_skill or 
+            if (job_skill == resume_skill or
+                job_skill in resume_skill or
                 resume_skill in job_skill):
                 matched_skills.append(job_skill)
                 break
-    
-    matched_skills_set = set(matched_skills)
-    missing_skills = required_skills - matched_skills_set
-    
+
     # Calculate skill score (give more weight to required skills)
-    req_skill_match = len([s for s in matched_skills if s.lower() in required_skills]) / max(len(required_skills), 1)
-    pref_skill_match = len([s for s in matched_skills if s.lower() in preferred_skills]) / max(len(preferred_skills), 1) if preferred_skills else 1.0
-    
+    req_skill_match = len([s for s in matched_skills if s in required_skills]) / max(len(required_skills), 1)
+    pref_skill_match = len([s for s in matched_skills if s in preferred_skills]) / max(len(preferred_skills), 1) if preferred_skills else 1.0
+
     # Weight: 70% required skills, 30% preferred skills
     skills_score = (req_skill_match * 0.7) + (pref_skill_match * 0.3)
-    
+
+    # Education, experience and keyword match can add at most 60%
+    if _cannot_reach(skills_score * 0.4 + 0.6, min_score):
+        return None
+
     # 2. Calculate education match score
-    resume_edu = " ".join(resume.get("education", [])).lower()
-    job_edu_reqs = [req.lower() for req in job.get("education_requirements", [])]
-    
+    resume_edu = resume_profile["education"]
+    job_edu_reqs = job_profile["education_requirements"]
+
     matched_education = []
     for edu_req in job_edu_reqs:
         if edu_req in resume_edu:
             matched_education.append(edu_req)
-    
+
     education_score = len(matched_education) / max(len(job_edu_reqs), 1) if job_edu_reqs else 0.5
-    
+
+    if _cannot_reach(skills_score * 0.4 + education_score * 0.2 + 0.4, min_score):
+        return None
+
     # 3. Calculate experience match score
-    resume_exp = " ".join([exp.get("description", "") for exp in resume.get("experience", [])]).lower()
-    job_exp_reqs = [req.lower() for req in job.get("experience_requirements", [])]
-    
+    resume_exp = resume_profile["experience"]
+    job_exp_reqs = job_profile["experience_requirements"]
+
     matched_exp_keywords = []
     for exp_req in job_exp_reqs:
         if exp_req in resume_exp:
             matched_exp_keywords.append(exp_req)
-    
+
     experience_score = len(matched_exp_keywords) / max(len(job_exp_reqs), 1) if job_exp_reqs else 0.5
-    
+
+    if _cannot_reach(skills_score * 0.4 + education_score * 0.2 + experience_score * 0.2 + 0.2, min_score):
+        return None
+
     # 4. Calculate keyword match using TF-IDF and cosine similarity
-    resume_text = " ".join([
-        " ".join(resume.get("skills", [])),
-        " ".join(resume.get("education", [])),
-        " ".join([exp.get("description", "") for exp in resume.get("experience", [])])
-    ]).lower()
-    
-    job_text = " ".join([
-        job.get("description", ""),
-        " ".join(job.get("required_skills", [])),
-        " ".join(job.get("preferred_skills", [])),
-        " ".join(job.get("education_requirements", [])),
-        " ".join(job.get("experience_requirements", []))
-    ]).lower()
-    
-    # Calculate text similarity
-    vectorizer = TfidfVectorizer()
-    try:
-        tfidf_matrix = vectorizer.fit_transform([resume_text, job_text])
-        cosine_sim = cosine_similarity(tfidf_matrix[0:1], tfidf_matrix[1:2])[0][0]
-        keyword_match_score = max(0, min(cosine_sim, 1.0))  # Ensure score is between 0 and 1
-    except:
-        # Fallback if vectorization fails (e.g., empty text)
-        keyword_match_score = 0.0
-    
+    keyword_match_score = keyword_similarity(
+        resume_profile["term_counts"],
+        job_profile["term_counts"],
+        resume_profile["term_square_sum"],
+        job_profile["term_square_sum"]
+    )
+
     # Calculate overall score
     # Weights: Skills 40%, Education 20%, Experience 20%, Keyword match 20%
     overall_score = (
-        (skills_score * 0.4) + 
-        (education_score * 0.2) + 
-        (experience_score * 0.2) + 
+        (skills_score * 0.4) +
+        (education_score * 0.2) +
+        (experience_score * 0.2) +
         (keyword_match_score * 0.2)
-    ) * 100  # Convert to percentage
-    
+    )
+
+    if _cannot_reach(overall_score, min_score):
+        return None
+
+    matched_skills_set = set(matched_skills)
+    missing_skills = required_skills - matched_skills_set
+
     return {
-        "resume_id": resume.get("file_name", "Unknown"),
-        "resume_name": resume.get("name", "Unknown"),
-        "job_id": job.get("id", "Unknown"),
-        "job_title": job.get("title", "Unknown"),
-        "overall_score": round(overall_score, 2),
+        "overall_score": round(overall_score * 100, 2),  # Convert to percentage
         "skills_score": round(skills_score * 100, 2),
         "education_score": round(education_score * 100, 2),
         "experience_score": round(experience_score * 100, 2),
@@ -101,4 +248,170 @@ def calculate_match_score(resume: Dict, job: Dict) -> Dict:
         "matched_education": matched_education,
         "matched_experience_keywords": matched_exp_keywords,
         "missing_skills": list(missing_skills)
-    }
\ No newline at end of file
+    }
+
+
+def calculate_match_score(
+    resume: Dict,
+    job: Dict,
+    job_profile: Optional[Dict] = None,
+    min_score: Optional[float] = None
+) -> Optional[Dict]:
+    """
+    Calculate match score between resume and job description.
+
+    - **job_profile**: Stored profile from build_job_profile; rebuilt from
+      `job` when missing or outdated
+    - **min_score**: Return None instead of a score below this overall score
+    """
+    if not is_current_profile(job_profile):
+        job_profile = build_job_profile(job)
+
+    score = score_profiles(build_resume_profile(resume), job_profile, min_score)
+    if score is None:
+        return None
+
+    return {
+        "resume_id": resume.get("file_name", "Unknown"),
+        "resume_name": resume.get("name") or "Unknown",
+        "job_id": job.get("id", "Unknown"),
+        "job_title": job.get("title", "Unknown"),
+        **score
+    }
+
+
+def select_top_matches(
+    pairs: Iterable[Tuple[Any, Dict, Dict]],
+    top_k: Optional[int] = None,
+    min_score: Optional[float] = None
+) -> List[Tuple[Any, Dict]]:
+    """
+    Score `(item, resume_profile, job_profile)` pairs and keep the best matches.
+
+    Returns `(item, score)` pairs, best first, ties kept in input order. Once
+    `top_k` matches are held, the weakest of them becomes the pruning
+    threshold, so most of a large pool is rejected after the skills score.
+    """
+    heap: List[Tuple[float, int, Any, Dict]] = []
+    for index, (item, resume_profile, job_profile) in enumerate(pairs):
+        threshold = min_score
+        if top_k is not None and len(heap) >= top_k:
+            threshold = heap[0][0] if min_score is None else max(min_score, heap[0][0])
+
+        score = score_profiles(resume_profile, job_profile, threshold)
+        if score is None:
+            continue
+
+        entry = (score["overall_score"], -index, item, score)
+        if top_k is None or len(heap) < top_k:
+            heapq.heappush(heap, entry)
+        else:
+            heapq.heappushpop(heap, entry)
+
+    heap.sort(reverse=True)
+    return [(item, score) for _, _, item, score in heap]
+
+
+def rank_resumes(
+    resumes: Iterable[Tuple[Dict, Dict]],
+    job: Dict,
+    job_profile: Dict,
+    top_k: Optional[int] = None,
+    min_score: Optional[float] = None
+) -> List[Dict]:
+    """Rank parsed `(resume, resume_profile)` pairs against one job, best first."""
+    matches = select_top_matches(
+        ((resume, resume_profile, job_profile) for resume, resume_profile in resumes),
+        top_k,
+        min_score
+    )
+
+    return [
+        {
+            "resume_id": resume.get("file_name", "Unknown"),
+            "resume_name": resume.get("name") or "Unknown",
+            "job_id": job.get("id", "Unknown"),
+            "job_title": job.get("title", "Unknown"),
+            **score
+        }
+        for resume, score in matches
+    ]
+
+
+def rank_resumes_by_job(
+    resumes: List[Dict],
+    jobs: Dict[str, Tuple[Dict, Dict]],
+    top_k: Optional[int] = None,
+    min_score: Optional[float] = None
+) -> Dict[str, List[Dict]]:
+    """
+    Rank parsed resumes against every `job_id: (job, job_profile)`, best
+    first per job. Each resume is profiled once and reused for every job.
+    """
+    resume_profiles = [(resume, build_resume_profile(resume)) for resume in resumes]
+    return {
+        job_id: rank_resumes(resume_profiles, job, job_profile, top_k, min_score)
+        for job_id, (job, job_profile) in jobs.items()
+    }
+
+
+def rank_candidates(
+    job: Dict,
+    job_profile: Dict,
+    candidates: Iterable[Dict],
+    top_k: int,
+    min_score: Optional[float] = None
+) -> List[Dict]:
+    """
+    Score stored candidates against a job and keep the best `top_k`.
+
+    Each candidate is a dict with `id`, `name` and a current `match_profile`.
+    Only `top_k` results are held at any time, so ranking a large pool does
+    not sort or materialize every score.
+    """
+    matches = select_top_matches(
+        ((candidate, candidate["match_profile"], job_profile) for candidate in candidates),
+        top_k,
+        min_score
+    )
+
+    return [
+        {
+            "resume_id": candidate["id"],
+            "resume_name": candidate.get("name") or "Unknown",
+            "job_id": job.get("id", "Unknown"),
+            "job_title": job.get("title", "Unknown"),
+            **score
+        }
+        for candidate, score in matches
+    ]
+
+
+def rank_jobs(
+    resume: Dict,
+    jobs: Iterable[Tuple[Dict, Dict]],
+    top_k: int,
+    min_score: Optional[float] = None
+) -> List[Dict]:
+    """
+    Score one resume against many `(job, job_profile)` pairs and keep the best `top_k`.
+
+    The resume is profiled once and reused for every job.
+    """
+    resume_profile = build_resume_profile(resume)
+    matches = select_top_matches(
+        ((job, resume_profile, job_profile) for job, job_profile in jobs),
+        top_k,
+        min_score
+    )
+
+    return [
+        {
+            "resume_id": resume.get("file_name", "Unknown"),
+            "resume_name": resume.get("name") or "Unknown",
+            "job_id": job.get("id", "Unknown"),
+            "job_title": job.get("title", "Unknown"),
+            **score
+        }
+        for job, score in matches
+    ]
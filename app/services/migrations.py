@@ -0,0 +1,138 @@
+import logging
+from typing import List, Tuple
+
+from psycopg2 import extensions
+
+from app.config import get_settings
+from app.services.database import close_db_pool, init_db_pool
+
+logger = logging.getLogger(__name__)
+
+# Arbitrary key for the advisory lock that keeps concurrently starting
+# workers from applying the same migration twice
+MIGRATION_LOCK_ID = 727274
+
+# (version, name, SQL) in the order they must be applied. Never edit an
+# applied migration; append a new one instead.
+MIGRATIONS: List[Tuple[int, str, str]] = [
+    (1, "create job_descriptions", """
+    CREATE TABLE IF NOT EXISTS job_descriptions (
+        id UUID PRIMARY KEY,
+        data JSONB NOT NULL
+    );
+    ALTER TABLE job_descriptions ADD COLUMN IF NOT EXISTS match_profile JSONB;
+    """),
+    (2, "create parsed_resumes", """
+    CREATE TABLE IF NOT EXISTS parsed_resumes (
+        id UUID PRIMARY KEY,
+        seq BIGSERIAL UNIQUE,
+        data JSONB NOT NULL,
+        match_profile JSONB NOT NULL
+    );
+    """),
+    (3, "job_descriptions lookup columns and indexes", """
+    ALTER TABLE job_descriptions
+        ADD COLUMN IF NOT EXISTS title TEXT GENERATED ALWAYS AS (data->>'title') STORED,
+        ADD COLUMN IF NOT EXISTS company TEXT GENERATED ALWAYS AS (data->>'company') STORED,
+        -- ISO-8601 text sorts chronologically; casting to timestamp is not immutable
+        ADD COLUMN IF NOT EXISTS created_date TEXT GENERATED ALWAYS AS (data->>'created_date') STORED,
+        -- Normalized required and preferred skill IDs from the match profile
+        ADD COLUMN IF NOT EXISTS skills JSONB GENERATED ALWAYS AS (
+            COALESCE(match_profile->'required_skills', '[]'::jsonb)
+            || COALESCE(match_profile->'preferred_skills', '[]'::jsonb)
+        ) STORED;
+    CREATE INDEX IF NOT EXISTS idx_job_descriptions_skills
+        ON job_descriptions USING GIN (skills jsonb_path_ops);
+    CREATE INDEX IF NOT EXISTS idx_job_descriptions_created_date
+        ON job_descriptions (created_date);
+    CREATE INDEX IF NOT EXISTS idx_job_descriptions_company
+        ON job_descriptions (lower(company));
+    """),
+    (4, "job_descriptions keyset pagination index", """
+    CREATE INDEX IF NOT EXISTS idx_job_descriptions_created_date_id
+        ON job_descriptions (created_date DESC, id DESC);
+    -- Superseded by the composite index above
+    DROP INDEX IF EXISTS idx_job_descriptions_created_date;
+    """),
+    (5, "job_descriptions full-text search", """
+    ALTER TABLE job_descriptions
+        ADD COLUMN IF NOT EXISTS search_vector TSVECTOR GENERATED ALWAYS AS (
+            setweight(to_tsvector('english', COALESCE(data->>'title', '')), 'A')
+            || setweight(to_tsvector('english', COALESCE(data->>'company', '')), 'B')
+            || setweight(jsonb_to_tsvector(
+                'english',
+                COALESCE(data->'required_skills', '[]'::jsonb) || COALESCE(data->'preferred_skills', '[]'::jsonb),
+                '["string"]'
+            ), 'B')
+            || setweight(to_tsvector('english', COALESCE(data->>'description', '')), 'D')
+        ) STORED;
+    CREATE INDEX IF NOT EXISTS idx_job_descriptions_search
+        ON job_descriptions USING GIN (search_vector);
+    """),
+    (6, "create match_runs and match_results", """
+    CREATE TABLE IF NOT EXISTS match_runs (
+        id TEXT PRIMARY KEY,
+        job_ids JSONB NOT NULL,
+        created_date TEXT NOT NULL
+    );
+    CREATE TABLE IF NOT EXISTS match_results (
+        seq BIGSERIAL PRIMARY KEY,
+        run_id TEXT NOT NULL REFERENCES match_runs(id),
+        job_id TEXT NOT NULL,
+        overall_score DOUBLE PRECISION NOT NULL,
+        data JSONB NOT NULL
+    );
+    CREATE INDEX IF NOT EXISTS idx_match_results_run
+        ON match_results (run_id, job_id, overall_score DESC);
+    """),
+    (7, "job_descriptions keyset pagination index without dates", """
+    -- Jobs without a created_date sort as the oldest, as in the other job stores
+    CREATE INDEX IF NOT EXISTS idx_job_descriptions_order
+        ON job_descriptions ((COALESCE(created_date, '')) DESC, id DESC);
+    DROP INDEX IF EXISTS idx_job_descriptions_created_date_id;
+    """),
+]
+
+
+def run_migrations(conn: extensions.connection) -> List[int]:
+    """
+    Apply every migration that has not been applied yet.
+
+    Runs in one transaction under an advisory lock, so it is safe to call
+    from every worker. The connection pool calls it whenever it opens, so
+    the schema is created once the database is reachable even if it was
+    down at startup. Returns the versions that were applied.
+    """
+    applied_now = []
+    with conn.cursor() as cur:
+        cur.execute("SELECT pg_advisory_xact_lock(%s)", (MIGRATION_LOCK_ID,))
+        cur.execute("""
+        CREATE TABLE IF NOT EXISTS schema_migrations (
+            version INTEGER PRIMARY KEY,
+            name TEXT NOT NULL,
+            applied_at TIMESTAMPTZ NOT NULL DEFAULT now()
+        )
+        """)
+        cur.execute("SELECT version FROM schema_migrations")
+        applied = {row[0] for row in cur.fetchall()}
+
+        for version, name, sql in MIGRATIONS:
+            if version in applied:
+                continue
+            logger.info(f"Applying migration {version}: {name}")
+            cur.execute(sql)
+            cur.execute(
+                "INSERT INTO schema_migrations (version, name) VALUES (%s, %s)",
+                (version, name)
+            )
+            applied_now.append(version)
+    conn.commit()
+
+    return applied_now
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    # Opening the pool applies the pending migrations
+    init_db_pool(get_settings())
+    close_db_pool()
@@ -0,0 +1,291 @@
+import json
+import logging
+import sqlite3
+import threading
+import time
+import uuid
+from contextlib import closing
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional, Set, Tuple
+
+from app.config import Settings
+from app.services.cv_parser import extract_information_with_ai, extract_information_with_spacy
+from app.services.executors import cpu_pool
+from app.services.resume_store import save_parsed_resume
+from app.services.text_extraction import extract_text_from_file
+
+logger = logging.getLogger(__name__)
+
+SQLITE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS parse_jobs (
+    id TEXT PRIMARY KEY,
+    created_date TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS parse_job_files (
+    job_id TEXT NOT NULL REFERENCES parse_jobs(id),
+    position INTEGER NOT NULL,
+    file_name TEXT NOT NULL,
+    path TEXT NOT NULL,
+    status TEXT NOT NULL DEFAULT 'queued',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    lease_expires REAL,
+    result TEXT,
+    error TEXT,
+    updated_date TEXT,
+    PRIMARY KEY (job_id, position)
+);
+CREATE INDEX IF NOT EXISTS idx_parse_job_files_status ON parse_job_files(status, lease_expires);
+"""
+
+
+class ParseQueue:
+    """
+    Persistent queue of uploaded resumes waiting to be parsed.
+
+    Jobs and their files live in a local SQLite database, so queued work
+    survives restarts. A file is claimed with a lease of `PARSE_JOB_LEASE`
+    seconds, which is renewed every third of the lease while it is parsed.
+    Only a file whose worker died is claimed again, once the lease expires,
+    and it gives up after `PARSE_JOB_MAX_ATTEMPTS` tries.
+    """
+
+    def __init__(self, settings: Settings):
+        self.settings = settings
+        self.path = settings.PARSE_QUEUE_DB_PATH
+        Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+        with closing(sqlite3.connect(self.path)) as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(SQLITE_SCHEMA)
+        self._wakeup = threading.Event()
+        self._stopping = threading.Event()
+        self._workers: List[threading.Thread] = []
+        # Rows of the files being parsed by this process, whose leases are renewed
+        self._leased: Set[int] = set()
+        self._leased_lock = threading.Lock()
+
+    def _connect(self) -> sqlite3.Connection:
+        # isolation_level=None lets claims take the write lock with BEGIN IMMEDIATE
+        conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    def submit(self, files: List[Tuple[str, str]]) -> str:
+        """Queue `(file_name, path)` uploads as one parse job and return its ID."""
+        job_id = str(uuid.uuid4())
+        with closing(self._connect()) as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            conn.execute(
+                "INSERT INTO parse_jobs (id, created_date) VALUES (?, ?)",
+                (job_id, datetime.now().isoformat())
+            )
+            conn.executemany(
+                "INSERT INTO parse_job_files (job_id, position, file_name, path) VALUES (?, ?, ?, ?)",
+                [(job_id, position, file_name, path) for position, (file_name, path) in enumerate(files)]
+            )
+            conn.execute("COMMIT")
+        self._wakeup.set()
+        return job_id
+
+    def get_job(self, job_id: str) -> Optional[Dict]:
+        """Get the progress and per-file results of a parse job, or None if it does not exist."""
+        with closing(self._connect()) as conn:
+            job = conn.execute("SELECT id, created_date FROM parse_jobs WHERE id = ?", (job_id,)).fetchone()
+            if job is None:
+                return None
+            rows = conn.execute(
+                "SELECT file_name, status, result, error, updated_date FROM parse_job_files "
+                "WHERE job_id = ? ORDER BY position",
+                (job_id,)
+            ).fetchall()
+
+        files = [
+            {
+                "file_name": row["file_name"],
+                "status": row["status"],
+                "result": json.loads(row["result"]) if row["result"] else None,
+                "error": row["error"],
+            }
+            for row in rows
+        ]
+        completed = sum(1 for file in files if file["status"] == "completed")
+        failed = sum(1 for file in files if file["status"] == "failed")
+        if completed + failed == len(files):
+            status = "completed"
+        elif any(file["status"] != "queued" for file in files):
+            status = "running"
+        else:
+            status = "queued"
+
+        return {
+            "id": job["id"],
+            "status": status,
+            "created_date": job["created_date"],
+            "updated_date": max((row["updated_date"] for row in rows if row["updated_date"]), default=None),
+            "total": len(files),
+            "completed": completed,
+            "failed": failed,
+            "files": files,
+        }
+
+    def _claim(self) -> Optional[sqlite3.Row]:
+        """Take the oldest queued file, or one whose lease expired, and lease it to this worker."""
+        now = time.time()
+        with closing(self._connect()) as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            row = conn.execute(
+                """
+                SELECT f.rowid, f.job_id, f.position, f.file_name, f.path, f.attempts
+                FROM parse_job_files f JOIN parse_jobs j ON j.id = f.job_id
+                WHERE f.status = 'queued' OR (f.status = 'processing' AND f.lease_expires < ?)
+                ORDER BY j.created_date, f.position
+                LIMIT 1
+                """,
+                (now,)
+            ).fetchone()
+            if row is not None:
+                conn.execute(
+                    "UPDATE parse_job_files SET status = 'processing', attempts = attempts + 1, "
+                    "lease_expires = ?, updated_date = ? WHERE rowid = ?",
+                    (now + self.settings.PARSE_JOB_LEASE, datetime.now().isoformat(), row["rowid"])
+                )
+            conn.execute("COMMIT")
+            return row
+
+    def _finish(self, rowid: int, status: str, result: Optional[Dict] = None, error: Optional[str] = None) -> None:
+        with closing(self._connect()) as conn:
+            conn.execute(
+                "UPDATE parse_job_files SET status = ?, result = ?, error = ?, lease_expires = NULL, "
+                "updated_date = ? WHERE rowid = ?",
+                (status, json.dumps(result) if result is not None else None, error,
+                 datetime.now().isoformat(), rowid)
+            )
+
+    def _renew_leases(self) -> None:
+        """Extend the leases of the files this process is parsing, so they are not claimed again meanwhile."""
+        with self._leased_lock:
+            rowids = list(self._leased)
+        if not rowids:
+            return
+        with closing(self._connect()) as conn:
+            conn.execute(
+                f"UPDATE parse_job_files SET lease_expires = ? "
+                f"WHERE status = 'processing' AND rowid IN ({', '.join('?' * len(rowids))})",
+                [time.time() + self.settings.PARSE_JOB_LEASE, *rowids]
+            )
+
+    def _run_lease_keeper(self) -> None:
+        while not self._stopping.wait(self.settings.PARSE_JOB_LEASE / 3):
+            try:
+                self._renew_leases()
+            except sqlite3.Error as e:
+                logger.error(f"Could not renew the leases of files being parsed: {str(e)}")
+
+    def _process(self, item: sqlite3.Row) -> None:
+        """Parse one claimed file and record its result."""
+        file_path = Path(item["path"])
+        if item["attempts"] >= self.settings.PARSE_JOB_MAX_ATTEMPTS:
+            # Earlier attempts never finished, most likely because the file crashes the worker
+            self._finish(item["rowid"], "failed", error="Parsing did not finish after repeated attempts")
+            self._cleanup(file_path)
+            return
+
+        with self._leased_lock:
+            self._leased.add(item["rowid"])
+        try:
+            self._parse(item)
+        finally:
+            with self._leased_lock:
+                self._leased.discard(item["rowid"])
+        self._cleanup(file_path)
+
+    def _parse(self, item: sqlite3.Row) -> None:
+        file_path = Path(item["path"])
+        try:
+            # Parsing runs in the CPU pool, so bulk jobs do not hold the GIL of the request worker
+            text = cpu_pool(self.settings).call(extract_text_from_file, str(file_path))
+            try:
+                parsed = extract_information_with_ai(text, self.settings)
+            except Exception as e:
+                logger.warning(f"AI extraction failed for {item['file_name']}, using spaCy: {str(e)}")
+                parsed = cpu_pool(self.settings).call(extract_information_with_spacy, text)
+            parsed["file_name"] = item["file_name"]
+            if self.settings.STORE_PARSED_RESUMES:
+                save_parsed_resume(parsed, self.settings)
+        except Exception as e:
+            error = getattr(e, "detail", None) or str(e) or type(e).__name__
+            logger.error(f"Error processing file {item['file_name']} of parse job {item['job_id']}: {error}")
+            self._finish(item["rowid"], "failed", error=error)
+        else:
+            self._finish(item["rowid"], "completed", result=parsed)
+            logger.info(f"Successfully processed file: {item['file_name']}")
+
+    def _cleanup(self, file_path: Path) -> None:
+        if self.settings.CLEANUP_FILES:
+            try:
+                file_path.unlink(missing_ok=True)
+                if file_path.parent.is_dir() and not any(file_path.parent.iterdir()):
+                    file_path.parent.rmdir()
+            except OSError as e:
+                logger.warning(f"Failed to cleanup file {file_path}: {str(e)}")
+
+    def _run_worker(self) -> None:
+        while not self._stopping.is_set():
+            try:
+                item = self._claim()
+            except sqlite3.Error as e:
+                logger.error(f"Could not claim a queued file: {str(e)}")
+                item = None
+            if item is None:
+                # Also poll, to pick up jobs queued by other processes sharing the database
+                self._wakeup.wait(self.settings.PARSE_QUEUE_POLL_INTERVAL)
+                self._wakeup.clear()
+                continue
+            self._process(item)
+
+    def start(self) -> None:
+        """Start the worker threads."""
+        if self._workers:
+            return
+        self._stopping.clear()
+        for index in range(self.settings.PARSE_WORKERS):
+            worker = threading.Thread(target=self._run_worker, name=f"parse-worker-{index}", daemon=True)
+            worker.start()
+            self._workers.append(worker)
+        lease_keeper = threading.Thread(target=self._run_lease_keeper, name="parse-lease-keeper", daemon=True)
+        lease_keeper.start()
+        self._workers.append(lease_keeper)
+        logger.info(f"Started {len(self._workers)} parse workers")
+
+    def stop(self, timeout: float = 10.0) -> None:
+        """Stop the worker threads; files being parsed are finished first or picked up after a restart."""
+        self._stopping.set()
+        self._wakeup.set()
+        for worker in self._workers:
+            worker.join(timeout)
+        self._workers = []
+
+
+_queue: Optional[ParseQueue] = None
+_queue_lock = threading.Lock()
+
+
+def get_parse_queue(settings: Settings) -> ParseQueue:
+    """Get the process-wide parse queue."""
+    global _queue
+    with _queue_lock:
+        if _queue is None:
+            _queue = ParseQueue(settings)
+        return _queue
+
+
+def start_parse_workers(settings: Settings) -> None:
+    """Start processing queued parse jobs, including those left over from before a restart."""
+    if settings.PARSE_WORKERS > 0:
+        get_parse_queue(settings).start()
+
+
+def stop_parse_workers() -> None:
+    """Stop the parse workers."""
+    if _queue is not None:
+        _queue.stop()
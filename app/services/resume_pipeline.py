@@ -0,0 +1,190 @@
+import asyncio
+import logging
+import uuid
+from pathlib import Path
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Iterable, List, Optional, Tuple
+
+from starlette.concurrency import run_in_threadpool
+
+from app.config import Settings
+from app.services.archives import ArchiveEntry, UploadSource, is_archive, open_archive, read_entry
+from app.services.cv_parser import extract_information_offloaded
+from app.services.duplicates import BatchDuplicates, content_hash, find_stored_duplicate, fingerprint
+from app.services.executors import run_cpu, run_io
+from app.services.match_runs import FileProgress
+from app.services.resume_store import save_parsed_resume
+from app.services.text_extraction import extract_text_from_bytes
+
+logger = logging.getLogger(__name__)
+
+
+class FileProcessingError(Exception):
+    """Raised when one file of a batch fails; `stage` is the match-run stage it failed in."""
+
+    def __init__(self, stage: str, error: Exception):
+        self.stage = stage
+        self.detail = str(getattr(error, "detail", None) or error) or type(error).__name__
+        super().__init__(self.detail)
+
+
+def remove_upload(file_path: Path, settings: Settings) -> None:
+    """Delete a saved upload once it has been processed, unless CLEANUP_FILES is off."""
+    if settings.CLEANUP_FILES and file_path.exists():
+        file_path.unlink()
+
+
+def release_upload(source: UploadSource, settings: Settings) -> None:
+    """Delete a saved upload, or close and delete the archive an entry was read from."""
+    if isinstance(source, ArchiveEntry):
+        source.archive.close()
+        remove_upload(source.archive_path, settings)
+    else:
+        remove_upload(source, settings)
+
+
+def release_uploads(items: List[Tuple[str, UploadSource]], settings: Settings) -> None:
+    for _, source in items:
+        release_upload(source, settings)
+
+
+def expand_archives(staged: List[Tuple[str, Path]], settings: Settings) -> List[Tuple[str, UploadSource]]:
+    """
+    Replace each saved ZIP archive in `staged` by the resumes inside it.
+
+    Entries are not extracted to disk: they are read from the archive one
+    at a time as they are processed. Blocking, so run it in the I/O pool.
+    """
+    items = []
+    try:
+        for file_name, file_path in staged:
+            if is_archive(file_name):
+                items.extend(open_archive(file_name, file_path, settings))
+            else:
+                items.append((file_name, file_path))
+    except Exception:
+        release_uploads(items, settings)
+        for _, file_path in staged:
+            remove_upload(file_path, settings)
+        raise
+    return items
+
+
+def read_upload(source: UploadSource, settings: Settings) -> Tuple[bytes, str]:
+    """Read a saved upload or archive entry and hash it; blocking, so run it in the I/O pool."""
+    data = read_entry(source, settings) if isinstance(source, ArchiveEntry) else source.read_bytes()
+    return data, content_hash(data)
+
+
+def extract_fingerprinted_text(data: bytes, file_name: str) -> Tuple[str, Dict]:
+    """Extract the text of a file and fingerprint it; CPU-heavy, so run it in the CPU pool."""
+    text = extract_text_from_bytes(data, file_name)
+    return text, fingerprint(text)
+
+
+async def parse_text(text: str, text_fingerprint: Dict, file_name: str, settings: Settings) -> Tuple[Dict, Optional[str]]:
+    """
+    Parse and store the text of a resume; returns `(parsed_resume, duplicate_of)`.
+    
+    With DEDUP_STORED_RESUMES, a stored resume with the same or nearly the
+    same text is returned instead, with its ID as `duplicate_of`.
+    """
+    if settings.DEDUP_STORED_RESUMES:
+        stored = await run_in_threadpool(find_stored_duplicate, text_fingerprint, settings)
+        if stored:
+            # A copy, as the memory backend hands out the stored record itself
+            stored = {key: value for key, value in stored.items() if key != "fingerprint"}
+            return stored, stored["id"]
+    
+    parsed_resume = await extract_information_offloaded(text, settings)
+    parsed_resume["id"] = str(uuid.uuid4())
+    parsed_resume["file_name"] = file_name
+    if settings.STORE_PARSED_RESUMES:
+        await run_in_threadpool(save_parsed_resume, {**parsed_resume, "fingerprint": text_fingerprint}, settings)
+    return parsed_resume, None
+
+
+async def parse_resume_file(
+    source: UploadSource,
+    file_name: str,
+    settings: Settings,
+    progress: Optional[FileProgress] = None,
+    duplicates: Optional[BatchDuplicates] = None
+) -> Tuple[str, Dict]:
+    """
+    Extract, parse and store one saved upload or archive entry; returns
+    `(text, parsed_resume)` and removes the file.
+    
+    Files of the same request that share `duplicates` are extracted once
+    per distinct content and parsed once per distinct normalized text.
+    Every copy gets the result under its own file name, with `duplicate_of`
+    set to the ID of the resume it repeats.
+    
+    `progress` of a match run records the "extracted" and "parsed" stages,
+    and the "uploaded" stage of an archive entry once it is read. Errors
+    are raised as `FileProcessingError` with the stage that failed.
+    """
+    duplicates = duplicates or BatchDuplicates()
+    stage = "uploaded" if isinstance(source, ArchiveEntry) else "extracted"
+    try:
+        data, data_hash = await run_io(settings, read_upload, source, settings)
+        if progress and isinstance(source, ArchiveEntry):
+            progress.reached("uploaded")
+        stage = "extracted"
+        (text, text_fingerprint), _ = await duplicates.once(
+            ("content", data_hash),
+            lambda: run_cpu(settings, extract_fingerprinted_text, data, file_name)
+        )
+        if progress:
+            progress.reached("extracted")
+        stage = "parsed"
+        
+        if text_fingerprint["text_hash"]:
+            (parsed_resume, duplicate_of), first = await duplicates.once(
+                ("text", text_fingerprint["text_hash"]),
+                lambda: parse_text(text, text_fingerprint, file_name, settings)
+            )
+            if not first:
+                duplicate_of = parsed_resume["id"]
+        else:
+            parsed_resume, duplicate_of = await parse_text(text, text_fingerprint, file_name, settings)
+        if progress:
+            progress.reached("parsed")
+        
+        return text, {**parsed_resume, "file_name": file_name, "duplicate_of": duplicate_of}
+    except Exception as e:
+        raise FileProcessingError(stage, e) from e
+    finally:
+        # Archives are removed by `release_upload` once all their entries are processed
+        if not isinstance(source, ArchiveEntry):
+            remove_upload(source, settings)
+
+
+async def process_as_completed(
+    items: Iterable[Any],
+    process: Callable[[Any], Awaitable[Any]],
+    concurrency: int
+) -> AsyncIterator[Tuple[Any, Any, Optional[Exception]]]:
+    """
+    Run `process` over `items`, at most `concurrency` at a time, and yield
+    `(item, result, error)` as each finishes, so the first result does not
+    wait for the slowest item.
+
+    Unfinished work is cancelled when the consumer stops early, e.g. when a
+    streaming client disconnects.
+    """
+    semaphore = asyncio.Semaphore(max(concurrency, 1))
+
+    async def run(item: Any) -> Tuple[Any, Any, Optional[Exception]]:
+        async with semaphore:
+            try:
+                return item, await process(item), None
+            except Exception as e:
+                return item, None, e
+
+    tasks = [asyncio.create_task(run(item)) for item in items]
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            yield await next_done
+    finally:
+        for task in tasks:
+            task.cancel()
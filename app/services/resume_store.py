@@ -0,0 +1,278 @@
+import bisect
+import itertools
+import json
+import sqlite3
+import threading
+import time
+import uuid
+from contextlib import closing
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from psycopg2.extras import RealDictCursor
+
+from app.config import Settings
+from app.services.database import get_db_connection
+from app.services.matcher import build_resume_profile, is_current_profile, normalize_skill
+
+
+SQLITE_CREATE_TABLE = """
+CREATE TABLE IF NOT EXISTS parsed_resumes (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    id TEXT NOT NULL UNIQUE,
+    data TEXT NOT NULL,
+    match_profile TEXT NOT NULL
+)
+"""
+
+
+# Most sequence numbers skipped at once that are watched for late commits
+MAX_GAPS_PER_JUMP = 1000
+
+# SQLite databases whose schema was already created by this process
+_sqlite_initialized = set()
+
+# `(seq, data, match_profile)` of every resume when RESUME_STORE_BACKEND is "memory"
+_memory_resumes: List[Tuple[int, Dict, Dict]] = []
+# Sequence numbers of `_memory_resumes`, in the same order, to find rows by seq
+_memory_seqs: List[int] = []
+_memory_next_seq = itertools.count(1)
+_memory_lock = threading.Lock()
+
+
+def get_sqlite_connection(settings: Settings) -> sqlite3.Connection:
+    """Open the SQLite stand-in for the resume store, creating its schema once."""
+    path = settings.RESUME_DB_PATH
+    if path not in _sqlite_initialized:
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        with closing(sqlite3.connect(path)) as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(SQLITE_CREATE_TABLE)
+        _sqlite_initialized.add(path)
+    return sqlite3.connect(path)
+
+
+def save_parsed_resume(resume: Dict, settings: Settings) -> str:
+    """Save a parsed resume and its match profile to the resume store."""
+    if "id" not in resume:
+        resume["id"] = str(uuid.uuid4())
+
+    data = json.dumps(resume)
+    match_profile = json.dumps(build_resume_profile(resume))
+
+    if settings.RESUME_STORE_BACKEND == "memory":
+        with _memory_lock:
+            seq = next(_memory_next_seq)
+            _memory_resumes.append((seq, json.loads(data), json.loads(match_profile)))
+            _memory_seqs.append(seq)
+    elif settings.RESUME_STORE_BACKEND == "sqlite":
+        with closing(get_sqlite_connection(settings)) as conn:
+            with conn:
+                conn.execute(
+                    "INSERT INTO parsed_resumes (id, data, match_profile) VALUES (?, ?, ?)",
+                    (resume["id"], data, match_profile)
+                )
+    else:
+        with get_db_connection(settings) as conn:
+            with conn.cursor() as cur:
+                cur.execute(
+                    "INSERT INTO parsed_resumes (id, data, match_profile) VALUES (%s, %s, %s)",
+                    (resume["id"], data, match_profile)
+                )
+                conn.commit()
+
+    return resume["id"]
+
+
+def get_parsed_resume(resume_id: str, settings: Settings) -> Optional[Dict]:
+    """Get a stored parsed resume by ID."""
+    if settings.RESUME_STORE_BACKEND == "memory":
+        with _memory_lock:
+            return next((data for _, data, _ in _memory_resumes if data["id"] == resume_id), None)
+
+    if settings.RESUME_STORE_BACKEND == "sqlite":
+        with closing(get_sqlite_connection(settings)) as conn:
+            row = conn.execute("SELECT data FROM parsed_resumes WHERE id = ?", (resume_id,)).fetchone()
+            return json.loads(row[0]) if row else None
+
+    with get_db_connection(settings) as conn:
+        with conn.cursor(cursor_factory=RealDictCursor) as cur:
+            cur.execute("SELECT data FROM parsed_resumes WHERE id = %s", (resume_id,))
+            row = cur.fetchone()
+            return row["data"] if row else None
+
+
+def get_parsed_resumes_after(seq: int, limit: int, settings: Settings) -> List[Tuple[int, Dict, Optional[Dict]]]:
+    """Get `(seq, data, match_profile)` for up to `limit` resumes stored after `seq`, in `seq` order."""
+    if settings.RESUME_STORE_BACKEND == "memory":
+        with _memory_lock:
+            start = bisect.bisect_right(_memory_seqs, seq)
+            return _memory_resumes[start:start + limit]
+
+    if settings.RESUME_STORE_BACKEND == "sqlite":
+        with closing(get_sqlite_connection(settings)) as conn:
+            rows = conn.execute(
+                "SELECT seq, data, match_profile FROM parsed_resumes WHERE seq > ? ORDER BY seq LIMIT ?",
+                (seq, limit)
+            ).fetchall()
+            return [(row[0], json.loads(row[1]), json.loads(row[2])) for row in rows]
+
+    with get_db_connection(settings) as conn:
+        with conn.cursor(cursor_factory=RealDictCursor) as cur:
+            cur.execute(
+                "SELECT seq, data, match_profile FROM parsed_resumes WHERE seq > %s ORDER BY seq LIMIT %s",
+                (seq, limit)
+            )
+            return [(row["seq"], row["data"], row["match_profile"]) for row in cur.fetchall()]
+
+
+def get_parsed_resumes_by_seq(seqs: List[int], settings: Settings) -> List[Tuple[int, Dict, Optional[Dict]]]:
+    """Get `(seq, data, match_profile)` for the resumes with the given sequence numbers that exist."""
+    if not seqs:
+        return []
+
+    if settings.RESUME_STORE_BACKEND == "memory":
+        wanted = set(seqs)
+        with _memory_lock:
+            return [row for row in _memory_resumes if row[0] in wanted]
+
+    if settings.RESUME_STORE_BACKEND == "sqlite":
+        with closing(get_sqlite_connection(settings)) as conn:
+            rows = conn.execute(
+                f"SELECT seq, data, match_profile FROM parsed_resumes WHERE seq IN ({', '.join('?' * len(seqs))}) ORDER BY seq",
+                list(seqs)
+            ).fetchall()
+            return [(row[0], json.loads(row[1]), json.loads(row[2])) for row in rows]
+
+    with get_db_connection(settings) as conn:
+        with conn.cursor(cursor_factory=RealDictCursor) as cur:
+            cur.execute(
+                "SELECT seq, data, match_profile FROM parsed_resumes WHERE seq = ANY(%s) ORDER BY seq",
+                (list(seqs),)
+            )
+            return [(row["seq"], row["data"], row["match_profile"]) for row in cur.fetchall()]
+
+
+class PoolListener:
+    """Something kept in step with the resume pool, such as a search or duplicate index."""
+
+    def reset(self) -> None:
+        """Forget every resume; the whole pool is about to be added again."""
+
+    def add(self, candidate: Dict, data: Dict) -> None:
+        """Take in a resume loaded into the pool, with its stored data."""
+
+
+class ResumePool:
+    """
+    In-process mirror of the stored resume profiles.
+
+    Ranking the whole pool for a job must not re-read and re-parse every
+    stored resume, so the pool keeps the scoring features in memory and only
+    pulls rows added since the last sync.
+
+    Sequence numbers are taken when a row is inserted, not when it commits,
+    so a row can become visible after rows with higher numbers. Numbers a
+    sync skips are checked again on later syncs until the row shows up or
+    RESUME_POOL_GAP_TIMEOUT seconds have passed (a rolled-back insert never
+    shows up). Every RESUME_POOL_RESYNC_INTERVAL seconds the pool is loaded
+    again in full, which also picks up resumes changed or deleted in the
+    database; listeners are reset first.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._candidates: List[Dict] = []
+        self._last_seq = 0
+        # Skipped sequence numbers and when they were first missed
+        self._gaps: Dict[int, float] = {}
+        self._loaded_at: Optional[float] = None
+        self._listeners: List[PoolListener] = []
+
+    def add_listener(self, listener: PoolListener) -> None:
+        """Feed every resume in the pool, now and later, to `listener`."""
+        with self._lock:
+            self._listeners.append(listener)
+            # Resumes already loaded are only passed on with their data, so load them again
+            self._loaded_at = None
+
+    def _add(self, seq: int, data: Dict, match_profile: Optional[Dict]) -> None:
+        if not is_current_profile(match_profile):
+            match_profile = build_resume_profile(data)
+        candidate = {
+            "id": data["id"],
+            "seq": seq,
+            "name": data.get("name"),
+            "file_name": data.get("file_name"),
+            "skills": frozenset(match_profile["skills"]),
+            "match_profile": match_profile,
+        }
+        self._candidates.append(candidate)
+        for listener in self._listeners:
+            listener.add(candidate, data)
+
+    def _load_after(self, settings: Settings) -> None:
+        """Load the rows after the last sequence number, noting the numbers they skip."""
+        while True:
+            rows = get_parsed_resumes_after(self._last_seq, settings.RESUME_POOL_PAGE_SIZE, settings)
+            now = time.monotonic()
+            for seq, data, match_profile in rows:
+                # A large jump is a run of rolled-back inserts; only the numbers closest to `seq` can still commit
+                for missing in range(max(self._last_seq + 1, seq - MAX_GAPS_PER_JUMP), seq):
+                    self._gaps[missing] = now
+                self._add(seq, data, match_profile)
+                self._last_seq = seq
+            if len(rows) < settings.RESUME_POOL_PAGE_SIZE:
+                return
+
+    def _fill_gaps(self, settings: Settings) -> None:
+        """Load rows that committed after later rows were synced, and give up on numbers that never will."""
+        if not self._gaps:
+            return
+        for seq, data, match_profile in get_parsed_resumes_by_seq(list(self._gaps), settings):
+            del self._gaps[seq]
+            self._add(seq, data, match_profile)
+        deadline = time.monotonic() - settings.RESUME_POOL_GAP_TIMEOUT
+        self._gaps = {seq: missed for seq, missed in self._gaps.items() if missed > deadline}
+
+    def _reload(self, settings: Settings) -> None:
+        self._candidates = []
+        self._last_seq = 0
+        self._gaps = {}
+        for listener in self._listeners:
+            listener.reset()
+        self._load_after(settings)
+        self._loaded_at = time.monotonic()
+
+    def sync(self, settings: Settings) -> List[Dict]:
+        """Load resumes stored since the last sync and return the whole pool."""
+        with self._lock:
+            interval = settings.RESUME_POOL_RESYNC_INTERVAL
+            if self._loaded_at is None or (interval and time.monotonic() - self._loaded_at >= interval):
+                self._reload(settings)
+            else:
+                self._fill_gaps(settings)
+                self._load_after(settings)
+            return list(self._candidates)
+
+
+_pool = ResumePool()
+
+
+def add_pool_listener(listener: PoolListener) -> None:
+    """Keep `listener` in step with the resume pool."""
+    _pool.add_listener(listener)
+
+
+def get_candidate_pool(settings: Settings, required_skills: Optional[Iterable[str]] = None) -> List[Dict]:
+    """
+    Get the stored candidates, optionally keeping only those that list every
+    skill in `required_skills`.
+    """
+    candidates = _pool.sync(settings)
+
+    required = {normalize_skill(skill) for skill in required_skills or [] if skill.strip()}
+    if required:
+        candidates = [candidate for candidate in candidates if required <= candidate["skills"]]
+
+    return candidates
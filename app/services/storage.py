@@ -1,20 +1,30 @@
+import base64
 import uuid
-from typing import Dict, List, Optional
-import psycopg2
-from psycopg2.extras import RealDictCursor
+from typing import Callable, Dict, List, Optional, Tuple
+from psycopg2.extras import RealDictCursor, execute_values
 from app.config import Settings
+from app.services.database import get_db_connection
+from app.services.job_cache import INVALIDATION_CHANNEL, job_cache
+from app.services.matcher import build_job_profile, is_current_profile, normalize_skill
 import json
 
 
-def get_db_connection(settings: Settings):
-    """Establish a connection to the database."""
-    return psycopg2.connect(
-        host=settings.DB_HOST,
-        port=settings.DB_PORT,
-        database=settings.DB_DATABASE,
-        user=settings.DB_USER,
-        password=settings.DB_PASSWORD
-    )
+# Fields of a stored job description that list pages can project
+JOB_FIELDS = (
+    "id",
+    "title",
+    "company",
+    "description",
+    "required_skills",
+    "preferred_skills",
+    "education_requirements",
+    "experience_requirements",
+    "created_date",
+)
+
+
+class InvalidJobQueryError(ValueError):
+    """Raised when a job list cursor or field projection is invalid."""
 
 
 def save_job_description(job_data: Dict, settings: Settings) -> str:
@@ -22,29 +32,43 @@ def save_job_description(job_data: Dict, settings: Settings) -> str:
     if "id" not in job_data:
         job_data["id"] = str(uuid.uuid4())
     
-    create_table_query = """
-    CREATE TABLE IF NOT EXISTS job_descriptions (
-        id UUID PRIMARY KEY,
-        data JSONB NOT NULL
-    )
-    """
-    
     insert_query = """
-    INSERT INTO job_descriptions (id, data)
-    VALUES (%s, %s)
+    INSERT INTO job_descriptions (id, data, match_profile)
+    VALUES (%s, %s, %s)
     """
     
+    match_profile = build_job_profile(job_data)
+    
     with get_db_connection(settings) as conn:
         with conn.cursor() as cur:
-            # Ensure the table exists
-            cur.execute(create_table_query)
-            # Insert the job description
-            cur.execute(insert_query, (job_data["id"], json.dumps(job_data)))
+            # Insert the job description together with its match profile
+            cur.execute(insert_query, (job_data["id"], json.dumps(job_data), json.dumps(match_profile)))
             conn.commit()
     
     return job_data["id"]
 
 
+def save_job_descriptions(jobs: List[Dict], settings: Settings) -> List[str]:
+    """Save several job descriptions in one transaction and return their IDs."""
+    rows = []
+    for job_data in jobs:
+        if "id" not in job_data:
+            job_data["id"] = str(uuid.uuid4())
+        rows.append((job_data["id"], json.dumps(job_data), json.dumps(build_job_profile(job_data))))
+    
+    with get_db_connection(settings) as conn:
+        with conn.cursor() as cur:
+            execute_values(
+                cur,
+                "INSERT INTO job_descriptions (id, data, match_profile) VALUES %s",
+                rows,
+                page_size=500
+            )
+            conn.commit()
+    
+    return [job_data["id"] for job_data in jobs]
+
+
 def get_job_descriptions(settings: Settings) -> List[Dict]:
     """Get all job descriptions from the database."""
     query = "SELECT data FROM job_descriptions"
@@ -55,6 +79,216 @@ def get_job_descriptions(settings: Settings) -> List[Dict]:
             return [row["data"] for row in rows]
 
 
+def encode_job_cursor(created_date: Optional[str], job_id: str) -> str:
+    """Encode the sort key of the last job on a page as an opaque cursor."""
+    return base64.urlsafe_b64encode(json.dumps([created_date, job_id]).encode()).decode()
+
+
+def decode_job_cursor(cursor: str) -> Tuple[str, str]:
+    """
+    Decode a cursor produced by `encode_job_cursor` into its sort key.
+
+    Jobs without a created_date sort as the oldest, so a null date in the
+    cursor decodes to the empty string they are ordered by.
+    """
+    try:
+        created_date, job_id = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        if created_date is not None and not isinstance(created_date, str):
+            raise TypeError(created_date)
+        return created_date or "", str(uuid.UUID(job_id))
+    except (ValueError, TypeError):
+        raise InvalidJobQueryError("Invalid cursor")
+
+
+def job_field_keys(fields: Optional[List[str]]) -> Optional[List[str]]:
+    """Validate a job field projection and return the keys to keep, or None for all fields."""
+    if not fields:
+        return None
+    unknown = [field for field in fields if field not in JOB_FIELDS]
+    if unknown:
+        raise InvalidJobQueryError(f"Unknown fields: {', '.join(unknown)}")
+    # The ID is always returned so clients can fetch the full job
+    return ["id"] + [field for field in fields if field != "id"]
+
+
+def build_job_page_query(
+    placeholder: Callable[[int], str],
+    limit: int,
+    cursor: Optional[str] = None,
+    fields: Optional[List[str]] = None,
+    title: Optional[str] = None,
+    company: Optional[str] = None,
+    skills: Optional[List[str]] = None
+) -> Tuple[str, List]:
+    """
+    Build the keyset-paginated job list query for either database driver.
+    
+    Jobs are ordered newest first on `(created_date, id)`, which is indexed,
+    so every page costs the same no matter how deep it is. Jobs without a
+    created_date come last. One row more than `limit` is fetched to tell
+    whether another page follows.
+    """
+    params = []
+    
+    def param(value) -> str:
+        params.append(value)
+        return placeholder(len(params))
+    
+    keys = job_field_keys(fields)
+    if keys:
+        projection = "jsonb_build_object({})".format(
+            ", ".join(f"'{key}', data->'{key}'" for key in keys)
+        )
+    else:
+        projection = "data"
+    
+    conditions = []
+    if cursor:
+        created_date, job_id = decode_job_cursor(cursor)
+        conditions.append(f"(COALESCE(created_date, ''), id) < ({param(created_date)}::text, {param(job_id)}::uuid)")
+    if title:
+        conditions.append(f"position(lower({param(title)}) in lower(title)) > 0")
+    if company:
+        conditions.append(f"lower(company) = lower({param(company)})")
+    normalized_skills = [normalize_skill(skill) for skill in skills or [] if skill.strip()]
+    if normalized_skills:
+        conditions.append(f"skills @> {param(json.dumps(normalized_skills))}::text::jsonb")
+    
+    query = f"""
+    SELECT {projection} AS data, created_date, id FROM job_descriptions
+    {"WHERE " + " AND ".join(conditions) if conditions else ""}
+    ORDER BY COALESCE(created_date, '') DESC, id DESC
+    LIMIT {param(limit + 1)}
+    """
+    return query, params
+
+
+def paginate_job_rows(rows: List, limit: int) -> Tuple[List[Dict], Optional[str]]:
+    """Split the `limit + 1` fetched rows into a page and the cursor of the next page."""
+    page = rows[:limit]
+    next_cursor = None
+    if len(rows) > limit:
+        last = page[-1]
+        next_cursor = encode_job_cursor(last["created_date"], str(last["id"]))
+    return [row["data"] for row in page], next_cursor
+
+
+def get_job_description_page(
+    settings: Settings,
+    limit: int = 50,
+    cursor: Optional[str] = None,
+    fields: Optional[List[str]] = None,
+    title: Optional[str] = None,
+    company: Optional[str] = None,
+    skills: Optional[List[str]] = None
+) -> Tuple[List[Dict], Optional[str]]:
+    """
+    Get one page of job descriptions, newest first.
+    
+    Returns the jobs (only `fields`, if given) and the cursor of the next
+    page, or None on the last page.
+    """
+    query, params = build_job_page_query(
+        lambda position: "%s", limit, cursor, fields, title, company, skills
+    )
+    with get_db_connection(settings) as conn:
+        with conn.cursor(cursor_factory=RealDictCursor) as cur:
+            cur.execute(query, params)
+            return paginate_job_rows(cur.fetchall(), limit)
+
+
+def encode_search_cursor(rank: float, job_id: str) -> str:
+    """Encode the rank and ID of the last search result on a page as an opaque cursor."""
+    return base64.urlsafe_b64encode(json.dumps([rank, job_id]).encode()).decode()
+
+
+def decode_search_cursor(cursor: str) -> Tuple[float, str]:
+    """Decode a cursor produced by `encode_search_cursor`."""
+    try:
+        rank, job_id = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        return float(rank), str(uuid.UUID(job_id))
+    except (ValueError, TypeError):
+        raise InvalidJobQueryError("Invalid cursor")
+
+
+def build_job_search_query(
+    placeholder: Callable[[int], str],
+    query: str,
+    limit: int,
+    cursor: Optional[str] = None,
+    fields: Optional[List[str]] = None
+) -> Tuple[str, List]:
+    """
+    Build the ranked full-text job search query for either database driver.
+    
+    `query` uses web search syntax: quoted phrases, `or` and `-excluded`
+    words. Results are ordered by rank, best first, with the ID breaking
+    ties so the `(rank, id)` cursor is stable.
+    """
+    params = []
+    
+    def param(value) -> str:
+        params.append(value)
+        return placeholder(len(params))
+    
+    keys = job_field_keys(fields)
+    if keys:
+        projection = "jsonb_build_object({})".format(
+            ", ".join(f"'{key}', data->'{key}'" for key in keys)
+        )
+    else:
+        projection = "data"
+    
+    # Parameters are numbered in the order they appear in the query text
+    search_terms = param(query)
+    cursor_condition = ""
+    if cursor:
+        rank, job_id = decode_search_cursor(cursor)
+        cursor_condition = f"WHERE (rank, id) < ({param(rank)}::real, {param(job_id)}::uuid)"
+    
+    search_query = f"""
+    SELECT data, rank, id FROM (
+        SELECT {projection} AS data, ts_rank(search_vector, query) AS rank, id
+        FROM job_descriptions, websearch_to_tsquery('english', {search_terms}) AS query
+        WHERE search_vector @@ query
+    ) ranked
+    {cursor_condition}
+    ORDER BY rank DESC, id DESC
+    LIMIT {param(limit + 1)}
+    """
+    return search_query, params
+
+
+def paginate_search_rows(rows: List, limit: int) -> Tuple[List[Dict], Optional[str]]:
+    """Split the `limit + 1` fetched search rows into a page, with ranks, and the cursor of the next page."""
+    page = rows[:limit]
+    next_cursor = None
+    if len(rows) > limit:
+        last = page[-1]
+        next_cursor = encode_search_cursor(last["rank"], str(last["id"]))
+    return [{**row["data"], "rank": row["rank"]} for row in page], next_cursor
+
+
+def search_job_descriptions(
+    settings: Settings,
+    query: str,
+    limit: int = 20,
+    cursor: Optional[str] = None,
+    fields: Optional[List[str]] = None
+) -> Tuple[List[Dict], Optional[str]]:
+    """
+    Full-text search over job titles, companies, skills and descriptions.
+    
+    Returns one page of matching jobs, best match first, each with its
+    `rank`, and the cursor of the next page, or None on the last page.
+    """
+    search_query, params = build_job_search_query(lambda position: "%s", query, limit, cursor, fields)
+    with get_db_connection(settings) as conn:
+        with conn.cursor(cursor_factory=RealDictCursor) as cur:
+            cur.execute(search_query, params)
+            return paginate_search_rows(cur.fetchall(), limit)
+
+
 def get_job_description(job_id: str, settings: Settings) -> Optional[Dict]:
     """Get a specific job description by ID."""
     query = "SELECT data FROM job_descriptions WHERE id = %s"
@@ -65,18 +299,187 @@ def get_job_description(job_id: str, settings: Settings) -> Optional[Dict]:
             return row["data"] if row else None
 
 
+def normalize_job_ids(job_ids: List[str]) -> Dict[str, Optional[str]]:
+    """
+    Map each distinct requested ID to its canonical UUID string, in request order.
+    
+    IDs that are not valid UUIDs map to None, since no job can have them.
+    """
+    canonical_ids: Dict[str, Optional[str]] = {}
+    for job_id in job_ids:
+        if job_id in canonical_ids:
+            continue
+        try:
+            canonical_ids[job_id] = str(uuid.UUID(job_id))
+        except ValueError:
+            canonical_ids[job_id] = None
+    return canonical_ids
+
+
+def order_by_request(rows: Dict[str, object], canonical_ids: Dict[str, Optional[str]]) -> Tuple[List, List[str]]:
+    """Order fetched rows like the request and collect the IDs that were not found."""
+    found = []
+    missing = []
+    seen = set()
+    for job_id, canonical_id in canonical_ids.items():
+        if canonical_id not in rows:
+            missing.append(job_id)
+        elif canonical_id not in seen:
+            seen.add(canonical_id)
+            found.append(rows[canonical_id])
+    return found, missing
+
+
+def get_job_descriptions_by_ids(job_ids: List[str], settings: Settings) -> Tuple[List[Dict], List[str]]:
+    """
+    Get several job descriptions in one query.
+    
+    Returns the jobs in the order their IDs were given and the IDs that
+    were not found.
+    """
+    canonical_ids = normalize_job_ids(job_ids)
+    lookup_ids = list({canonical_id for canonical_id in canonical_ids.values() if canonical_id})
+    if not lookup_ids:
+        return [], list(canonical_ids)
+    
+    query = "SELECT id, data FROM job_descriptions WHERE id = ANY(%s::uuid[])"
+    with get_db_connection(settings) as conn:
+        with conn.cursor(cursor_factory=RealDictCursor) as cur:
+            cur.execute(query, (lookup_ids,))
+            rows = {str(row["id"]): row["data"] for row in cur.fetchall()}
+    
+    return order_by_request(rows, canonical_ids)
+
+
+def get_jobs_with_profiles_by_ids(
+    job_ids: List[str],
+    settings: Settings
+) -> Tuple[List[Tuple[Dict, Dict]], List[str]]:
+    """
+    Get several job descriptions with their match profiles in one query.
+    
+    Returns `(job, match_profile)` pairs in the order their IDs were given
+    and the IDs that were not found. Outdated profiles are rebuilt and stored.
+    """
+    canonical_ids = normalize_job_ids(job_ids)
+    lookup_ids = list({canonical_id for canonical_id in canonical_ids.values() if canonical_id})
+    if not lookup_ids:
+        return [], list(canonical_ids)
+    
+    query = "SELECT id, data, match_profile FROM job_descriptions WHERE id = ANY(%s::uuid[])"
+    with get_db_connection(settings) as conn:
+        with conn.cursor(cursor_factory=RealDictCursor) as cur:
+            cur.execute(query, (lookup_ids,))
+            
+            rows = {}
+            rebuilt = []
+            for row in cur.fetchall():
+                match_profile = row["match_profile"]
+                if not is_current_profile(match_profile):
+                    match_profile = build_job_profile(row["data"])
+                    rebuilt.append((json.dumps(match_profile), str(row["id"])))
+                rows[str(row["id"])] = (row["data"], match_profile)
+            
+            if rebuilt:
+                cur.executemany("UPDATE job_descriptions SET match_profile = %s WHERE id = %s", rebuilt)
+                conn.commit()
+    
+    return order_by_request(rows, canonical_ids)
+
+
+def get_job_with_profile(job_id: str, settings: Settings) -> Optional[Tuple[Dict, Dict]]:
+    """
+    Get a job description together with its match profile.
+    
+    Profiles that are missing or were built by an older matcher version are
+    rebuilt and stored again, so callers always get a usable profile.
+    """
+    query = "SELECT data, match_profile FROM job_descriptions WHERE id = %s"
+    with get_db_connection(settings) as conn:
+        with conn.cursor(cursor_factory=RealDictCursor) as cur:
+            cur.execute(query, (job_id,))
+            row = cur.fetchone()
+            if not row:
+                return None
+            
+            job, match_profile = row["data"], row["match_profile"]
+            if not is_current_profile(match_profile):
+                match_profile = build_job_profile(job)
+                cur.execute(
+                    "UPDATE job_descriptions SET match_profile = %s WHERE id = %s",
+                    (json.dumps(match_profile), job_id)
+                )
+                conn.commit()
+            return job, match_profile
+
+
+def get_job_profiles(
+    settings: Settings,
+    company: Optional[str] = None,
+    title_keyword: Optional[str] = None
+) -> List[Tuple[Dict, Dict]]:
+    """
+    Get `(job, match_profile)` for every stored job description.
+    
+    - **company**: Only jobs from this company (case-insensitive)
+    - **title_keyword**: Only jobs whose title contains this keyword (case-insensitive)
+    """
+    query = """
+    SELECT id, data, match_profile FROM job_descriptions
+    WHERE (%(company)s::text IS NULL OR lower(company) = lower(%(company)s))
+      AND (%(title)s::text IS NULL OR position(lower(%(title)s) in lower(title)) > 0)
+    """
+    with get_db_connection(settings) as conn:
+        with conn.cursor(cursor_factory=RealDictCursor) as cur:
+            cur.execute(query, {"company": company, "title": title_keyword})
+            rows = cur.fetchall()
+            
+            jobs = []
+            rebuilt = []
+            for row in rows:
+                match_profile = row["match_profile"]
+                if not is_current_profile(match_profile):
+                    match_profile = build_job_profile(row["data"])
+                    rebuilt.append((json.dumps(match_profile), str(row["id"])))
+                jobs.append((row["data"], match_profile))
+            
+            if rebuilt:
+                cur.executemany("UPDATE job_descriptions SET match_profile = %s WHERE id = %s", rebuilt)
+                conn.commit()
+            return jobs
+
+
+def notify_job_changed(cur, job_id: str, settings: Settings) -> None:
+    """Tell other workers to drop a job from their caches once the transaction commits."""
+    if settings.JOB_CACHE_NOTIFY:
+        cur.execute("SELECT pg_notify(%s, %s)", (INVALIDATION_CHANNEL, str(job_id)))
+
+
 def update_job_description(job_id: str, updated_data: Dict, settings: Settings) -> bool:
-    """Update an existing job description."""
+    """Update an existing job description and rebuild its match profile."""
     query = """
     UPDATE job_descriptions
-    SET data = data || %s
+    SET data = data || %s::jsonb
     WHERE id = %s
+    RETURNING data
     """
     with get_db_connection(settings) as conn:
-        with conn.cursor() as cur:
-            cur.execute(query, (updated_data, job_id))
+        with conn.cursor(cursor_factory=RealDictCursor) as cur:
+            cur.execute(query, (json.dumps(updated_data), job_id))
+            row = cur.fetchone()
+            if not row:
+                return False
+            
+            # The old profile no longer describes the merged data
+            cur.execute(
+                "UPDATE job_descriptions SET match_profile = %s WHERE id = %s",
+                (json.dumps(build_job_profile(row["data"])), job_id)
+            )
+            notify_job_changed(cur, job_id, settings)
             conn.commit()
-            return cur.rowcount > 0
+    
+    job_cache.invalidate(job_id)
+    return True
 
 
 def delete_job_description(job_id: str, settings: Settings) -> bool:
@@ -85,5 +488,10 @@ def delete_job_description(job_id: str, settings: Settings) -> bool:
     with get_db_connection(settings) as conn:
         with conn.cursor() as cur:
             cur.execute(query, (job_id,))
+            deleted = cur.rowcount > 0
+            if deleted:
+                notify_job_changed(cur, job_id, settings)
             conn.commit()
-            return cur.rowcount > 0
+    
+    job_cache.invalidate(job_id)
+    return deleted
@@ -1,10 +1,12 @@
+import io
 import pdfplumber
 import docx2txt
 from pathlib import Path
+from typing import BinaryIO, Union
 from fastapi import HTTPException, status
 
 
-def extract_text_from_pdf(file_path: str) -> str:
+def extract_text_from_pdf(file_path: Union[str, BinaryIO]) -> str:
     """Extract text content from PDF file."""
     text = ""
     try:
@@ -20,7 +22,7 @@ def extract_text_from_pdf(file_path: str) -> str:
     return text
 
 
-def extract_text_from_docx(file_path: str) -> str:
+def extract_text_from_docx(file_path: Union[str, BinaryIO]) -> str:
     """Extract text content from DOCX file."""
     try:
         text = docx2txt.process(file_path)
@@ -47,4 +49,21 @@ def extract_text_from_file(file_path: str) -> str:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail=f"Unsupported file format: {file_ext}"
-        )
\ No newline at end of file
+        )
+
+
+def extract_text_from_bytes(data: bytes, file_name: str) -> str:
+    """Extract text from a file held in memory, such as an entry read from a ZIP archive."""
+    file_ext = Path(file_name).suffix.lower()
+    
+    if file_ext == ".pdf":
+        return extract_text_from_pdf(io.BytesIO(data))
+    elif file_ext == ".docx":
+        return extract_text_from_docx(io.BytesIO(data))
+    elif file_ext == ".txt":
+        return data.decode('utf-8', errors='ignore')
+    else:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unsupported file format: {file_ext}"
+        )
@@ -3,6 +3,7 @@
 import os
 import re
 import shutil
+import threading
 import uuid
 import json
 from datetime import datetime
@@ -28,6 +29,9 @@ class Settings(BaseSettings):
     ALLOWED_EXTENSIONS: List[str] = [".pdf", ".docx", ".txt"]
     MAX_FILE_SIZE: int = 10 * 1024 * 1024  # 10MB
     CLEANUP_FILES: bool = True
+    JOB_STORE_FSYNC: bool = True  # Flush every saved job to disk before returning
+    JOB_STORE_COMPACT_RATIO: float = 0.5  # Compact once this share of the log is superseded records
+    JOB_STORE_COMPACT_MIN_BYTES: int = 1024 * 1024  # Never compact logs smaller than this
 
     class Config:
         env_file = ".env"
@@ -315,59 +319,166 @@ def validate_file(file: UploadFile) -> None:
             detail="Uploaded file is empty"
         )
 
+class JobStore:
+    """
+    Append-only JSONL log of job descriptions with an in-memory ID index.
+
+    Every saved job is appended as one line, and a later line for the same
+    ID supersedes the earlier one. The index maps each ID to the offset and
+    length of its latest line. It is rebuilt by scanning the log on start,
+    so lookups and saves cost the same however many jobs are stored. Once
+    enough of the log is superseded records, the live records are rewritten
+    to a new file that atomically replaces the old one.
+    """
+
+    def __init__(self, path: Path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._index: Dict[str, tuple] = {}
+        self._size = 0
+        self._live_bytes = 0
+        self._reader = None
+        self._writer = None
+
+    def open(self) -> None:
+        """Load the index from the log, importing a legacy `job_descriptions.json` once."""
+        with self._lock:
+            legacy_file = self.path.with_suffix(".json")
+            if not self.path.exists() and legacy_file.exists():
+                self._import_legacy(legacy_file)
+            self.path.touch(exist_ok=True)
+            self._load_index()
+            self._open_handles()
+            self._compact_if_needed()
+
+    def _import_legacy(self, legacy_file: Path) -> None:
+        try:
+            with open(legacy_file, "r") as f:
+                jobs = json.load(f)
+        except json.JSONDecodeError:
+            jobs = []
+        self._write_atomically(json.dumps(job).encode() + b"\n" for job in jobs)
+        legacy_file.rename(legacy_file.with_suffix(".json.bak"))
+
+    def _load_index(self) -> None:
+        self._index = {}
+        self._live_bytes = 0
+        offset = 0
+        with open(self.path, "rb") as f:
+            for line in f:
+                try:
+                    if not line.endswith(b"\n"):
+                        raise ValueError("incomplete record")
+                    job_id = json.loads(line)["id"]
+                except (ValueError, KeyError, TypeError):
+                    # A crash during an append leaves at most one torn line at the end
+                    break
+                previous = self._index.get(job_id)
+                if previous:
+                    self._live_bytes -= previous[1]
+                self._index[job_id] = (offset, len(line))
+                self._live_bytes += len(line)
+                offset += len(line)
+        if offset < self.path.stat().st_size:
+            with open(self.path, "r+b") as f:
+                f.truncate(offset)
+        self._size = offset
+
+    def _open_handles(self) -> None:
+        for handle in (self._reader, self._writer):
+            if handle:
+                handle.close()
+        self._writer = open(self.path, "ab")
+        self._reader = open(self.path, "rb")
+
+    def _write_atomically(self, lines) -> None:
+        tmp_path = self.path.with_suffix(".jsonl.tmp")
+        with open(tmp_path, "wb") as f:
+            for line in lines:
+                f.write(line)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.path)
+
+    def _read(self, offset: int, length: int) -> Dict:
+        self._reader.seek(offset)
+        return json.loads(self._reader.read(length))
+
+    def _compact_if_needed(self) -> None:
+        garbage = self._size - self._live_bytes
+        if self._size >= settings.JOB_STORE_COMPACT_MIN_BYTES and garbage >= self._size * settings.JOB_STORE_COMPACT_RATIO:
+            self._compact()
+
+    def _compact(self) -> None:
+        records = []
+        for offset, length in sorted(self._index.values()):
+            self._reader.seek(offset)
+            records.append(self._reader.read(length))
+        # Some platforms cannot replace a file that is still open
+        self._reader.close()
+        self._writer.close()
+        self._reader = self._writer = None
+        self._write_atomically(records)
+        self._load_index()
+        self._open_handles()
+
+    def compact(self) -> None:
+        """Rewrite the log with only the latest record of every job."""
+        with self._lock:
+            self._compact()
+
+    def put(self, job_data: Dict) -> None:
+        """Append a job description, superseding any earlier one with the same ID."""
+        line = json.dumps(job_data).encode() + b"\n"
+        with self._lock:
+            self._writer.write(line)
+            self._writer.flush()
+            if settings.JOB_STORE_FSYNC:
+                os.fsync(self._writer.fileno())
+            previous = self._index.get(job_data["id"])
+            if previous:
+                self._live_bytes -= previous[1]
+            self._index[job_data["id"]] = (self._size, len(line))
+            self._live_bytes += len(line)
+            self._size += len(line)
+            self._compact_if_needed()
+
+    def get(self, job_id: str) -> Optional[Dict]:
+        """Get the latest version of a job description by ID."""
+        with self._lock:
+            entry = self._index.get(job_id)
+            return self._read(*entry) if entry else None
+
+    def all(self) -> List[Dict]:
+        """Get the latest version of every job description, oldest first."""
+        with self._lock:
+            return [self._read(offset, length) for offset, length in sorted(self._index.values())]
+
+
 def get_job_description_path() -> Path:
-    """Get path for storing job descriptions."""
-    return Path(settings.JD_DIR) / "job_descriptions.json"
+    """Get path of the job description log."""
+    return Path(settings.JD_DIR) / "job_descriptions.jsonl"
+
+job_store = JobStore(get_job_description_path())
+job_store.open()
 
 def save_job_description(job_data: Dict) -> str:
-    """Save job description to file."""
-    job_file = get_job_description_path()
-    
+    """Save job description to the job store."""
     # Create job ID if not provided
     if "id" not in job_data:
         job_data["id"] = str(uuid.uuid4())
     
-    # Load existing jobs or create empty list
-    if job_file.exists():
-        with open(job_file, "r") as f:
-            try:
-                jobs = json.load(f)
-            except json.JSONDecodeError:
-                jobs = []
-    else:
-        jobs = []
-    
-    # Add new job
-    jobs.append(job_data)
-    
-    # Save updated jobs list
-    with open(job_file, "w") as f:
-        json.dump(jobs, f, indent=2)
+    job_store.put(job_data)
     
     return job_data["id"]
 
 def get_job_descriptions() -> List[Dict]:
     """Get all job descriptions."""
-    job_file = get_job_description_path()
-    
-    if not job_file.exists():
-        return []
-    
-    with open(job_file, "r") as f:
-        try:
-            return json.load(f)
-        except json.JSONDecodeError:
-            return []
+    return job_store.all()
 
 def get_job_description(job_id: str) -> Optional[Dict]:
     """Get a specific job description by ID."""
-    jobs = get_job_descriptions()
-    
-    for job in jobs:
-        if job.get("id") == job_id:
-            return job
-    
-    return None
+    return job_store.get(job_id)
 
 def calculate_match_score(resume: Dict, job: Dict) -> Dict:
     """Calculate match score between resume and job description."""
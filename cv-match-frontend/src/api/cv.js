@@ -1,4 +1,4 @@
-import api from './index';
+import api, { splitFileResults } from './index';
 
 export const uploadCV = async (files, format = 'json') => {
   const formData = new FormData();
@@ -13,7 +13,8 @@ export const uploadCV = async (files, format = 'json') => {
         'Content-Type': 'multipart/form-data',
       },
     });
-    return response.data;
+    // One envelope per file; returns { results, failed }
+    return splitFileResults(response.data);
   } catch (error) {
     throw error.response?.data || error.message;
   }
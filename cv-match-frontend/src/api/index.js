@@ -37,4 +37,15 @@ api.interceptors.response.use(
   }
 );
 
+// Split per-file envelopes into the data of the files that succeeded and
+// the files that failed, as { fileName, stage, reason }
+export const splitFileResults = (envelopes) => ({
+  results: envelopes
+    .filter(envelope => envelope.status === 'ok')
+    .map(envelope => envelope.data),
+  failed: envelopes
+    .filter(envelope => envelope.status === 'error')
+    .map(envelope => ({ fileName: envelope.file_name, ...envelope.error })),
+});
+
 export default api;
\ No newline at end of file
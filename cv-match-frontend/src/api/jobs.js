@@ -27,10 +27,22 @@ export const createJob = async (jobData) => {
   }
 };
 
+// Largest page GET /jobs serves
+const JOBS_PAGE_SIZE = 500;
+
 export const getJobs = async () => {
   try {
-    const response = await api.get('/jobs');
-    return response.data;
+    // Follow the X-Next-Cursor header until the last page
+    const jobs = [];
+    let cursor = null;
+    do {
+      const response = await api.get('/jobs', {
+        params: { limit: JOBS_PAGE_SIZE, ...(cursor && { cursor }) },
+      });
+      jobs.push(...response.data);
+      cursor = response.headers['x-next-cursor'];
+    } while (cursor);
+    return jobs;
   } catch (error) {
     throw error.response?.data || error.message;
   }
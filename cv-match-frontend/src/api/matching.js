@@ -1,4 +1,4 @@
-import api from './index';
+import api, { splitFileResults } from './index';
 
 export const matchResumes = async (jobId, files) => {
   const formData = new FormData();
@@ -13,7 +13,8 @@ export const matchResumes = async (jobId, files) => {
         'Content-Type': 'multipart/form-data',
       },
     });
-    return response.data;
+    // One envelope per file; returns { results, failed }
+    return splitFileResults(response.data);
   } catch (error) {
     throw error.response?.data || error.message;
   }
@@ -32,7 +33,11 @@ export const batchMatchResumes = async (jobIds, files) => {
         'Content-Type': 'multipart/form-data',
       },
     });
-    return response.data;
+    // Matches per job, and the files that could not be parsed
+    return {
+      matches: response.data.matches,
+      failed: splitFileResults(response.data.files).failed,
+    };
   } catch (error) {
     throw error.response?.data || error.message;
   }
@@ -0,0 +1,32 @@
+import React from 'react';
+import { Box, Heading, HStack, Icon, List, ListItem, Text, Badge } from '@chakra-ui/react';
+import { FiAlertCircle } from 'react-icons/fi';
+
+// Files a request could not process, with the stage that failed and why
+const FailedFiles = ({ files, title = 'Files that could not be processed' }) => {
+  if (!files || files.length === 0) return null;
+
+  return (
+    <Box borderWidth="1px" borderColor="red.200" borderRadius="md" p={4}>
+      <Heading size="sm" mb={3}>
+        <Icon as={FiAlertCircle} mr={2} color="red.500" />
+        {title} ({files.length})
+      </Heading>
+      <List spacing={2}>
+        {files.map((file, index) => (
+          <ListItem key={index}>
+            <HStack align="start" spacing={2}>
+              <Badge colorScheme="red">{file.stage}</Badge>
+              <Box>
+                <Text fontWeight="medium">{file.fileName}</Text>
+                <Text fontSize="sm" color="gray.600">{file.reason}</Text>
+              </Box>
+            </HStack>
+          </ListItem>
+        ))}
+      </List>
+    </Box>
+  );
+};
+
+export default FailedFiles;
@@ -21,12 +21,14 @@ import { FiDownload, FiUpload, FiFileText, FiCheckCircle, FiAlertCircle } from '
 import FileUpload from '../common/FileUpload';
 import { uploadCV, downloadParsedCVs } from '../../api/cv';
 import ParsedCVView from './ParsedCVView';
+import FailedFiles from '../common/FailedFiles';
 
 const CVUploader = () => {
   const [files, setFiles] = useState([]);
   const [uploading, setUploading] = useState(false);
   const [downloading, setDownloading] = useState(false);
   const [parsedData, setParsedData] = useState([]);
+  const [failedFiles, setFailedFiles] = useState([]);
   const toast = useToast();
   const cardBg = useColorModeValue('white', 'gray.800');
   
@@ -44,12 +46,15 @@ const CVUploader = () => {
     
     setUploading(true);
     try {
-      const data = await uploadCV(files);
-      setParsedData(data);
+      const { results, failed } = await uploadCV(files);
+      setParsedData(results);
+      setFailedFiles(failed);
       toast({
-        title: 'CVs uploaded successfully',
-        description: `${files.length} CV(s) parsed successfully.`,
-        status: 'success',
+        title: failed.length ? 'Some CVs could not be parsed' : 'CVs uploaded successfully',
+        description: failed.length
+          ? `${results.length} CV(s) parsed, ${failed.length} failed.`
+          : `${results.length} CV(s) parsed successfully.`,
+        status: failed.length ? 'warning' : 'success',
         duration: 5000,
         isClosable: true,
       });
@@ -152,6 +157,14 @@ const CVUploader = () => {
         </CardFooter>
       </Card>
 
+      {failedFiles.length > 0 && (
+        <Card bg={cardBg} shadow="md" borderRadius="lg" mb={6}>
+          <CardBody>
+            <FailedFiles files={failedFiles} title="CVs that could not be parsed" />
+          </CardBody>
+        </Card>
+      )}
+
       {parsedData.length > 0 && (
         <Card bg={cardBg} shadow="md" borderRadius="lg">
           <CardHeader>
@@ -25,6 +25,7 @@ import { FiFileText, FiSearch, FiDownload } from 'react-icons/fi';
 import FileUpload from '../common/FileUpload';
 import { getJobs } from '../../api/jobs';
 import { matchResumes, exportMatchResults } from '../../api/matching';
+import FailedFiles from '../common/FailedFiles';
 
 const MatchingForm = ({ onMatchResults }) => {
   const [files, setFiles] = useState([]);
@@ -33,6 +34,7 @@ const MatchingForm = ({ onMatchResults }) => {
   const [isLoading, setIsLoading] = useState(false);
   const [isExporting, setIsExporting] = useState(false);
   const [isLoadingJobs, setIsLoadingJobs] = useState(false);
+  const [failedFiles, setFailedFiles] = useState([]);
   
   const toast = useToast();
   const cardBg = useColorModeValue('white', 'gray.800');
@@ -88,13 +90,16 @@ const MatchingForm = ({ onMatchResults }) => {
     
     setIsLoading(true);
     try {
-      const results = await matchResumes(selectedJobId, files);
+      const { results, failed } = await matchResumes(selectedJobId, files);
+      setFailedFiles(failed);
       if (onMatchResults) onMatchResults(results, getSelectedJobTitle());
       
       toast({
-        title: 'Matching complete',
-        description: `${files.length} CV(s) matched against the selected job.`,
-        status: 'success',
+        title: failed.length ? 'Some CVs could not be matched' : 'Matching complete',
+        description: failed.length
+          ? `${results.length} CV(s) matched, ${failed.length} failed.`
+          : `${results.length} CV(s) matched against the selected job.`,
+        status: failed.length ? 'warning' : 'success',
         duration: 5000,
         isClosable: true,
       });
@@ -216,6 +221,8 @@ const MatchingForm = ({ onMatchResults }) => {
               maxFiles={50}
             />
           </FormControl>
+          
+          <FailedFiles files={failedFiles} title="CVs that could not be matched" />
         </VStack>
       </CardBody>
       
@@ -0,0 +1,109 @@
+"""
+Throughput of the job store backends.
+
+Times the common operations against every selected backend; run from the
+repository root:
+
+    python scripts/benchmark_job_stores.py --backend memory sqlite postgres --jobs 5000
+
+Jobs created here are tagged with a unique company and deleted afterwards,
+so it is safe to run against a database that already holds jobs. Whether
+the backends behave the same is checked by tests/test_job_store_conformance.py.
+"""
+import argparse
+import logging
+import sys
+import tempfile
+import time
+import uuid
+from pathlib import Path
+from typing import Callable, Dict
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.config import get_settings  # noqa: E402
+from app.services.job_store import JobStore, MemoryJobStore, PostgresJobStore, SQLiteJobStore  # noqa: E402
+
+BACKENDS = ("memory", "sqlite", "postgres")
+
+
+def make_job(company: str, index: int) -> Dict:
+    skills = ["Python", f"skill{index % 50}"]
+    return {
+        "title": f"Benchmark Engineer {index % 60}",
+        "company": company,
+        "description": f"Job {index} needs {', '.join(skills)} experience.",
+        "required_skills": skills,
+        "preferred_skills": [],
+        "education_requirements": ["Bachelor"],
+        "experience_requirements": ["3 years"],
+        "created_date": f"2000-01-01T00:00:{index % 60:02d}.000000",
+    }
+
+
+def measure_throughput(store: JobStore, count: int) -> Dict[str, float]:
+    """Time the common operations over `count` jobs and return operations per second."""
+    company = f"throughput-{uuid.uuid4().hex[:8]}"
+    jobs = [make_job(company, index) for index in range(count)]
+    results = {}
+
+    def timed(name: str, operations: int, run: Callable) -> None:
+        start = time.perf_counter()
+        run()
+        results[name] = operations / max(time.perf_counter() - start, 1e-9)
+
+    half = count // 2
+    try:
+        timed("bulk save", half, lambda: store.save_job_descriptions(jobs[:half]))
+        timed("single save", count - half, lambda: [store.save_job_description(job) for job in jobs[half:]])
+        ids = [job["id"] for job in jobs]
+        timed("point read", count, lambda: [store.get_job_with_profile(job_id) for job_id in ids])
+        timed("multi-ID read", count, lambda: [
+            store.get_jobs_with_profiles_by_ids(ids[start:start + 100]) for start in range(0, count, 100)
+        ])
+
+        def walk_pages() -> None:
+            cursor = None
+            while True:
+                _, cursor = store.get_job_description_page(limit=100, cursor=cursor, company=company, fields=["title"])
+                if not cursor:
+                    break
+
+        timed("paged listing", count, walk_pages)
+        timed("search", 200, lambda: [
+            store.search_job_descriptions(f"{company} skill{index % 50}", limit=20) for index in range(200)
+        ])
+        timed("update", min(count, 1000), lambda: [
+            store.update_job_description(job_id, {"title": "Updated"}) for job_id in ids[:1000]
+        ])
+    finally:
+        for job in jobs:
+            if "id" in job:
+                store.delete_job_description(job["id"])
+
+    return results
+
+
+def create_store(backend: str, sqlite_path: str) -> JobStore:
+    if backend == "memory":
+        return MemoryJobStore()
+    if backend == "sqlite":
+        return SQLiteJobStore(sqlite_path)
+    return PostgresJobStore(get_settings())
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--backend", nargs="+", choices=BACKENDS, default=["memory", "sqlite"])
+    parser.add_argument("--jobs", type=int, default=2000, help="number of jobs to time the operations over")
+    parser.add_argument("--sqlite-path", help="SQLite database to use (default: a temporary file)")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for backend in args.backend:
+            store = create_store(backend, args.sqlite_path or str(Path(tmp_dir) / "jobs.db"))
+            print(backend)
+            for name, rate in measure_throughput(store, args.jobs).items():
+                print(f"  {name:<15} {rate:>12,.0f} ops/s")
@@ -0,0 +1,189 @@
+"""
+Conformance tests for the job store backends.
+
+The same scenarios run against every backend, so they stay
+interchangeable. The Postgres backend uses the database configured in the
+environment and is skipped when it cannot be reached. Jobs created here
+are tagged with a unique company and deleted afterwards, so it is safe to
+run against a database that already holds jobs:
+
+    python -m pytest tests/test_job_store_conformance.py
+"""
+import uuid
+from typing import Dict, List
+
+import pytest
+
+from app.services.job_store import MemoryJobStore, PostgresJobStore, SQLiteJobStore
+from app.services.storage import InvalidJobQueryError
+
+
+def make_job(company: str, index: int, skills: List[str]) -> Dict:
+    return {
+        "title": f"Conformance Engineer {index}",
+        "company": company,
+        "description": f"Job {index} needs {', '.join(skills)} experience.",
+        "required_skills": skills,
+        "preferred_skills": [],
+        "education_requirements": ["Bachelor"],
+        "experience_requirements": ["3 years"],
+        # Distinct, increasing timestamps give a known newest-first order
+        "created_date": f"2000-01-01T00:00:{index:02d}.000000",
+    }
+
+
+def postgres_store() -> PostgresJobStore:
+    try:
+        from app.config import get_settings
+        from app.services.database import get_db_connection
+
+        settings = get_settings()
+        with get_db_connection(settings) as conn:
+            with conn.cursor() as cur:
+                cur.execute("SELECT 1")
+    except Exception as e:
+        pytest.skip(f"Postgres is not reachable: {e}")
+    return PostgresJobStore(settings)
+
+
+@pytest.fixture(params=["memory", "sqlite", "postgres"])
+def store(request, tmp_path):
+    if request.param == "memory":
+        return MemoryJobStore()
+    if request.param == "sqlite":
+        return SQLiteJobStore(str(tmp_path / "jobs.db"))
+    return postgres_store()
+
+
+@pytest.fixture
+def company() -> str:
+    return f"conformance-{uuid.uuid4().hex[:8]}"
+
+
+@pytest.fixture
+def ids(store, company) -> List[str]:
+    """Six saved jobs of `company`, oldest first; even ones need Python and Rust, odd ones Python."""
+    jobs = [make_job(company, index, ["Python"] if index % 2 else ["Python", "Rust"]) for index in range(6)]
+    ids = store.save_job_descriptions(jobs[:4])
+    ids.append(store.save_job_description(jobs[4]))
+    ids.append(store.save_job_description(jobs[5]))
+    yield ids
+    for job_id in ids:
+        store.delete_job_description(job_id)
+
+
+def walk(fetch_page) -> List[str]:
+    """IDs of every page returned by `fetch_page(cursor)`, following cursors to the end."""
+    seen = []
+    cursor = None
+    while True:
+        page, cursor = fetch_page(cursor)
+        seen.extend(job["id"] for job in page)
+        if not cursor:
+            return seen
+
+
+def test_save_and_read(store, company, ids):
+    assert len(set(ids)) == 6, "saved jobs get distinct IDs"
+
+    job = store.get_job_description(ids[0])
+    assert job is not None and job["title"] == "Conformance Engineer 0", "a saved job can be read back"
+
+    jobs = [make_job(company, 6, ["Go"]), make_job(company, 7, ["Go"])]
+    saved = store.save_job_descriptions(jobs[:1]) + [store.save_job_description(jobs[1])]
+    try:
+        assert [job["id"] for job in jobs] == saved, "saving sets the ID on the job"
+    finally:
+        for job_id in saved:
+            store.delete_job_description(job_id)
+
+    assert store.get_job_description(ids[0].upper()) is not None, "IDs are case-insensitive UUIDs"
+    assert store.get_job_description(str(uuid.uuid4())) is None, "unknown IDs return None"
+
+    job, profile = store.get_job_with_profile(ids[1])
+    assert profile["required_skills"] == ["python"], "match profiles hold normalized skills"
+
+
+def test_multi_id_reads(store, ids):
+    unknown_id = str(uuid.uuid4())
+    found, missing = store.get_job_descriptions_by_ids([ids[3], "not-a-uuid", ids[0], unknown_id, ids[3]])
+    assert [job["id"] for job in found] == [ids[3], ids[0]], "multi-ID reads keep request order without duplicates"
+    assert missing == ["not-a-uuid", unknown_id], "multi-ID reads report missing IDs in request order"
+
+    found, missing = store.get_jobs_with_profiles_by_ids([ids[2]])
+    assert len(found) == 1 and found[0][1]["required_skills"] == ["python", "rust"] and not missing, \
+        "multi-ID reads include match profiles"
+
+
+def test_profile_filters(store, company, ids):
+    assert len(store.get_job_profiles(company=company.upper())) == 6, "company filter is case-insensitive"
+    profiles = store.get_job_profiles(company=company, title_keyword="engineer 3")
+    assert [job["id"] for job, _ in profiles] == [ids[3]], "title filter matches substrings"
+
+
+def test_pagination(store, company, ids):
+    seen = walk(lambda cursor: store.get_job_description_page(limit=4, cursor=cursor, company=company))
+    assert seen == ids[::-1], "pages walk every job newest first exactly once"
+
+    page, cursor = store.get_job_description_page(limit=10, company=company, fields=["title"])
+    assert set(page[0]) == {"id", "title"} and cursor is None, "field projection keeps only the ID and fields"
+    page, _ = store.get_job_description_page(limit=10, company=company, skills=["rust", " Python "])
+    assert [job["id"] for job in page] == [ids[4], ids[2], ids[0]], "skill filter requires every skill"
+    page, _ = store.get_job_description_page(limit=10, company=company, title="ENGINEER 5")
+    assert [job["id"] for job in page] == [ids[5]], "page title filter is case-insensitive"
+
+
+def test_invalid_queries(store):
+    with pytest.raises(InvalidJobQueryError):
+        store.get_job_description_page(cursor="not a cursor")
+    with pytest.raises(InvalidJobQueryError):
+        store.get_job_description_page(fields=["salary"])
+    with pytest.raises(InvalidJobQueryError):
+        store.search_job_descriptions("anything", cursor="bad")
+
+
+def test_search(store, company, ids):
+    marker = f"zq{uuid.uuid4().hex[:10]}"
+    in_title = store.save_job_description({**make_job(company, 10, ["Kotlin"]), "title": f"{marker} Lead"})
+    in_description = store.save_job_description(
+        {**make_job(company, 11, ["Kotlin"]), "description": f"Work on {marker} systems every day."}
+    )
+    try:
+        results, cursor = store.search_job_descriptions(marker)
+        assert [job["id"] for job in results] == [in_title, in_description] and cursor is None, \
+            "title matches rank above description matches"
+        assert results[0]["rank"] > results[1]["rank"] > 0, "search results carry their rank"
+        results, _ = store.search_job_descriptions(f"{marker} -lead")
+        assert [job["id"] for job in results] == [in_description], "excluded words filter results"
+        results, _ = store.search_job_descriptions(f'"{marker} systems"')
+        assert [job["id"] for job in results] == [in_description], "quoted phrases match"
+        results, _ = store.search_job_descriptions(f"{marker} kotlin", fields=["company"])
+        assert set(results[0]) == {"id", "company", "rank"}, "search results can be projected"
+
+        seen = walk(lambda cursor: store.search_job_descriptions(f"{company} or {marker}", limit=3, cursor=cursor))
+        assert len(seen) == len(set(seen)) == 8, "search pages walk every match exactly once"
+    finally:
+        store.delete_job_description(in_title)
+        store.delete_job_description(in_description)
+
+
+def test_update(store, company, ids):
+    assert store.update_job_description(ids[1], {"required_skills": ["Go"], "title": "Go Engineer"})
+
+    job, profile = store.get_job_with_profile(ids[1])
+    assert job["title"] == "Go Engineer" and job["company"] == company, "updates merge into the stored job"
+    assert profile["required_skills"] == ["go"], "updates rebuild the match profile"
+    page, _ = store.get_job_description_page(limit=10, company=company, skills=["go"])
+    assert [job["id"] for job in page] == [ids[1]], "skill filter sees updated skills"
+    results, _ = store.search_job_descriptions(f"{company} go")
+    assert [job["id"] for job in results] == [ids[1]], "search sees updated jobs"
+
+    assert not store.update_job_description(str(uuid.uuid4()), {"title": "x"}), "updating an unknown job fails"
+
+
+def test_delete(store, company, ids):
+    assert all(store.delete_job_description(job_id) for job_id in ids), "deleting a job succeeds"
+    assert store.get_job_description(ids[0]) is None, "deleted jobs are gone"
+    assert not store.delete_job_description(ids[0]), "deleting twice fails"
+    assert not store.get_job_profiles(company=company), "deleted jobs leave no filter results"
+    assert not store.search_job_descriptions(company)[0], "deleted jobs leave no search results"